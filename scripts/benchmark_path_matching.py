@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Benchmark .gitignore-style matching of changed files over large synthetic file lists.
+
+Usage: python scripts/benchmark_path_matching.py [--paths 100000] [--seed 0]
+"""
+
+import argparse
+import random
+import time
+
+from pathspec import GitIgnoreSpec
+
+from ccbr_actions.changed_files import IndexedGitIgnoreMatcher
+
+PATTERNS = """
+**/Dockerfile.*
+*.md
+!CHANGELOG.md
+docs/
+/R/
+vendor/**
+!vendor/keep/**
+src/*.py
+*.nf
+modules/**/main.nf
+"""
+
+DIRECTORIES = ["src", "docs", "R", "vendor", "modules", "data", "tests", "scripts"]
+SUBDIRECTORIES = ["api", "local", "nf-core", "keep", "fixtures", "img", "deep"]
+FILENAMES = [
+    "main.nf",
+    "app.py",
+    "README.md",
+    "CHANGELOG.md",
+    "Dockerfile.v1",
+    "sample.csv",
+    "figure.png",
+    "index.qmd",
+    "utils.R",
+]
+
+
+def synthetic_paths(count, seed=0):
+    """Generate ``count`` random repository-relative file paths."""
+    rng = random.Random(seed)
+    return [
+        "/".join(
+            [rng.choice(DIRECTORIES)]
+            + [rng.choice(SUBDIRECTORIES) for _ in range(rng.randint(0, 3))]
+            + [f"{rng.randint(0, 999)}_{rng.choice(FILENAMES)}"]
+        )
+        for _ in range(count)
+    ]
+
+
+def time_matcher(label, match_file, paths):
+    """Match every path, print throughput, and return the matched paths."""
+    start = time.perf_counter()
+    matched = [path for path in paths if match_file(path)]
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<26} {elapsed:8.3f} s  {len(paths) / elapsed:>12,.0f} paths/s  "
+        f"({len(matched):,} matched)"
+    )
+    return matched
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    lines = PATTERNS.strip().splitlines()
+    paths = synthetic_paths(args.paths, seed=args.seed)
+    print(f"{len(paths):,} synthetic paths, {len(lines)} patterns")
+
+    spec = GitIgnoreSpec.from_lines(lines)
+    expected = time_matcher("GitIgnoreSpec", spec.match_file, paths)
+    indexed = IndexedGitIgnoreMatcher(lines)
+    actual = time_matcher("IndexedGitIgnoreMatcher", indexed.match_file, paths)
+    if actual != expected:
+        raise RuntimeError("IndexedGitIgnoreMatcher results differ from GitIgnoreSpec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+"""Update the index of example workflows bundled in ccbr_actions.data.
+
+Usage: python scripts/bundle_examples.py
+"""
+
+import json
+import pathlib
+
+from ccbr_actions.data import EXAMPLES_INDEX, build_examples_index
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+
+def main():
+    """Write the index of ``examples/*.yml``."""
+    index = build_examples_index(REPO_ROOT / "examples")
+    index_path = REPO_ROOT / "src" / "ccbr_actions" / "data" / EXAMPLES_INDEX
+    index_path.write_text(json.dumps(index, indent=2) + "\n")
+    print(f"Indexed {len(index)} examples in {index_path.relative_to(REPO_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,9 @@ import click
 from ccbr_tools.pkg_util import get_version, CustomClickGroup
 
 from .util import repo_base, print_citation
-from .actions import use_github_action
-from .github import copy_ruleset, list_rulesets
+
+# Subcommands import their modules when invoked so that `ccbr_actions --help`
+# and `--version` do not pay for requests, yaml, or asyncio.
 
 
 @click.group(
@@ -37,24 +38,39 @@ def cli():
 
 
 @click.command()
-@click.argument("name")
-def use_example(name):
+@click.argument("names", nargs=-1, required=True, metavar="NAME...")
+@click.option(
+    "--ref",
+    default=None,
+    help="Git reference (branch, tag, or commit SHA) of CCBR/actions. Defaults to the latest release.",
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of files downloaded at the same time.",
+)
+def use_example(names, ref, max_workers):
     """
-    Use a GitHub Actions workflow file from CCBR/actions.
+    Use GitHub Actions workflow files from CCBR/actions.
 
     \b
     Args:
-        name (str): The name of the example workflow file to download.
+        names (str): The names of the example workflow files to download.
 
     \b
     Examples:
         ccbr_actions use-example docs-mkdocs
         ccbr_actions use-example build-nextflow
+        ccbr_actions use-example build-nextflow docs-mkdocs auto-format
 
     See list of workflow files here:
     https://ccbr.github.io/actions/examples.html
     """
-    use_github_action(name)
+    from .actions import use_github_actions
+
+    use_github_actions(names, ref=ref, max_workers=max_workers)
 
 
 cli.add_command(use_example)
@@ -82,6 +98,8 @@ def list_rulesets_cmd(repo, token):
         ccbr_actions list-rulesets CCBR/actions
         ccbr_actions list-rulesets CCBR/actions --token ghp_...
     """
+    from .github import list_rulesets
+
     rulesets = list_rulesets(repo=repo, token=token)
     if not rulesets:
         click.echo(f"No rulesets found in {repo}.")
@@ -94,9 +112,48 @@ cli.add_command(list_rulesets_cmd, name="list-rulesets")
 
 
 @click.command()
-@click.argument("source-repo")
-@click.argument("target-repo")
-@click.argument("ruleset-name")
+@click.argument(
+    "repos_and_name", nargs=-1, metavar="SOURCE_REPO [TARGET_REPO] RULESET_NAME"
+)
+@click.option(
+    "--target",
+    "targets",
+    multiple=True,
+    help="Target repository in owner/repo format. Can be repeated.",
+)
+@click.option(
+    "--targets-file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="JSON file listing target repositories, e.g. .github/repos.json.",
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of target repositories updated at the same time.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["table", "json"]),
+    default="table",
+    show_default=True,
+    help="Output format for per-repository results when copying to several targets.",
+)
+@click.option(
+    "--from-snapshot",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Read the source ruleset from a snapshot written by `rulesets snapshot` instead of the GitHub API.",
+)
+@click.option(
+    "--sync",
+    is_flag=True,
+    default=False,
+    help="Update or leave alone a target's ruleset with the same name instead of always creating a new one.",
+)
 @click.option(
     "--token",
     "-t",
@@ -104,35 +161,746 @@ cli.add_command(list_rulesets_cmd, name="list-rulesets")
     default=None,
     help="GitHub token with repo scope. Defaults to the GH_TOKEN environment variable.",
 )
-def copy_ruleset_cmd(source_repo, target_repo, ruleset_name, token):
+def copy_ruleset_cmd(
+    repos_and_name,
+    targets,
+    targets_file,
+    max_workers,
+    output_format,
+    from_snapshot,
+    sync,
+    token,
+):
     """
-    Copy a ruleset from one GitHub repository to another.
+    Copy a ruleset from one GitHub repository to others.
+
+    With several targets (--target, --targets-file), the source ruleset is
+    fetched once and created in all targets concurrently. The command exits
+    with an error if any target fails.
+
+    With --sync, each target's ruleset with the same name is compared to the
+    source: unchanged rulesets are left alone, differing ones are updated,
+    and missing ones are created, so repeated runs make no writes.
 
     \b
     Args:
         source-repo (str): Source repository in owner/repo format.
-        target-repo (str): Target repository in owner/repo format.
+        target-repo (str): Target repository in owner/repo format. Optional
+            when --target or --targets-file is given.
         ruleset-name (str): Name of the ruleset to copy.
 
     \b
     Examples:
         ccbr_actions copy-ruleset CCBR/actions CCBR/other-repo "Require PR reviews"
         ccbr_actions copy-ruleset CCBR/actions CCBR/other-repo "Require PR reviews" --token ghp_...
+        ccbr_actions copy-ruleset CCBR/actions "Require PR reviews" --targets-file .github/repos.json
+        ccbr_actions copy-ruleset CCBR/actions "Require PR reviews" --target CCBR/Tools --target CCBR/RENEE --format json
+        ccbr_actions copy-ruleset CCBR/actions "Require PR reviews" --targets-file .github/repos.json --sync
+        ccbr_actions copy-ruleset CCBR/actions "Require PR reviews" --target CCBR/Tools --from-snapshot rulesets.jsonl
     """
-    result = copy_ruleset(
-        source_repo=source_repo,
-        target_repo=target_repo,
-        ruleset_name=ruleset_name,
-        token=token,
+    from .github import (
+        copy_ruleset,
+        find_snapshot_ruleset,
+        read_repos_file,
+        read_ruleset_snapshot,
+        sync_ruleset,
     )
-    click.echo(
-        f"Ruleset '{result['name']}' (id={result['id']}) created in {target_repo}."
+
+    if len(repos_and_name) not in (2, 3):
+        raise click.UsageError("Expected SOURCE_REPO [TARGET_REPO] RULESET_NAME.")
+    source_repo, *positional_target, ruleset_name = repos_and_name
+    target_repos = list(positional_target) + list(targets)
+    if targets_file:
+        target_repos.extend(read_repos_file(targets_file))
+    target_repos = [repo for repo in dict.fromkeys(target_repos) if repo != source_repo]
+    if not target_repos:
+        raise click.UsageError(
+            "No target repositories given. Pass TARGET_REPO, --target, or --targets-file."
+        )
+    source = {}
+    if from_snapshot:
+        source["ruleset"] = find_snapshot_ruleset(
+            read_ruleset_snapshot(from_snapshot), source_repo, ruleset_name
+        )
+    is_single_target = len(target_repos) == 1 and not (targets or targets_file)
+    if is_single_target and sync:
+        result = sync_ruleset(
+            source_repo=source_repo,
+            target_repo=target_repos[0],
+            ruleset_name=ruleset_name,
+            token=token,
+            **source,
+        )
+        click.echo(
+            f"Ruleset '{ruleset_name}' (id={result['ruleset']['id']}) {result['action']} in {target_repos[0]}."
+        )
+    elif is_single_target:
+        result = copy_ruleset(
+            source_repo=source_repo,
+            target_repo=target_repos[0],
+            ruleset_name=ruleset_name,
+            token=token,
+            **source,
+        )
+        click.echo(
+            f"Ruleset '{result['name']}' (id={result['id']}) created in {target_repos[0]}."
+        )
+    else:
+        results = copy_ruleset_to_many(
+            source_repo=source_repo,
+            target_repos=target_repos,
+            ruleset_name=ruleset_name,
+            token=token,
+            max_workers=max_workers,
+            sync=sync,
+            **source,
+        )
+        _echo_results(results, output_format)
+
+
+def copy_ruleset_to_many(
+    source_repo,
+    target_repos,
+    ruleset_name,
+    token,
+    max_workers,
+    sync=False,
+    ruleset=None,
+):
+    """
+    Run [](`~ccbr_actions.github_async.copy_ruleset_to_repos`) or
+    [](`~ccbr_actions.github_async.sync_ruleset_to_repos`) from synchronous code.
+    """
+    from .github_async import (
+        AsyncGitHubClient,
+        copy_ruleset_to_repos,
+        run,
+        sync_ruleset_to_repos,
     )
 
+    fan_out = sync_ruleset_to_repos if sync else copy_ruleset_to_repos
+
+    async def main():
+        async with AsyncGitHubClient(
+            token=token, max_concurrency=max_workers
+        ) as client:
+            return await fan_out(
+                source_repo, target_repos, ruleset_name, client, ruleset=ruleset
+            )
+
+    return run(main())
+
+
+def _echo_results(
+    results,
+    output_format,
+    columns=("repo", "status", "ruleset_id", "error"),
+    label=lambda result: result["repo"],
+    noun="repositories",
+):
+    """Print per-item results and fail if any item failed."""
+    import json
+
+    from .util import format_table
+
+    if output_format == "json":
+        click.echo(json.dumps(results, indent=2))
+    else:
+        click.echo(format_table(results, list(columns)))
+    failed = [label(result) for result in results if result["status"] == "failed"]
+    if failed:
+        raise click.ClickException(
+            f"{len(failed)} of {len(results)} {noun} failed: {', '.join(failed)}"
+        )
+
 
 cli.add_command(copy_ruleset_cmd, name="copy-ruleset")
 
 
+@click.group()
+def rulesets():
+    """
+    Manage GitHub rulesets across repositories.
+    """
+
+
+@rulesets.command()
+@click.argument("repos", nargs=-1)
+@click.option(
+    "--repos-file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="JSON file listing repositories, e.g. .github/repos.json.",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False),
+    default="rulesets.jsonl",
+    show_default=True,
+    help="JSON Lines snapshot file. An existing snapshot is refreshed incrementally.",
+)
+@click.option(
+    "--full",
+    is_flag=True,
+    default=False,
+    help="Re-fetch every ruleset instead of reusing unchanged ones from the existing snapshot.",
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of requests in flight.",
+)
+@click.option(
+    "--token",
+    "-t",
+    envvar="GH_TOKEN",
+    default=None,
+    help="GitHub token with repo scope. Defaults to the GH_TOKEN environment variable.",
+)
+def snapshot(repos, repos_file, output, full, max_workers, token):
+    """
+    Snapshot the full definition of every ruleset across repositories.
+
+    Writes one JSON line per ruleset (repo, id, name, updated_at, ruleset).
+    Rulesets whose updated_at matches the existing snapshot are not
+    re-fetched. Use the snapshot as the source of `copy-ruleset --from-snapshot`.
+
+    \b
+    Args:
+        repos (str): Repositories in owner/repo format.
+
+    \b
+    Examples:
+        ccbr_actions rulesets snapshot --repos-file .github/repos.json
+        ccbr_actions rulesets snapshot CCBR/actions CCBR/Tools -o audit/rulesets.jsonl
+    """
+    from .github import read_repos_file, read_ruleset_snapshot, write_ruleset_snapshot
+
+    if repos_file:
+        repos = list(repos) + read_repos_file(repos_file)
+    repos = list(dict.fromkeys(repos))
+    if not repos:
+        raise click.UsageError("No repositories given. Pass REPOS or --repos-file.")
+    previous = [] if full else read_ruleset_snapshot(output)
+    records, summary = snapshot_many(
+        repos, previous=previous, token=token, max_workers=max_workers
+    )
+    write_ruleset_snapshot(output, records)
+    click.echo(
+        f"Wrote {summary['rulesets']} rulesets from {summary['repos']} repositories to {output} "
+        f"({summary['fetched']} fetched, {summary['reused']} unchanged)."
+    )
+    for repo, error in summary["errors"].items():
+        click.echo(f"Failed to snapshot {repo}: {error}", err=True)
+    if summary["errors"]:
+        raise click.ClickException(
+            f"{len(summary['errors'])} repositories failed; their previous snapshot entries were kept."
+        )
+
+
+def snapshot_many(repos, previous, token, max_workers):
+    """Run [](`~ccbr_actions.github_async.snapshot_rulesets`) from synchronous code."""
+    from .github_async import AsyncGitHubClient, run, snapshot_rulesets
+
+    async def main():
+        async with AsyncGitHubClient(
+            token=token, max_concurrency=max_workers
+        ) as client:
+            return await snapshot_rulesets(repos, client, previous=previous)
+
+    return run(main())
+
+
+cli.add_command(rulesets)
+
+
+@click.command(name="trigger-workflows")
+@click.argument("matrix", required=False)
+@click.option(
+    "--matrix-file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="JSON file with the dispatch matrix instead of the MATRIX argument.",
+)
+@click.option(
+    "--repo", default=None, help="Repository for dispatches that do not set one."
+)
+@click.option(
+    "--workflow", default=None, help="Workflow file for dispatches that do not set one."
+)
+@click.option("--ref", default=None, help="Git ref for dispatches that do not set one.")
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of dispatches sent at the same time.",
+)
+@click.option(
+    "--max-attempts",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Maximum number of attempts per dispatch for connection errors.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["table", "json"]),
+    default="table",
+    show_default=True,
+    help="Output format for per-dispatch results.",
+)
+@click.option(
+    "--dry-run", is_flag=True, help="Show the dispatches without sending them."
+)
+@click.option(
+    "--token",
+    "-t",
+    envvar="GITHUB_TOKEN",
+    default=None,
+    help="GitHub token with actions write scope. Defaults to the GITHUB_TOKEN environment variable.",
+)
+def trigger_workflows_cmd(
+    matrix,
+    matrix_file,
+    repo,
+    workflow,
+    ref,
+    max_workers,
+    max_attempts,
+    output_format,
+    dry_run,
+    token,
+):
+    """
+    Trigger GitHub Actions workflows for every entry of a JSON matrix.
+
+    Each entry has `repo`, `workflow`, `ref`, and optionally `inputs`. Entries
+    may also be given as a GitHub Actions matrix with an `include` list.
+    Dispatches are sent concurrently, and the command exits with an error if
+    any dispatch fails.
+
+    \b
+    Args:
+        matrix (str): JSON list of dispatches or matrix with `include`.
+
+    \b
+    Examples:
+        ccbr_actions trigger-workflows '[{"repo": "CCBR/dockers2", "workflow": "build-docker-manual.yml", "ref": "main", "inputs": {"dockerfile": "bwa/Dockerfile.v1"}}]'
+        ccbr_actions trigger-workflows --matrix-file dispatches.json --workflow build-docker-manual.yml --ref main --format json
+    """
+    from .actions import (
+        DISPATCH_RESULT_COLUMNS,
+        parse_dispatch_matrix,
+        trigger_workflows,
+    )
+
+    if bool(matrix) == bool(matrix_file):
+        raise click.UsageError("Pass either MATRIX or --matrix-file.")
+    if matrix_file:
+        with open(matrix_file) as infile:
+            matrix = infile.read()
+    defaults = {
+        key: value
+        for key, value in {"repo": repo, "workflow": workflow, "ref": ref}.items()
+        if value
+    }
+    try:
+        dispatches = parse_dispatch_matrix(matrix, defaults)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="MATRIX")
+    results = trigger_workflows(
+        dispatches,
+        token=token,
+        max_workers=max_workers,
+        max_attempts=max_attempts,
+        debug=dry_run,
+    )
+    _echo_results(
+        results,
+        output_format,
+        columns=DISPATCH_RESULT_COLUMNS,
+        label=lambda result: f"{result['repo']}/{result['workflow']}@{result['ref']}",
+        noun="dispatches",
+    )
+
+
+cli.add_command(trigger_workflows_cmd)
+
+
+@click.command(name="docker-staleness")
+@click.argument("dockerfiles", nargs=-1)
+@click.option(
+    "--dockerfiles-json",
+    default=None,
+    help="JSON list of Dockerfiles, e.g. the matched_files_json output of changed-files.",
+)
+@click.option(
+    "--namespace",
+    "dockerhub_namespace",
+    default="nciccbr",
+    show_default=True,
+    help="Docker Hub namespace/org.",
+)
+@click.option(
+    "--suffix",
+    default="feat",
+    show_default=True,
+    help='Suffix for the image tags, e.g. "dev" or "main".',
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of Dockerfiles evaluated at the same time.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["matrix", "table", "json"]),
+    default="matrix",
+    show_default=True,
+    help="Print the matrix of stale images, or every result as a table or JSON.",
+)
+@click.option(
+    "--set-output",
+    "output_name",
+    default=None,
+    help="Also write the matrix to this GitHub Actions output, and the number of stale images to OUTPUT_count.",
+)
+@click.option(
+    "--staleness-mode",
+    type=click.Choice(["timestamp", "content"]),
+    default="timestamp",
+    show_default=True,
+    help="Compare Dockerfile commit times with tag update times, or build context digests with image labels.",
+)
+@click.option(
+    "--git-cache",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Directory to keep the index of Dockerfile commit times in between runs.",
+)
+@click.option(
+    "--tag-cache",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Directory to keep Docker Hub tag listings in for CCBR_ACTIONS_DOCKERHUB_TTL seconds.",
+)
+def docker_staleness(
+    dockerfiles,
+    dockerfiles_json,
+    dockerhub_namespace,
+    suffix,
+    max_workers,
+    output_format,
+    output_name,
+    staleness_mode,
+    git_cache,
+    tag_cache,
+):
+    """
+    Find which of many Dockerfiles need their images built.
+
+    Prints a GitHub Actions matrix with an `include` entry for each image whose
+    Dockerfile changed after its Docker Hub tag was last updated, or whose tag
+    does not exist.
+
+    \b
+    Args:
+        dockerfiles (str): Paths to Dockerfiles in the repository.
+
+    \b
+    Examples:
+        ccbr_actions docker-staleness bwa/Dockerfile.v1 star/Dockerfile.v2 --suffix dev
+        ccbr_actions docker-staleness --dockerfiles-json '["bwa/Dockerfile.v1"]' --set-output matrix
+    """
+    import json
+
+    from .actions import OutputWriter
+    from .docker import (
+        DockerHubTagIndex,
+        GitPathTimestampIndex,
+        docker_build_matrix,
+        evaluate_docker_build_staleness_many,
+    )
+    from .github import GitHubClient
+    from .util import format_table
+
+    dockerfiles = list(dockerfiles)
+    if dockerfiles_json:
+        dockerfiles.extend(json.loads(dockerfiles_json))
+    git_index = GitPathTimestampIndex(cache_dir=git_cache)
+    with GitHubClient(pool_maxsize=max_workers) as client:
+        results = evaluate_docker_build_staleness_many(
+            list(dict.fromkeys(dockerfiles)),
+            dockerhub_namespace=dockerhub_namespace,
+            suffix=suffix,
+            max_workers=max_workers,
+            session=client,
+            git_index=git_index,
+            tag_index=DockerHubTagIndex(session=client, cache_dir=tag_cache),
+            staleness_mode=staleness_mode,
+        )
+    git_index.save()
+    matrix = docker_build_matrix(results)
+    if output_format == "matrix":
+        click.echo(json.dumps(matrix))
+    elif output_format == "json":
+        click.echo(json.dumps(results, indent=2))
+    else:
+        click.echo(
+            format_table(
+                results, ["dockerfile", "image_name", "should_build", "reason"]
+            )
+        )
+    if output_name:
+        with OutputWriter() as writer:
+            writer.set_output(output_name, json.dumps(matrix))
+            writer.set_output(f"{output_name}_count", len(matrix["include"]))
+
+
+cli.add_command(docker_staleness)
+
+
+@click.command(name="docker-plan")
+@click.argument("dockerfiles", nargs=-1)
+@click.option(
+    "--dockerfiles-json",
+    default=None,
+    help="JSON list of Dockerfiles, e.g. the matched_files_json output of changed-files.",
+)
+@click.option(
+    "--search-dir",
+    type=click.Path(exists=True, file_okay=False),
+    default=".",
+    show_default=True,
+    help="Directory to find all Dockerfile.* files in, to build dependents of stale images.",
+)
+@click.option(
+    "--namespace",
+    "dockerhub_namespace",
+    default="nciccbr",
+    show_default=True,
+    help="Docker Hub namespace/org.",
+)
+@click.option(
+    "--suffix",
+    default="feat",
+    show_default=True,
+    help='Suffix for the image tags, e.g. "dev" or "main".',
+)
+@click.option(
+    "--evaluate/--no-evaluate",
+    default=False,
+    show_default=True,
+    help="Only plan the given Dockerfiles whose Docker Hub tags are stale, and their dependents.",
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of Dockerfiles evaluated at the same time.",
+)
+@click.option(
+    "--set-output",
+    "output_name",
+    default=None,
+    help="Also write the plan to this GitHub Actions output, and the number of waves to OUTPUT_waves.",
+)
+def docker_plan(
+    dockerfiles,
+    dockerfiles_json,
+    search_dir,
+    dockerhub_namespace,
+    suffix,
+    evaluate,
+    max_workers,
+    output_name,
+):
+    """
+    Plan Docker builds in waves so that base images are built first.
+
+    Prints a JSON plan whose `waves` are GitHub Actions matrices. Images in
+    the same wave do not depend on each other and can be built in parallel.
+    The given Dockerfiles (or all of them, if none are given) are built,
+    along with every Dockerfile under the search directory that is built
+    `FROM` one of their images.
+
+    \b
+    Args:
+        dockerfiles (str): Paths to Dockerfiles that need building.
+
+    \b
+    Examples:
+        ccbr_actions docker-plan
+        ccbr_actions docker-plan --dockerfiles-json '["base/Dockerfile.v1"]' --evaluate --set-output plan
+    """
+    import json
+    import pathlib
+
+    from .actions import OutputWriter
+    from .docker import evaluate_docker_build_staleness_many, plan_docker_builds
+
+    requested = list(dockerfiles)
+    if dockerfiles_json:
+        requested.extend(json.loads(dockerfiles_json))
+    requested = list(dict.fromkeys(requested))
+    all_dockerfiles = sorted(
+        str(path)
+        for path in pathlib.Path(search_dir).rglob("Dockerfile.*")
+        if path.is_file() and path.suffix != ".dockerignore"
+    )
+    stale = None
+    if evaluate:
+        results = evaluate_docker_build_staleness_many(
+            requested or all_dockerfiles,
+            dockerhub_namespace=dockerhub_namespace,
+            suffix=suffix,
+            max_workers=max_workers,
+        )
+        stale = {
+            result["dockerfile"]: result["reason"]
+            for result in results
+            if result["should_build"] == "true"
+        }
+    elif requested:
+        stale = {dockerfile: "requested" for dockerfile in requested}
+    plan = plan_docker_builds(
+        all_dockerfiles,
+        stale=stale,
+        dockerhub_namespace=dockerhub_namespace,
+        suffix=suffix,
+    )
+    click.echo(json.dumps(plan, indent=2))
+    if output_name:
+        with OutputWriter() as writer:
+            writer.set_output(output_name, json.dumps(plan))
+            writer.set_output(f"{output_name}_waves", len(plan["waves"]))
+
+
+cli.add_command(docker_plan)
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    default=None,
+    help="Unix socket to listen on. Defaults to $CCBR_ACTIONS_SOCKET or $RUNNER_TEMP/ccbr_actions.sock.",
+)
+@click.option(
+    "--idle-timeout",
+    default=600.0,
+    show_default=True,
+    type=float,
+    help="Stop after this many seconds without a call.",
+)
+@click.option(
+    "--detach",
+    is_flag=True,
+    help="Start the server in the background and return once it is listening.",
+)
+@click.option("--stop", is_flag=True, help="Stop a running server.")
+def serve(socket_path, idle_timeout, detach, stop):
+    """
+    Serve `ccbr_actions call` requests from a long-lived process.
+
+    Composite actions start the server in their first step so that later steps
+    reuse imported modules and HTTP connections instead of starting Python again.
+
+    \b
+    Examples:
+        ccbr_actions serve --detach
+        ccbr_actions call set_output --json '{"name": "VERSION", "value": "1.0.0"}'
+        ccbr_actions serve --stop
+    """
+    from . import server
+
+    if stop:
+        server.shutdown(socket_path)
+    elif detach:
+        pid = server.start_server(socket_path, idle_timeout)
+        click.echo(
+            f"ccbr_actions server {pid} listening on {socket_path or server.default_socket_path()}"
+        )
+    else:
+        server.serve(socket_path, idle_timeout)
+
+
+cli.add_command(serve)
+
+
+@click.command(name="call")
+@click.argument("function")
+@click.option(
+    "--json",
+    "json_args",
+    default="{}",
+    help="Keyword arguments as a JSON object.",
+)
+@click.option(
+    "--arg",
+    "args",
+    multiple=True,
+    metavar="KEY=VALUE",
+    help="String keyword argument. Can be repeated, and overrides --json.",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    default=None,
+    help="Unix socket of the server. Defaults to $CCBR_ACTIONS_SOCKET or $RUNNER_TEMP/ccbr_actions.sock.",
+)
+@click.option(
+    "--no-fallback",
+    is_flag=True,
+    help="Fail instead of running in this process when no server is listening.",
+)
+def call_cmd(function, json_args, args, socket_path, no_fallback):
+    """
+    Call a function through a running `ccbr_actions serve` process.
+
+    The function runs with this step's environment variables and working
+    directory, so outputs go to this step's $GITHUB_OUTPUT and $GITHUB_ENV.
+
+    \b
+    Examples:
+        ccbr_actions call set_docs_version --json '{"repo": "CCBR/actions"}'
+        ccbr_actions call prepare_docker_build_variables --arg dockerfile=Dockerfile --arg suffix=dev --arg dockerhub_account=nciccbr
+    """
+    import json
+
+    from .server import call
+
+    try:
+        kwargs = json.loads(json_args)
+    except json.JSONDecodeError as e:
+        raise click.BadParameter(str(e), param_hint="--json")
+    if not isinstance(kwargs, dict):
+        raise click.BadParameter("Expected a JSON object.", param_hint="--json")
+    for arg in args:
+        if "=" not in arg:
+            raise click.BadParameter(f"Expected KEY=VALUE: {arg}", param_hint="--arg")
+        key, value = arg.split("=", 1)
+        kwargs[key] = value
+    try:
+        response = call(function, kwargs, socket_path, fallback=not no_fallback)
+    except ConnectionError as e:
+        raise click.ClickException(str(e))
+    if not response["ok"]:
+        raise click.ClickException(response["error"].rstrip())
+
+
+cli.add_command(call_cmd)
+
+
 def main():
     """Run the Click CLI entry point."""
     cli()
@@ -2,17 +2,268 @@
 Download and use GitHub Actions workflow files.
 """
 
+import concurrent.futures
+import hashlib
+import json
 import os
 import pathlib
+import re
 import requests
-import uuid
+import time
 import warnings
 
-from .github import GITHUB_API_URL, github_api_headers, github_api_post
-from .util import path_resolve
+from .github import (
+    GITHUB_API_URL,
+    GitHubClient,
+    atomic_write,
+    cache_root,
+    github_api_headers,
+    github_api_post,
+)
+from .util import path_resolve, repo_base
+from .data import get_example_path, read_examples_index
 from .versions import get_latest_release_tag
 
 
+GITHUB_FILE_VARIABLES = {
+    "output": "GITHUB_OUTPUT",
+    "env": "GITHUB_ENV",
+    "summary": "GITHUB_STEP_SUMMARY",
+}
+
+
+class OutputWriter:
+    """
+    Collect GitHub Actions outputs, environment variables, and step summary
+    text, and write each file once.
+
+    Entries are buffered in memory and written with a single `os.write` per
+    file when the context exits without an error, or when
+    [](`~ccbr_actions.actions.OutputWriter.flush`) is called. Values stored in files are streamed in chunks when flushed instead
+    of being read into memory.
+
+    Outputs and multi-line values use the `name<<DELIMITER` syntax. One random
+    delimiter is chosen per writer, and a new one is chosen for any value that
+    contains it. Single-line environment variables are written as `NAME=value`.
+
+    Args:
+        github_output (str, optional): Path of the outputs file. Defaults to `$GITHUB_OUTPUT`.
+        github_env (str, optional): Path of the environment file. Defaults to `$GITHUB_ENV`.
+        github_step_summary (str, optional): Path of the step summary file.
+            Defaults to `$GITHUB_STEP_SUMMARY`.
+        chunk_size (int): Bytes read at a time from file-backed values.
+
+    Examples:
+        >>> with OutputWriter() as writer:
+        ...     writer.set_output("VERSION", "1.0.0")
+        ...     writer.set_env("IMAGENAME", "nciccbr/ccbr_bwa:v1")
+        ...     writer.add_summary("Built `nciccbr/ccbr_bwa:v1`")
+        ...     writer.set_output_from_file("changed_files", "changed_files.txt")
+    """
+
+    def __init__(
+        self,
+        github_output=None,
+        github_env=None,
+        github_step_summary=None,
+        chunk_size=1 << 20,
+    ):
+        self.paths = {
+            "output": github_output,
+            "env": github_env,
+            "summary": github_step_summary,
+        }
+        self.chunk_size = chunk_size
+        self._pending = {kind: [] for kind in GITHUB_FILE_VARIABLES}
+        self._token = os.urandom(8).hex()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # leave outputs unwritten rather than hide the error with a partial flush
+        if exc_type is None:
+            self.flush()
+
+    def delimiter(self, value):
+        """
+        Choose a heredoc delimiter that does not occur in a value.
+
+        Args:
+            value (str): The value.
+
+        Returns:
+            str: The delimiter.
+        """
+        return self._free_delimiter(lambda delimiter: delimiter in value)
+
+    def _free_delimiter(self, collides):
+        attempt = 0
+        delimiter = f"ghadelimiter_{self._token}"
+        while collides(delimiter):
+            attempt += 1
+            delimiter = f"ghadelimiter_{self._token}_{attempt}"
+        return delimiter
+
+    def _add_value(self, kind, name, value):
+        validate_variable_name(name)
+        value = str(value)
+        if kind == "env" and "\n" not in value and "\r" not in value:
+            entry = f"{name}={value}\n"
+        else:
+            delimiter = self.delimiter(value)
+            entry = f"{name}<<{delimiter}\n{value}\n{delimiter}\n"
+        self._pending[kind].append(entry.encode())
+
+    def _add_file(self, kind, name, path):
+        validate_variable_name(name)
+        path = pathlib.Path(path)
+        self._pending[kind].append((name, path))
+
+    def set_output(self, name, value):
+        """
+        Add a step output, available as `${{ steps.<step_id>.outputs.<name> }}`.
+
+        Args:
+            name (str): The name of the output.
+            value (str): The value of the output.
+        """
+        self._add_value("output", name, value)
+
+    def set_env(self, name, value):
+        """
+        Add an environment variable for the following steps of the job.
+
+        Args:
+            name (str): The name of the variable.
+            value (str): The value of the variable.
+        """
+        self._add_value("env", name, value)
+
+    def set_output_from_file(self, name, path):
+        """
+        Add a step output whose value is the content of a file.
+
+        The file is read in chunks when the writer is flushed.
+
+        Args:
+            name (str): The name of the output.
+            path (str): Path of the file holding the value.
+        """
+        self._add_file("output", name, path)
+
+    def set_env_from_file(self, name, path):
+        """
+        Add an environment variable whose value is the content of a file.
+
+        The file is read in chunks when the writer is flushed.
+
+        Args:
+            name (str): The name of the variable.
+            path (str): Path of the file holding the value.
+        """
+        self._add_file("env", name, path)
+
+    def add_summary(self, markdown):
+        """
+        Add Markdown to the job summary.
+
+        Args:
+            markdown (str): Markdown text. A trailing newline is added if missing.
+        """
+        markdown = str(markdown)
+        if not markdown.endswith("\n"):
+            markdown += "\n"
+        self._pending["summary"].append(markdown.encode())
+
+    def flush(self):
+        """
+        Write all pending entries and clear them.
+
+        Raises:
+            RuntimeError: If entries are pending for a file whose path is not
+                given and whose environment variable is not set.
+        """
+        for kind, entries in self._pending.items():
+            if entries:
+                variable = GITHUB_FILE_VARIABLES[kind]
+                path = self.paths[kind] or os.environ.get(variable)
+                if not path:
+                    raise RuntimeError(
+                        f"{variable} is not set. GitHub Actions files can only be "
+                        "written when running in a GitHub Actions environment."
+                    )
+                self._write_entries(path, entries)
+                self._pending[kind] = []
+
+    def _write_entries(self, path, entries):
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            buffer = bytearray()
+            for entry in entries:
+                if isinstance(entry, bytes):
+                    buffer += entry
+                else:
+                    name, value_path = entry
+                    ends_with_newline, delimiter = self._scan_file(value_path)
+                    buffer += f"{name}<<{delimiter}\n".encode()
+                    _write_all(fd, buffer)
+                    buffer = bytearray()
+                    self._stream_file(fd, value_path)
+                    newline = "" if ends_with_newline else "\n"
+                    buffer += f"{newline}{delimiter}\n".encode()
+            _write_all(fd, buffer)
+        finally:
+            os.close(fd)
+
+    def _iter_chunks(self, path):
+        with open(path, "rb") as handle:
+            chunk = handle.read(self.chunk_size)
+            while chunk:
+                yield chunk
+                chunk = handle.read(self.chunk_size)
+
+    def _scan_file(self, path):
+        """Find whether a file ends with a newline and a delimiter not in it."""
+        base = f"ghadelimiter_{self._token}".encode()
+        found = set()
+        tail = b""
+        for chunk in self._iter_chunks(path):
+            window = tail + chunk
+            found.update(
+                match.group()
+                for match in re.finditer(re.escape(base) + rb"(?:_\d+)?", window)
+            )
+            tail = window[-(len(base) + 24) :]
+        delimiter = self._free_delimiter(lambda candidate: candidate.encode() in found)
+        return tail.endswith(b"\n") or not tail, delimiter
+
+    def _stream_file(self, fd, path):
+        for chunk in self._iter_chunks(path):
+            _write_all(fd, chunk)
+
+
+def _write_all(fd, data):
+    """Write bytes to a file descriptor, retrying after partial writes."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def validate_variable_name(name):
+    """
+    Check that a name can be used for a GitHub Actions output or environment variable.
+
+    Args:
+        name (str): The name.
+
+    Raises:
+        ValueError: If the name is empty or contains `=` or a newline.
+    """
+    if not name or any(char in name for char in "=\r\n"):
+        raise ValueError(f"Invalid output or environment variable name: {name!r}")
+
+
 def set_output(name, value, environ="GITHUB_OUTPUT"):
     """
     Set a GitHub Actions output variable.
@@ -20,6 +271,8 @@ def set_output(name, value, environ="GITHUB_OUTPUT"):
     Write the given name and value to the GitHub Actions
     environment file specified by the `GITHUB_OUTPUT` environment variable.
     You can then access the variable in GitHub Actions using `${{ steps.<step_id>.outputs.<name> }}`.
+    To set several outputs, use [](`~ccbr_actions.actions.OutputWriter`),
+    which writes them all at once.
 
     Args:
         name (str): The name of the output variable to set.
@@ -37,11 +290,8 @@ def set_output(name, value, environ="GITHUB_OUTPUT"):
     """
     output_file = os.environ.get(environ)
     if output_file:
-        with open(output_file, "a") as fh:
-            delimiter = uuid.uuid1()
-            print(f"{name}<<{delimiter}", file=fh)
-            print(value, file=fh)
-            print(delimiter, file=fh)
+        with OutputWriter(github_output=output_file) as writer:
+            writer.set_output(name, value)
     else:
         raise RuntimeError(
             f"{environ} is not set. set_output() is only supported when "
@@ -49,7 +299,194 @@ def set_output(name, value, environ="GITHUB_OUTPUT"):
         )
 
 
-def use_github_action(name, ref=None, url=None, save_as=None, repo="CCBR/actions"):
+IMMUTABLE_REF_PATTERN = re.compile(r"^(?:[0-9a-f]{40}|v?\d+\.\d+\.\d+\S*)$")
+
+
+def is_immutable_ref(ref):
+    """
+    Check whether a git reference is treated as immutable: a full commit SHA or a release tag.
+
+    Args:
+        ref (str): The git reference.
+
+    Returns:
+        bool: Whether files at `ref` can be cached indefinitely.
+
+    Examples:
+        >>> is_immutable_ref("v1.2.3")
+        True
+        >>> is_immutable_ref("main")
+        False
+    """
+    return bool(IMMUTABLE_REF_PATTERN.match(ref or ""))
+
+
+class ExampleCache:
+    """
+    On-disk cache of example workflow files and latest release tags.
+
+    Files at immutable refs (see [](`~ccbr_actions.actions.is_immutable_ref`))
+    are stored once by the SHA-256 of their content, with an index entry for
+    each `(repo, ref, filename)`. The latest release tag of each repository is
+    remembered for `tag_ttl` seconds.
+
+    Args:
+        directory (str, optional): Cache directory. Defaults to the `examples`
+            subdirectory of [](`~ccbr_actions.github.cache_root`).
+        tag_ttl (float, optional): Seconds to remember the latest release tag.
+            Defaults to `CCBR_ACTIONS_TAG_TTL` or one hour.
+        clock (callable): Returns the current time in seconds.
+    """
+
+    def __init__(self, directory=None, tag_ttl=None, clock=time.time):
+        self.directory = pathlib.Path(directory or cache_root() / "examples")
+        self.tag_ttl = float(
+            os.environ.get("CCBR_ACTIONS_TAG_TTL", "3600")
+            if tag_ttl is None
+            else tag_ttl
+        )
+        self.clock = clock
+
+    def _index_path(self, repo, ref, filename):
+        key = hashlib.sha256(f"{repo}\0{ref}\0{filename}".encode()).hexdigest()
+        return self.directory / "refs" / key
+
+    def load(self, repo, ref, filename):
+        """
+        Get a cached file.
+
+        Args:
+            repo (str): The GitHub repository.
+            ref (str): The git reference.
+            filename (str): The file name in the `examples` directory.
+
+        Returns:
+            str: The file content, or None if it is not cached.
+        """
+        text = None
+        try:
+            digest = self._index_path(repo, ref, filename).read_text().strip()
+            text = (self.directory / "blobs" / digest).read_text()
+        except OSError:
+            text = None
+        return text
+
+    def store(self, repo, ref, filename, text):
+        """
+        Cache a file. Does nothing unless `ref` is immutable.
+
+        Args:
+            repo (str): The GitHub repository.
+            ref (str): The git reference.
+            filename (str): The file name in the `examples` directory.
+            text (str): The file content.
+        """
+        if is_immutable_ref(ref):
+            content = text.encode()
+            digest = hashlib.sha256(content).hexdigest()
+            index_path = self._index_path(repo, ref, filename)
+            blob_path = self.directory / "blobs" / digest
+            for path in (index_path, blob_path):
+                path.parent.mkdir(parents=True, exist_ok=True)
+            if not blob_path.exists():
+                atomic_write(blob_path, content)
+            atomic_write(index_path, digest.encode())
+
+    def latest_release_tag(self, repo):
+        """
+        Get the latest release tag of a repository, remembered for `tag_ttl` seconds.
+
+        Args:
+            repo (str): The GitHub repository.
+
+        Returns:
+            str: The tag, or an empty string if the repository has no releases.
+        """
+        tags_path = self.directory / "latest_tags.json"
+        try:
+            tags = json.loads(tags_path.read_text())
+        except (OSError, ValueError):
+            tags = {}
+        entry = tags.get(repo)
+        now = self.clock()
+        if not entry or now - entry["time"] >= self.tag_ttl:
+            entry = {"tag": get_latest_release_tag(repo=repo) or "", "time": now}
+            tags[repo] = entry
+            tags_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(tags_path, json.dumps(tags).encode())
+        return entry["tag"]
+
+
+def is_bundled_example(name, ref=None, repo="CCBR/actions"):
+    """
+    Check whether an example workflow can be used from the copy bundled with the package.
+
+    The bundled examples match the release of the installed package, so they
+    are used when no `ref` is given or when `ref` is that release.
+
+    Args:
+        name (str): The name of the example, without `.yml`.
+        ref (str, optional): The requested git reference.
+        repo (str): The GitHub repository of the examples.
+
+    Returns:
+        bool: Whether the bundled example can be used.
+    """
+    version = repo_base("VERSION").read_text().strip()
+    return (
+        repo == "CCBR/actions"
+        and ref in (None, "", version, f"v{version}")
+        and name in read_examples_index()
+    )
+
+
+def fetch_example(
+    name, ref, repo="CCBR/actions", url=None, session=requests, cache=None
+):
+    """
+    Get the content of an example workflow file, from the cache when possible.
+
+    Args:
+        name (str): The name of the example workflow, without `.yml`.
+        ref (str): The git reference to download from.
+        repo (str): The GitHub repository with the examples.
+        url (str, optional): Download from this URL instead. Bypasses the cache.
+        session: Object with a requests-compatible `get` method.
+        cache (ExampleCache, optional): Cache for files at immutable refs.
+
+    Returns:
+        str: The file content.
+
+    Raises:
+        FileNotFoundError: If the file cannot be downloaded.
+    """
+    filename = f"{name}.yml"
+    use_cache = cache is not None and not url
+    text = cache.load(repo, ref, filename) if use_cache else None
+    if text is None:
+        url = (
+            url or f"https://raw.githubusercontent.com/{repo}/{ref}/examples/{filename}"
+        )
+        response = session.get(url)
+        if response.status_code != 200:
+            raise FileNotFoundError(
+                f"Failed to download {url}. Are you sure {name} is a valid GitHub Action in {repo}?"
+            )
+        text = response.text
+        if use_cache:
+            cache.store(repo, ref, filename, text)
+    return text
+
+
+def use_github_action(
+    name,
+    ref=None,
+    url=None,
+    save_as=None,
+    repo="CCBR/actions",
+    session=requests,
+    cache=None,
+):
     """
     Download an example GitHub Actions workflow file from CCBR/actions.
 
@@ -57,47 +494,115 @@ def use_github_action(name, ref=None, url=None, save_as=None, repo="CCBR/actions
 
     Args:
         name (str): The name of the GitHub Actions workflow file to download.
-        ref (str, optional): The git reference (branch, tag, or commit SHA) to use. Defaults to None, in which case the latest release or "main" is used.
+        ref (str, optional): The git reference (branch, tag, or commit SHA) to use. Defaults to None, in which case the bundled copy, the latest release, or "main" is used.
         url (str, optional): The URL to download the workflow file from. Defaults to building it based on the repo and ref.
         save_as (str, optional): The path to save the downloaded workflow file. Defaults to building it based on .github/workflows/name.yml.
         repo (str, optional): The GitHub repository to download the workflow file from. Defaults to "CCBR/actions".
+        session: Object with a requests-compatible `get` method. Defaults to the `requests` module.
+        cache (ExampleCache, optional): Cache of files and latest release tags.
+            Defaults to a new [](`~ccbr_actions.actions.ExampleCache`).
+
+    Returns:
+        pathlib.Path: The path of the saved workflow file.
 
     See Also:
         [](`~ccbr_actions.versions.get_latest_release_tag`): Get the latest release tag from a GitHub repository.
         [](`~ccbr_actions.docs.get_docs_version`): Get the documentation version and alias.
+        [](`~ccbr_actions.actions.use_github_actions`): Download several workflow files at once.
 
     Notes:
         If `ref` is not provided, the latest release tag is used (if available) or main.
         If `url` is not provided, the URL is constructed based on the repository and reference.
         If `save_as` is not provided, the file is saved in the `.github/workflows` directory.
+        Without `ref`, or with the release of the installed package, the copy
+        bundled with the package is used and no network is needed, see
+        [](`~ccbr_actions.actions.is_bundled_example`).
+        Files at other release tags and commit SHAs are cached, see [](`~ccbr_actions.actions.ExampleCache`).
 
     Examples:
         >>> use_github_action("docs-mkdocs")
         >>> use_github_action("docs-mkdocs", ref="v1.0.0")
         >>> use_github_action("docs-mkdocs", save_as="custom/path/example-action.yml")
     """
-    filename = f"{name}.yml"
-    if not ref:
-        latest_release = get_latest_release_tag(repo=repo)
-        ref = latest_release if latest_release else "main"
-    if not url:
-        url = f"https://raw.githubusercontent.com/{repo}/{ref}/examples/{filename}"
+    if not url and is_bundled_example(name, ref, repo):
+        text = get_example_path(name).read_text()
+    else:
+        cache = ExampleCache() if cache is None else cache
+        ref = ref or cache.latest_release_tag(repo) or "main"
+        text = fetch_example(
+            name, ref, repo=repo, url=url, session=session, cache=cache
+        )
     save_as = (
         path_resolve(save_as)
         if save_as
-        else pathlib.Path(".github") / "workflows" / filename
+        else pathlib.Path(".github") / "workflows" / f"{name}.yml"
     )
     # make directories
     save_as.parent.mkdir(parents=True, exist_ok=True)
+    with open(save_as, "w") as outfile:
+        outfile.write(text)
+    return save_as
 
-    response = requests.get(url)
-    if response.status_code == 200:
-        with open(save_as, "w") as outfile:
-            outfile.write(response.text)
-    else:
-        raise FileNotFoundError(
-            f"Failed to download {url}. Are you sure {name} is a valid GitHub Action in {repo}?"
-        )
+
+def use_github_actions(
+    names, ref=None, repo="CCBR/actions", max_workers=8, session=None, cache=None
+):
+    """
+    Download several example GitHub Actions workflow files concurrently.
+
+    Bundled examples are copied from the package. For the others, the latest
+    release tag is resolved once, and all files are downloaded over one
+    pooled session.
+
+    Args:
+        names (list[str]): The names of the workflow files to download.
+        ref (str, optional): The git reference to use. Defaults to the latest release or "main".
+        repo (str, optional): The GitHub repository to download from. Defaults to "CCBR/actions".
+        max_workers (int): Maximum number of concurrent downloads.
+        session: Object with a requests-compatible `get` method. Defaults to a new `requests.Session`.
+        cache (ExampleCache, optional): Cache of files and latest release tags.
+
+    Returns:
+        list[pathlib.Path]: The paths of the saved workflow files, in the order of `names`.
+
+    Raises:
+        FileNotFoundError: If any file cannot be downloaded. The other files are still saved.
+
+    Examples:
+        >>> use_github_actions(["build-nextflow", "docs-mkdocs", "auto-format"])
+    """
+    cache = ExampleCache() if cache is None else cache
+    bundled = {name for name in names if is_bundled_example(name, ref, repo)}
+    network_ref = ref
+    if not ref and set(names) - bundled:
+        network_ref = cache.latest_release_tag(repo) or "main"
+    owns_session = session is None
+    session = requests.Session() if owns_session else session
+
+    def download(name):
+        path, error = None, None
+        try:
+            path = use_github_action(
+                name,
+                ref=ref if name in bundled else network_ref,
+                repo=repo,
+                session=session,
+                cache=cache,
+            )
+        except FileNotFoundError as e:
+            error = e
+        return path, error
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(download, names))
+    finally:
+        if owns_session:
+            session.close()
+    errors = [str(error) for _, error in results if error]
+    if errors:
+        raise FileNotFoundError("\n".join(errors))
+    return [path for path, _ in results]
 
 
 def trigger_workflow(workflow_name, branch, repo, inputs=None, debug=False):
@@ -108,6 +613,9 @@ def trigger_workflow(workflow_name, branch, repo, inputs=None, debug=False):
         workflow_name (str): The name of the workflow to trigger.
         branch (str): The branch to trigger the workflow on.
         repo (str): The GitHub repository to trigger the workflow in.
+
+    See Also:
+        [](`~ccbr_actions.actions.trigger_workflows`): Trigger many workflows concurrently.
     """
     url = f"{GITHUB_API_URL}/repos/{repo}/actions/workflows/{workflow_name}/dispatches"
     token = os.environ.get("GITHUB_TOKEN")
@@ -124,3 +632,165 @@ def trigger_workflow(workflow_name, branch, repo, inputs=None, debug=False):
     else:
         result = url, headers, data
     return result
+
+
+DISPATCH_RESULT_COLUMNS = ["repo", "workflow", "ref", "status", "attempts", "error"]
+
+
+def parse_dispatch_matrix(matrix, defaults=None):
+    """
+    Read workflow dispatches from a JSON matrix.
+
+    Args:
+        matrix (str | list | dict): A list of dispatch objects, or a GitHub
+            Actions matrix with an `include` list, as JSON or already parsed.
+            Each dispatch has `repo`, `workflow`, `ref`, and optionally `inputs`.
+        defaults (dict, optional): Values for keys missing from a dispatch,
+            e.g. the same `workflow` for every entry.
+
+    Returns:
+        list[dict]: The dispatches.
+
+    Raises:
+        ValueError: If the matrix is not a list of objects or a dispatch lacks
+            `repo`, `workflow`, or `ref`.
+
+    Examples:
+        >>> parse_dispatch_matrix('{"include": [{"repo": "CCBR/dockers2", "inputs": {"dockerfile": "bwa/Dockerfile.v1"}}]}', {"workflow": "build-docker-manual.yml", "ref": "main"})
+        [{'workflow': 'build-docker-manual.yml', 'ref': 'main', 'repo': 'CCBR/dockers2', 'inputs': {'dockerfile': 'bwa/Dockerfile.v1'}}]
+    """
+    if isinstance(matrix, str):
+        matrix = json.loads(matrix)
+    if isinstance(matrix, dict):
+        matrix = matrix.get("include")
+    if not isinstance(matrix, list) or not all(isinstance(d, dict) for d in matrix):
+        raise ValueError(
+            "Expected a list of dispatch objects or a matrix with 'include'"
+        )
+    dispatches = [{**(defaults or {}), **dispatch} for dispatch in matrix]
+    incomplete = [
+        dispatch
+        for dispatch in dispatches
+        if not all(dispatch.get(key) for key in ("repo", "workflow", "ref"))
+    ]
+    if incomplete:
+        raise ValueError(f"Dispatches need 'repo', 'workflow', and 'ref': {incomplete}")
+    return dispatches
+
+
+def dispatch_workflow(dispatch, session, max_attempts=3, backoff=1.0):
+    """
+    Send one workflow dispatch, retrying connection errors.
+
+    Rate limited responses are already retried by the session's
+    [](`~ccbr_actions.github.RateLimitScheduler`). Server errors and read
+    timeouts are not retried, because GitHub may already have started the
+    workflow run.
+
+    Args:
+        dispatch (dict): `repo`, `workflow`, `ref`, and optionally `inputs`.
+        session (GitHubClient): Client used to send the request.
+        max_attempts (int): Maximum number of attempts for connection errors.
+        backoff (float): Seconds to wait before the second attempt, doubled after each attempt.
+
+    Returns:
+        dict: The dispatch's `repo`, `workflow`, and `ref`, with its `status`
+            (`dispatched` or `failed`), `status_code`, `attempts`, and `error`.
+    """
+    url = f"{GITHUB_API_URL}/repos/{dispatch['repo']}/actions/workflows/{dispatch['workflow']}/dispatches"
+    payload = {"ref": dispatch["ref"]}
+    if dispatch.get("inputs"):
+        payload["inputs"] = dispatch["inputs"]
+    result = {key: dispatch[key] for key in ("repo", "workflow", "ref")}
+    result.update(status="failed", status_code=None, attempts=0, error="")
+    is_done = False
+    while not is_done:
+        result["attempts"] += 1
+        try:
+            response = session.post(url, json=payload)
+            result["status_code"] = response.status_code
+            if response.status_code == 204:
+                result.update(status="dispatched", error="")
+            else:
+                result["error"] = f"HTTP {response.status_code}: {response.text}"
+            is_done = True
+        except requests.RequestException as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            is_done = (
+                not isinstance(e, requests.ConnectionError)
+                or result["attempts"] >= max_attempts
+            )
+            if not is_done:
+                time.sleep(backoff * 2 ** (result["attempts"] - 1))
+    return result
+
+
+def trigger_workflows(
+    dispatches,
+    token=None,
+    max_workers=8,
+    max_attempts=3,
+    session=None,
+    debug=False,
+):
+    """
+    Trigger many GitHub Actions workflow dispatches concurrently.
+
+    Dispatches are sent over one pooled [](`~ccbr_actions.github.GitHubClient`),
+    with at most `max_workers` in flight at a time.
+
+    Args:
+        dispatches (list[dict]): Dispatches with `repo`, `workflow`, `ref`, and
+            optionally `inputs`, see [](`~ccbr_actions.actions.parse_dispatch_matrix`).
+        token (str, optional): GitHub token. Defaults to the `GITHUB_TOKEN` environment variable.
+        max_workers (int): Maximum number of dispatches sent at the same time.
+        max_attempts (int): Maximum number of attempts per dispatch for connection errors.
+        session (GitHubClient, optional): Client used to send the requests.
+            Defaults to a new client for `token`.
+        debug (bool): If True, report the dispatches without sending them.
+
+    Returns:
+        list[dict]: One result per dispatch, in order, see
+            [](`~ccbr_actions.actions.dispatch_workflow`). In debug mode the
+            status is `debug`.
+
+    Examples:
+        >>> results = trigger_workflows([
+        ...     {"repo": "CCBR/dockers2", "workflow": "build-docker-manual.yml", "ref": "main", "inputs": {"dockerfile": "bwa/Dockerfile.v1"}},
+        ...     {"repo": "CCBR/dockers2", "workflow": "build-docker-manual.yml", "ref": "main", "inputs": {"dockerfile": "star/Dockerfile.v2"}},
+        ... ])
+        >>> [result["status"] for result in results]
+        ['dispatched', 'dispatched']
+    """
+    results = []
+    if debug:
+        results = [
+            {
+                **{key: dispatch[key] for key in ("repo", "workflow", "ref")},
+                "status": "debug",
+                "status_code": None,
+                "attempts": 0,
+                "error": "",
+            }
+            for dispatch in dispatches
+        ]
+    else:
+        owns_session = session is None
+        if owns_session:
+            session = GitHubClient(
+                token=token or os.environ.get("GITHUB_TOKEN"), pool_maxsize=max_workers
+            )
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(
+                    pool.map(
+                        lambda dispatch: dispatch_workflow(
+                            dispatch, session, max_attempts=max_attempts
+                        ),
+                        dispatches,
+                    )
+                )
+        finally:
+            if owns_session:
+                session.close()
+    return results
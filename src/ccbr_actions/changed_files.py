@@ -2,12 +2,29 @@
 Helpers for changed-files action matching logic.
 """
 
+import functools
 import json
+import os
+import pathlib
+import re
+import subprocess
+import tempfile
 
+import yaml
 from pathspec import GitIgnoreSpec
+from pathspec.util import normalize_file
 
 from .actions import set_output
-from .github import GITHUB_API_URL, github_api_get
+from .github import (
+    GITHUB_API_URL,
+    GitHubClient,
+    GitHubResponseCache,
+    github_api_get,
+    github_api_get_all_pages,
+)
+
+# The compare API lists at most this many files, with no way to page through the rest.
+COMPARE_FILES_LIMIT = 300
 
 
 def validate_comparison_mode(comparison_mode):
@@ -31,11 +48,91 @@ def validate_comparison_mode(comparison_mode):
     return comparison_mode
 
 
+def validate_comparison_engine(comparison_engine):
+    """
+    Validate the engine used to compute changed files.
+
+    Args:
+        comparison_engine (str): Engine name. ``api`` queries the GitHub API,
+            ``git`` runs ``git diff`` in the local checkout, and ``auto`` uses
+            git when both commits are already available locally.
+
+    Returns:
+        str: The validated comparison engine.
+
+    Raises:
+        ValueError: If the comparison engine is not recognized.
+    """
+    allowed_engines = {"api", "git", "auto"}
+    if comparison_engine not in allowed_engines:
+        raise ValueError(
+            f"Invalid comparison engine: {comparison_engine!r}. Must be one of: {sorted(allowed_engines)}"
+        )
+    return comparison_engine
+
+
+def validate_output_mode(output_mode):
+    """
+    Validate the output mode for changed-file lists.
+
+    Args:
+        output_mode (str): ``outputs`` to publish the file lists as step
+            outputs, or ``files`` to stream them to file artifacts and publish
+            only their paths and counts.
+
+    Returns:
+        str: The validated output mode.
+
+    Raises:
+        ValueError: If the output mode is not recognized.
+    """
+    allowed_modes = {"outputs", "files"}
+    if output_mode not in allowed_modes:
+        raise ValueError(
+            f"Invalid output mode: {output_mode!r}. Must be one of: {sorted(allowed_modes)}"
+        )
+    return output_mode
+
+
+def iter_file_list(changed_file_list):
+    r"""
+    Iterate over the file paths in a newline-separated file list.
+
+    Empty lines are skipped. Paths are yielded one at a time without
+    splitting the whole list into a new list first.
+
+    Args:
+        changed_file_list (str): Newline-separated file paths.
+
+    Yields:
+        str: Each non-empty file path.
+
+    Examples:
+        >>> list(iter_file_list("a.txt\n\nsubdir/b.txt\n"))
+        ['a.txt', 'subdir/b.txt']
+    """
+    for match in re.finditer(r"[^\n]+", changed_file_list):
+        yield match[0]
+
+
 def format_multiline_file_list(files):
     """Format a list of file paths as a newline-delimited string."""
     return "".join(f"{file}\n" for file in files)
 
 
+def changed_file_names_from_api(compare_payload):
+    """
+    Extract filenames from a GitHub compare API payload.
+
+    Args:
+        compare_payload (dict): Response JSON from the compare API.
+
+    Returns:
+        list[str]: The filenames.
+    """
+    return [file_info["filename"] for file_info in compare_payload.get("files", [])]
+
+
 def format_changed_files_from_api(compare_payload):
     """
     Extract filenames from a GitHub compare API payload.
@@ -46,23 +143,262 @@ def format_changed_files_from_api(compare_payload):
     Returns:
         str: Newline-separated filenames.
     """
-    files = [file_info["filename"] for file_info in compare_payload.get("files", [])]
-    return format_multiline_file_list(files)
+    return format_multiline_file_list(changed_file_names_from_api(compare_payload))
 
 
-def get_pull_request_changed_file_list(
+def is_compare_truncated(compare_payload):
+    """
+    Check whether a compare API payload may be missing changed files.
+
+    Args:
+        compare_payload (dict): Response JSON from the compare API.
+
+    Returns:
+        bool: True if the payload lists as many files as the compare API can return.
+    """
+    return len(compare_payload.get("files", [])) >= COMPARE_FILES_LIMIT
+
+
+def list_pull_request_files(repo, pr_number, token=None, session=None, max_workers=8):
+    """
+    List all files changed in a pull request.
+
+    Uses the pull request files endpoint, which returns up to 3000 files
+    (rather than the 300 of the compare API). Pages are fetched concurrently.
+
+    Args:
+        repo (str): Base repository full name.
+        pr_number (int or str): Pull request number.
+        token (str, optional): GitHub token.
+        session: Object with a requests-compatible ``get`` method.
+        max_workers (int): Maximum number of pages fetched at the same time.
+
+    Returns:
+        list[str]: Changed file paths.
+    """
+    files = github_api_get_all_pages(
+        url=f"{GITHUB_API_URL}/repos/{repo}/pulls/{pr_number}/files",
+        token=token,
+        session=session,
+        max_workers=max_workers,
+    )
+    return [file_info["filename"] for file_info in files]
+
+
+def list_commit_files(repo, sha, token=None, session=None, max_workers=8):
+    """
+    List all files changed in a single commit.
+
+    The commit endpoint pages its file list (300 files per page, up to 3000
+    files). Pages are fetched concurrently.
+
+    Args:
+        repo (str): Repository full name.
+        sha (str): Commit SHA.
+        token (str, optional): GitHub token.
+        session: Object with a requests-compatible ``get`` method.
+        max_workers (int): Maximum number of pages fetched at the same time.
+
+    Returns:
+        list[str]: Changed file paths.
+    """
+    files = github_api_get_all_pages(
+        url=f"{GITHUB_API_URL}/repos/{repo}/commits/{sha}",
+        token=token,
+        session=session,
+        per_page=None,
+        items_key="files",
+        max_workers=max_workers,
+    )
+    return [file_info["filename"] for file_info in files]
+
+
+def warn_compare_truncated(repo, basehead):
+    """Print a GitHub Actions warning that a compare result may be incomplete."""
+    print(
+        f"::warning::The comparison {repo} {basehead} lists {COMPARE_FILES_LIMIT} "
+        "or more files, which is the GitHub compare API limit. "
+        "The changed file list may be incomplete."
+    )
+
+
+def run_git(*args):
+    """
+    Run a git command in the current directory.
+
+    Args:
+        *args (str): Arguments passed to ``git``.
+
+    Returns:
+        subprocess.CompletedProcess: The completed process with text output captured.
+    """
+    return subprocess.run(["git", *args], capture_output=True, text=True, check=False)
+
+
+def is_git_work_tree():
+    """Check whether the current directory is inside a git work tree."""
+    return run_git("rev-parse", "--is-inside-work-tree").stdout.strip() == "true"
+
+
+def git_commit_exists(ref):
+    """
+    Check whether a commit is available in the local repository.
+
+    Args:
+        ref (str): Commit SHA or revision expression (e.g. ``sha^1``).
+
+    Returns:
+        bool: True if ``ref`` resolves to a local commit object.
+    """
+    return bool(ref) and run_git("cat-file", "-e", f"{ref}^{{commit}}").returncode == 0
+
+
+def git_merge_base_exists(base, head):
+    """Check whether ``base`` and ``head`` have a merge base in the local history."""
+    return run_git("merge-base", base, head).returncode == 0
+
+
+def git_fetch_commits(refs, remote="origin"):
+    """
+    Fetch commits that are missing from the local repository.
+
+    Uses a blobless partial fetch (``--filter=blob:none``), since listing
+    changed file names only needs commits and trees. When the fetched history
+    still lacks a merge base in a shallow clone, the clone is unshallowed with
+    the same filter.
+
+    Args:
+        refs (list[str]): Commit SHAs or revision expressions. A trailing
+            parent suffix such as ``^1`` is stripped before fetching.
+        remote (str): Remote to fetch from.
+    """
+    missing = sorted(
+        {ref.split("^", 1)[0] for ref in refs if not git_commit_exists(ref)}
+    )
+    if missing:
+        subprocess.run(
+            ["git", "fetch", "--no-tags", "--filter=blob:none", remote, *missing],
+            check=True,
+        )
+    is_shallow = run_git("rev-parse", "--is-shallow-repository").stdout.strip()
+    if is_shallow == "true" and not git_merge_base_exists(*refs):
+        subprocess.run(
+            [
+                "git",
+                "fetch",
+                "--no-tags",
+                "--filter=blob:none",
+                "--unshallow",
+                remote,
+            ],
+            check=True,
+        )
+
+
+def get_changed_file_list_from_git(base, head, fetch=True, remote="origin"):
+    """
+    Get changed files from the local checkout with a single ``git diff``.
+
+    Rename detection is turned off, since it would fetch the blobs of every
+    added and deleted file in a blobless clone. A renamed file is listed
+    under both its old and its new path.
+
+    Args:
+        base (str): Base commit SHA or revision expression.
+        head (str): Head commit SHA.
+        fetch (bool): Whether to fetch commits that are missing locally.
+        remote (str): Remote to fetch missing commits from.
+
+    Returns:
+        list[str]: Changed file paths.
+
+    Raises:
+        subprocess.CalledProcessError: If fetching or diffing fails.
+    """
+    if fetch:
+        git_fetch_commits([base, head], remote=remote)
+    output = subprocess.check_output(
+        [
+            "git",
+            "diff",
+            "--name-only",
+            "--no-renames",
+            "--no-ext-diff",
+            "-z",
+            f"{base}...{head}",
+        ],
+        text=True,
+    )
+    return [file for file in output.split("\0") if file]
+
+
+def get_truncated_push_file_list_from_git(repository, before, after, api_file_list):
+    """
+    Recover the complete file list for a push whose compare result was truncated.
+
+    Args:
+        repository (str): Repository full name.
+        before (str): Previous SHA for the push.
+        after (str): New SHA for the push.
+        api_file_list (list[str]): Truncated file list from the API.
+
+    Returns:
+        list[str]: Changed file paths from git, or ``api_file_list`` with a
+            warning when git cannot provide them.
+    """
+    changed_file_list = api_file_list
+    try:
+        if is_git_work_tree():
+            changed_file_list = get_changed_file_list_from_git(base=before, head=after)
+        else:
+            warn_compare_truncated(repository, f"{before}...{after}")
+    except subprocess.CalledProcessError:
+        warn_compare_truncated(repository, f"{before}...{after}")
+    return changed_file_list
+
+
+def git_comparison_range(
+    event_name, comparison_mode, before, after, pr_base_sha, pr_head_sha
+):
+    """
+    Get the base and head revisions that the API comparison would use.
+
+    Args:
+        event_name (str): GitHub event name.
+        comparison_mode (str): Comparison mode.
+        before (str): Previous SHA for push events.
+        after (str): New SHA for push events.
+        pr_base_sha (str): Base SHA for pull requests.
+        pr_head_sha (str): Head SHA for pull requests.
+
+    Returns:
+        tuple[str, str]: Base and head revisions.
+    """
+    base, head = before, after
+    if event_name == "pull_request":
+        head = pr_head_sha
+        base = f"{pr_head_sha}^1" if comparison_mode == "latest-commit" else pr_base_sha
+    return base, head
+
+
+def get_pull_request_changed_file_names(
     comparison_mode,
     pr_base_repo_full_name,
     pr_base_sha,
     pr_head_label,
     pr_head_repo_full_name,
     pr_head_sha,
+    pr_number="",
     token=None,
     session=None,
 ):
     """
     Get changed files for a pull request event.
 
+    When the compare API result hits its file limit, the complete list is
+    collected from the commit endpoint (``latest-commit`` mode) or the pull
+    request files endpoint (``event`` mode).
+
     Args:
         comparison_mode (str): Comparison mode.
         pr_base_repo_full_name (str): Base repository full name.
@@ -70,15 +406,18 @@ def get_pull_request_changed_file_list(
         pr_head_label (str): Pull request head label.
         pr_head_repo_full_name (str): Head repository full name.
         pr_head_sha (str): Head commit SHA.
+        pr_number (int or str, optional): Pull request number, used to list
+            files when the compare API result is truncated.
         token (str, optional): GitHub token.
-        session: Object with a requests-compatible ``get`` method.
+        session: Object with a requests-compatible ``get`` method, such as a
+            [](`~ccbr_actions.github.GitHubClient`).
 
     Returns:
-        str: Newline-separated changed files.
+        list[str]: Changed file paths.
     """
     comparison_mode = validate_comparison_mode(comparison_mode)
 
-    changed_files = ""
+    changed_files = []
     should_use_pr_compare = False
     if comparison_mode == "latest-commit":
         commit_payload = github_api_get(
@@ -100,23 +439,77 @@ def get_pull_request_changed_file_list(
                 token=token,
                 session=session,
             )
-            changed_files = format_changed_files_from_api(compare_payload)
+            if is_compare_truncated(compare_payload):
+                changed_files = list_commit_files(
+                    repo=pr_head_repo_full_name,
+                    sha=pr_head_sha,
+                    token=token,
+                    session=session,
+                )
+            else:
+                changed_files = changed_file_names_from_api(compare_payload)
         else:
             should_use_pr_compare = True
     else:
         should_use_pr_compare = True
 
     if should_use_pr_compare:
+        basehead = f"{pr_base_sha}...{pr_head_label}"
         compare_payload = github_api_get(
-            url=f"{GITHUB_API_URL}/repos/{pr_base_repo_full_name}/compare/{pr_base_sha}...{pr_head_label}",
+            url=f"{GITHUB_API_URL}/repos/{pr_base_repo_full_name}/compare/{basehead}",
             token=token,
             session=session,
         )
-        changed_files = format_changed_files_from_api(compare_payload)
+        if is_compare_truncated(compare_payload) and pr_number:
+            changed_files = list_pull_request_files(
+                repo=pr_base_repo_full_name,
+                pr_number=pr_number,
+                token=token,
+                session=session,
+            )
+        else:
+            if is_compare_truncated(compare_payload):
+                warn_compare_truncated(pr_base_repo_full_name, basehead)
+            changed_files = changed_file_names_from_api(compare_payload)
     return changed_files
 
 
-def get_changed_file_list(
+def get_pull_request_changed_file_list(
+    comparison_mode,
+    pr_base_repo_full_name,
+    pr_base_sha,
+    pr_head_label,
+    pr_head_repo_full_name,
+    pr_head_sha,
+    pr_number="",
+    token=None,
+    session=None,
+):
+    """
+    Get changed files for a pull request event as a newline-separated list.
+
+    See [](`~ccbr_actions.changed_files.get_pull_request_changed_file_names`)
+    for the arguments.
+
+    Returns:
+        str: Newline-separated changed files.
+    """
+    return format_multiline_file_list(
+        get_pull_request_changed_file_names(
+            comparison_mode=comparison_mode,
+            pr_base_repo_full_name=pr_base_repo_full_name,
+            pr_base_sha=pr_base_sha,
+            pr_head_label=pr_head_label,
+            pr_head_repo_full_name=pr_head_repo_full_name,
+            pr_head_sha=pr_head_sha,
+            pr_number=pr_number,
+            token=token,
+            session=session,
+        )
+    )
+
+
+def get_changed_file_names(
     event_name,
     comparison_mode="latest-commit",
     repository="",
@@ -127,11 +520,18 @@ def get_changed_file_list(
     pr_head_label="",
     pr_head_repo_full_name="",
     pr_head_sha="",
+    pr_number="",
+    comparison_engine="api",
     token=None,
     session=None,
 ):
     """
-    Get the changed file list for the current GitHub Actions event.
+    Get the changed file paths for the current GitHub Actions event.
+
+    With the ``git`` engine, no GitHub API requests are made: the file list
+    comes from one ``git diff --name-only`` in the local checkout, fetching
+    only missing commits. The ``auto`` engine uses git when both commits are
+    already available locally and the API otherwise.
 
     Args:
         event_name (str): GitHub event name.
@@ -144,22 +544,47 @@ def get_changed_file_list(
         pr_head_label (str): Head label for pull requests.
         pr_head_repo_full_name (str): Head repository full name.
         pr_head_sha (str): Head SHA for pull requests.
+        pr_number (int or str, optional): Pull request number.
+        comparison_engine (str): One of ``api``, ``git``, or ``auto``.
         token (str, optional): GitHub token.
-        session: Object with a requests-compatible ``get`` method.
+        session: Object with a requests-compatible ``get`` method, such as a
+            [](`~ccbr_actions.github.GitHubClient`).
 
     Returns:
-        str: Newline-separated changed files.
+        list[str]: Changed file paths.
     """
     comparison_mode = validate_comparison_mode(comparison_mode)
+    comparison_engine = validate_comparison_engine(comparison_engine)
 
-    if event_name == "pull_request":
-        changed_file_list = get_pull_request_changed_file_list(
+    base, head = git_comparison_range(
+        event_name=event_name,
+        comparison_mode=comparison_mode,
+        before=before,
+        after=after,
+        pr_base_sha=pr_base_sha,
+        pr_head_sha=pr_head_sha,
+    )
+    use_git = comparison_engine == "git" or (
+        comparison_engine == "auto"
+        and is_git_work_tree()
+        and git_commit_exists(base)
+        and git_commit_exists(head)
+        and git_merge_base_exists(base, head)
+    )
+
+    if use_git:
+        changed_files = get_changed_file_list_from_git(
+            base=base, head=head, fetch=comparison_engine == "git"
+        )
+    elif event_name == "pull_request":
+        changed_files = get_pull_request_changed_file_names(
             comparison_mode=comparison_mode,
             pr_base_repo_full_name=pr_base_repo_full_name,
             pr_base_sha=pr_base_sha,
             pr_head_label=pr_head_label,
             pr_head_repo_full_name=pr_head_repo_full_name,
             pr_head_sha=pr_head_sha,
+            pr_number=pr_number,
             token=token,
             session=session,
         )
@@ -169,9 +594,388 @@ def get_changed_file_list(
             token=token,
             session=session,
         )
-        changed_file_list = format_changed_files_from_api(compare_payload)
+        changed_files = changed_file_names_from_api(compare_payload)
+        if is_compare_truncated(compare_payload):
+            changed_files = get_truncated_push_file_list_from_git(
+                repository=repository,
+                before=before,
+                after=after,
+                api_file_list=changed_files,
+            )
 
-    return changed_file_list
+    return changed_files
+
+
+def get_changed_file_list(
+    event_name,
+    comparison_mode="latest-commit",
+    repository="",
+    before="",
+    after="",
+    pr_base_repo_full_name="",
+    pr_base_sha="",
+    pr_head_label="",
+    pr_head_repo_full_name="",
+    pr_head_sha="",
+    pr_number="",
+    comparison_engine="api",
+    token=None,
+    session=None,
+):
+    """
+    Get the changed file list for the current GitHub Actions event.
+
+    See [](`~ccbr_actions.changed_files.get_changed_file_names`) for the
+    arguments.
+
+    Returns:
+        str: Newline-separated changed files.
+    """
+    return format_multiline_file_list(
+        get_changed_file_names(
+            event_name=event_name,
+            comparison_mode=comparison_mode,
+            repository=repository,
+            before=before,
+            after=after,
+            pr_base_repo_full_name=pr_base_repo_full_name,
+            pr_base_sha=pr_base_sha,
+            pr_head_label=pr_head_label,
+            pr_head_repo_full_name=pr_head_repo_full_name,
+            pr_head_sha=pr_head_sha,
+            pr_number=pr_number,
+            comparison_engine=comparison_engine,
+            token=token,
+            session=session,
+        )
+    )
+
+
+# Literal path component in a gitignore pattern: no glob, escape, or whitespace characters.
+_LITERAL = r"[\w.+@=,%~:-]+"
+_SUFFIX_PATTERN = re.compile(rf"(?:\*\*/)?\*(\.{_LITERAL})")
+_NAME_PATTERN = re.compile(rf"(?:\*\*/)?({_LITERAL})(/?)")
+_ANCHORED_PATTERN = re.compile(rf"/?({_LITERAL}(?:/{_LITERAL})*)(/\*\*|/)?")
+_ANCHORED_PREFIX = re.compile(rf"/?((?:{_LITERAL}/)+)[^/]")
+# pathspec regex shape of patterns that match a single path component at any depth
+_COMPONENT_REGEX_START = "^(?:.+/)?"
+_COMPONENT_REGEX_END = "(?:(?P<ps_d>/)|$)"
+_DIR_MARK = "ps_d"
+
+# Match priorities used by GitIgnoreSpec: a pattern matching one of the
+# file's parent directories ranks below a pattern matching the file itself.
+_DIR_PRIORITY = 1
+_FILE_PRIORITY = 2
+
+
+def _suffix_key(name):
+    """Get the final extension (including the dot) used to index suffix patterns."""
+    dot = name.rfind(".")
+    return name[dot:] if dot >= 0 else None
+
+
+def _has_special_components(path):
+    """Check whether a literal pattern path contains ``.`` or ``..`` components."""
+    return bool(set(path.strip("/").split("/")) & {".", ".."})
+
+
+class _TrieNode:
+    """Node of a path-component trie holding anchored patterns."""
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []
+        self.regex_patterns = []
+
+
+class IndexedGitIgnoreMatcher:
+    """
+    Fast .gitignore-style matcher for very large file lists.
+
+    Patterns are indexed up front instead of being matched as regular
+    expressions against every path:
+
+    - anchored literal paths (``docs/api``, ``/src/``, ``data/**``) go into a
+      trie of path components, and anchored globs (``src/*.py``) are stored
+      at the trie node of their literal prefix, so they are only tried on
+      paths under that prefix,
+    - ``*.ext`` patterns go into a hash map keyed by extension,
+    - ``name`` and ``**/name`` patterns go into a hash map keyed by name,
+    - other single-component globs (``Dockerfile.*``) are matched against
+      individual path components.
+
+    Only the remaining patterns are matched against every path with their
+    ``pathspec`` regular expressions. Per-component and per-directory results
+    are memoized, so paths sharing directories or file names are cheap.
+
+    Results are identical to ``pathspec.GitIgnoreSpec``: whether a path is
+    included depends only on which patterns match it and whether each matched
+    the path itself or one of its parent directories. The first path with a
+    given combination is decided by ``GitIgnoreSpec`` and the decision is
+    reused for every later path with the same combination, so negation and
+    ordering behave exactly as in ``.gitignore``.
+
+    Args:
+        lines (list[str]): .gitignore-style pattern lines.
+
+    Examples:
+        >>> matcher = IndexedGitIgnoreMatcher(["*.md", "!docs/private.md"])
+        >>> matcher.match_file("docs/index.md"), matcher.match_file("docs/private.md")
+        (True, False)
+    """
+
+    def __init__(self, lines):
+        self.spec = GitIgnoreSpec.from_lines(lines)
+        self._trie = _TrieNode()
+        self._suffixes = {}
+        self._names = {}
+        self._component_patterns = []
+        self._regex_patterns = []
+        self._components = {}
+        self._directories = {}
+        self._decisions = {(): False}
+        for index, pattern in enumerate(self.spec.patterns):
+            if pattern.include is not None:
+                self._add_pattern(index, pattern)
+
+    def _add_pattern(self, index, pattern):
+        text = pattern.pattern.removeprefix("!")
+        regex = pattern.regex.pattern
+        suffix_match = _SUFFIX_PATTERN.fullmatch(text)
+        name_match = _NAME_PATTERN.fullmatch(text)
+        anchored_match = _ANCHORED_PATTERN.fullmatch(text)
+        prefix_match = _ANCHORED_PREFIX.match(text)
+        if suffix_match and _suffix_key(suffix_match[1]):
+            literal = suffix_match[1]
+            self._suffixes.setdefault(_suffix_key(literal), []).append((index, literal))
+        elif name_match and not _has_special_components(name_match[1]):
+            name, dir_only = name_match[1], bool(name_match[2])
+            self._names.setdefault(name, []).append((index, dir_only))
+        elif anchored_match and not _has_special_components(anchored_match[1]):
+            node = self._trie_node(anchored_match[1])
+            kind = {None: "path", "/": "dir", "/**": "contents"}[anchored_match[2]]
+            node.entries.append((index, kind))
+        elif (
+            "/" not in text.removeprefix("**/")
+            and regex.startswith(_COMPONENT_REGEX_START)
+            and regex.endswith(_COMPONENT_REGEX_END)
+        ):
+            self._component_patterns.append((index, pattern.regex))
+        elif (
+            prefix_match
+            and not text.startswith("**")
+            and not _has_special_components(prefix_match[1])
+        ):
+            node = self._trie_node(prefix_match[1].strip("/"))
+            node.regex_patterns.append((index, pattern))
+        else:
+            self._regex_patterns.append((index, pattern))
+
+    def _trie_node(self, path):
+        node = self._trie
+        for part in path.split("/"):
+            node = node.children.setdefault(part, _TrieNode())
+        return node
+
+    def _component_matches(self, component):
+        """
+        Find the component-level patterns matching one path component.
+
+        Returns:
+            tuple[tuple[int, bool]]: Pattern index and whether the pattern only
+                matches directories.
+        """
+        if component not in self._components:
+            found = list(self._names.get(component, ()))
+            found.extend(
+                (index, False)
+                for index, literal in self._suffixes.get(_suffix_key(component), ())
+                if component.endswith(literal)
+            )
+            found.extend(
+                (index, False)
+                for index, regex in self._component_patterns
+                if regex.match(component)
+            )
+            self._components[component] = tuple(found)
+        return self._components[component]
+
+    def _directory_matches(self, directory):
+        """
+        Find the matches contributed by a file's parent directory.
+
+        Returns:
+            tuple: Mapping of pattern index to priority, the trie node reached
+                for ``directory`` (or None), and the anchored glob patterns
+                collected along the way.
+        """
+        if directory not in self._directories:
+            found = {}
+            node = self._trie
+            regex_patterns = ()
+            if directory:
+                parent, _sep, component = directory.rpartition("/")
+                parent_found, parent_node, regex_patterns = self._directory_matches(
+                    parent
+                )
+                found = dict(parent_found)
+                for index, _dir_only in self._component_matches(component):
+                    found[index] = _DIR_PRIORITY
+                node = parent_node.children.get(component) if parent_node else None
+                for index, kind in node.entries if node else ():
+                    priority = _FILE_PRIORITY if kind == "contents" else _DIR_PRIORITY
+                    found[index] = max(priority, found.get(index, 0))
+                if node and node.regex_patterns:
+                    regex_patterns = regex_patterns + tuple(node.regex_patterns)
+            self._directories[directory] = (found, node, regex_patterns)
+        return self._directories[directory]
+
+    def _find_matches(self, file):
+        """
+        Find the patterns matching a normalized file path.
+
+        Returns:
+            dict[int, int]: Pattern index mapped to its match priority: whether
+                the pattern matched the path itself or one of its parent directories.
+        """
+        directory, _sep, basename = file.rpartition("/")
+        directory_found, node, anchored_patterns = self._directory_matches(directory)
+        found = dict(directory_found)
+        for index, dir_only in self._component_matches(basename):
+            if not dir_only:
+                found[index] = _FILE_PRIORITY
+        child = node.children.get(basename) if node else None
+        for index, kind in child.entries if child else ():
+            if kind == "path":
+                found[index] = _FILE_PRIORITY
+        for index, pattern in (*anchored_patterns, *self._regex_patterns):
+            result = pattern.match_file(file)
+            if result is not None:
+                dir_mark = result.match.groupdict().get(_DIR_MARK)
+                found[index] = _DIR_PRIORITY if dir_mark else _FILE_PRIORITY
+        return found
+
+    def match_file(self, file):
+        """
+        Check whether a file path matches the pattern set.
+
+        Args:
+            file (str): File path relative to the repository root.
+
+        Returns:
+            bool: True if the file is matched (and not negated by a later pattern).
+        """
+        norm_file = normalize_file(file)
+        signature = tuple(sorted(self._find_matches(norm_file).items()))
+        if signature not in self._decisions:
+            self._decisions[signature] = self.spec.match_file(norm_file)
+        return self._decisions[signature]
+
+    def match_files(self, files):
+        """
+        Filter file paths down to those matching the pattern set.
+
+        Args:
+            files (iterable[str]): File paths relative to the repository root.
+
+        Returns:
+            list[str]: Matching file paths, in input order.
+        """
+        return [file for file in files if self.match_file(file)]
+
+
+@functools.lru_cache(maxsize=128)
+def compile_path_spec(paths):
+    """
+    Compile a .gitignore-style pattern list, reusing previously compiled specs.
+
+    Compiled specs are kept in an LRU cache keyed by the pattern text, so
+    repeated calls with the same patterns in one process compile them once.
+
+    Args:
+        paths (str): .gitignore-style pattern list as a string.
+
+    Returns:
+        IndexedGitIgnoreMatcher: The compiled pattern set.
+    """
+    return IndexedGitIgnoreMatcher(paths.splitlines())
+
+
+def parse_path_groups(path_groups):
+    r"""
+    Parse named pattern groups from YAML text.
+
+    Each group maps a name to a .gitignore-style pattern list, given either
+    as a multi-line string or as a list of patterns.
+
+    Args:
+        path_groups (str or dict): YAML mapping of group names to patterns, or
+            an already parsed mapping.
+
+    Returns:
+        dict[str, str]: Mapping of group names to newline-separated patterns.
+
+    Raises:
+        ValueError: If the groups are not a mapping or a group name is not a
+            valid step output name.
+
+    Examples:
+        >>> parse_path_groups("docker: '**/Dockerfile.*'\ndocs: [docs/**, '*.md']")
+        {'docker': '**/Dockerfile.*', 'docs': 'docs/**\n*.md'}
+    """
+    groups = (
+        yaml.safe_load(path_groups) if isinstance(path_groups, str) else path_groups
+    )
+    groups = groups or {}
+    if not isinstance(groups, dict):
+        raise ValueError(
+            f"Path groups must be a mapping of group names to patterns. Got: {groups!r}"
+        )
+    invalid_names = [
+        name for name in groups if not re.fullmatch(r"[A-Za-z0-9_-]+", str(name))
+    ]
+    if invalid_names:
+        raise ValueError(
+            "Path group names may only contain letters, numbers, '-' and '_'. "
+            f"Invalid names: {invalid_names}"
+        )
+    return {
+        str(name): "\n".join(patterns) if isinstance(patterns, list) else patterns
+        for name, patterns in groups.items()
+    }
+
+
+def match_path_groups(changed_files, groups):
+    r"""
+    Classify changed files against several named pattern groups in one pass.
+
+    Each group's patterns are compiled once (see
+    [](`~ccbr_actions.changed_files.compile_path_spec`)) and every file is
+    checked against all groups while iterating the file list a single time.
+
+    Args:
+        changed_files (str or list[str]): Newline-separated changed file paths,
+            or a list of paths.
+        groups (dict[str, str]): Mapping of group names to .gitignore-style
+            pattern lists.
+
+    Returns:
+        dict[str, list[str]]: Matched files for each group, in changed-file order.
+
+    Examples:
+        >>> match_path_groups("Dockerfile.v1\ndocs/index.md\n", {"docker": "Dockerfile.*", "docs": "docs/"})
+        {'docker': ['Dockerfile.v1'], 'docs': ['docs/index.md']}
+    """
+    if isinstance(changed_files, str):
+        changed_files = changed_files.split("\n")
+    specs = [(name, compile_path_spec(patterns)) for name, patterns in groups.items()]
+    matched = {name: [] for name, _spec in specs}
+    for file in changed_files:
+        if file:
+            for name, spec in specs:
+                if spec.match_file(file):
+                    matched[name].append(file)
+    return matched
 
 
 def match_paths(changed_file_list, paths=None):
@@ -179,17 +983,19 @@ def match_paths(changed_file_list, paths=None):
     Mirror the `match-paths` JavaScript step output from actions/changed-files/action.yml.
 
     Args:
-        changed_file_list (str): Newline-separated changed file paths.
+        changed_file_list (str or list[str]): Newline-separated changed file
+            paths, or a list of paths.
         paths (str, optional): .gitignore-style pattern list as a string.
 
     Returns:
         dict: A dictionary with keys matching the JavaScript step payload.
     """
-    changed_files = [file for file in changed_file_list.split("\n") if file]
+    if isinstance(changed_file_list, str):
+        changed_file_list = changed_file_list.split("\n")
+    changed_files = [file for file in changed_file_list if file]
 
     if paths:
-        matcher = GitIgnoreSpec.from_lines(paths.splitlines())
-        matched_files = [file for file in changed_files if matcher.match_file(file)]
+        matched_files = compile_path_spec(paths).match_files(changed_files)
     else:
         matched_files = []
 
@@ -210,6 +1016,103 @@ def match_paths_json(changed_file_list, paths=None):
     return json.dumps(match_paths(changed_file_list=changed_file_list, paths=paths))
 
 
+def default_output_dir():
+    """
+    Get the default directory for changed-file artifacts.
+
+    Returns:
+        pathlib.Path: ``changed-files`` inside ``RUNNER_TEMP`` when running in
+            GitHub Actions, otherwise inside the system temporary directory.
+    """
+    return (
+        pathlib.Path(os.environ.get("RUNNER_TEMP") or tempfile.gettempdir())
+        / "changed-files"
+    )
+
+
+def write_changed_file_artifacts(
+    changed_file_list, output_dir=None, paths=None, path_groups=None
+):
+    """
+    Stream changed and matched files to file artifacts.
+
+    Each file is matched and written as it is read, so large file lists are
+    never copied into step outputs or nested JSON strings. The following
+    files are written to ``output_dir``:
+
+    - ``changed_files.txt``: NUL-delimited changed file paths.
+    - ``matched_files.txt``: NUL-delimited changed file paths matching ``paths``.
+    - ``changed_files.jsonl``: one JSON object per changed file with keys
+      ``filename``, ``matched``, and (when ``path_groups`` is given) ``groups``,
+      the names of the matching groups.
+
+    Args:
+        changed_file_list (str or Iterable[str]): Newline-separated changed
+            file paths, or an iterable of paths.
+        output_dir (str or pathlib.Path, optional): Directory for the artifacts.
+            Defaults to [](`~ccbr_actions.changed_files.default_output_dir`).
+        paths (str, optional): .gitignore-style pattern list as a string.
+        path_groups (str or dict, optional): Named pattern groups, see
+            [](`~ccbr_actions.changed_files.parse_path_groups`).
+
+    Returns:
+        dict: Artifact paths (``changed_files_path``, ``matched_files_path``,
+            ``changed_files_jsonl_path``) and counts (``changed_files_count``,
+            ``matched_files_count``, and ``matched_groups_counts_json`` when
+            ``path_groups`` is given).
+    """
+    output_dir = pathlib.Path(output_dir or default_output_dir())
+    output_dir.mkdir(parents=True, exist_ok=True)
+    artifacts = {
+        "changed_files_path": output_dir / "changed_files.txt",
+        "matched_files_path": output_dir / "matched_files.txt",
+        "changed_files_jsonl_path": output_dir / "changed_files.jsonl",
+    }
+    spec = compile_path_spec(paths) if paths else None
+    group_specs = {
+        name: compile_path_spec(patterns)
+        for name, patterns in (
+            parse_path_groups(path_groups).items() if path_groups else ()
+        )
+    }
+    changed_count = 0
+    matched_count = 0
+    group_counts = dict.fromkeys(group_specs, 0)
+    with (
+        open(artifacts["changed_files_path"], "w", encoding="utf-8") as changed_fh,
+        open(artifacts["matched_files_path"], "w", encoding="utf-8") as matched_fh,
+        open(artifacts["changed_files_jsonl_path"], "w", encoding="utf-8") as jsonl_fh,
+    ):
+        files = (
+            iter_file_list(changed_file_list)
+            if isinstance(changed_file_list, str)
+            else (file for file in changed_file_list if file)
+        )
+        for file in files:
+            matched = bool(spec and spec.match_file(file))
+            record = {"filename": file, "matched": matched}
+            changed_fh.write(f"{file}\0")
+            changed_count += 1
+            if matched:
+                matched_fh.write(f"{file}\0")
+                matched_count += 1
+            if group_specs:
+                record["groups"] = [
+                    name
+                    for name, group_spec in group_specs.items()
+                    if group_spec.match_file(file)
+                ]
+                for name in record["groups"]:
+                    group_counts[name] += 1
+            jsonl_fh.write(f"{json.dumps(record)}\n")
+    summary = {name: str(path) for name, path in artifacts.items()}
+    summary["changed_files_count"] = changed_count
+    summary["matched_files_count"] = matched_count
+    if group_specs:
+        summary["matched_groups_counts_json"] = json.dumps(group_counts)
+    return summary
+
+
 def get_changed_files(
     paths="",
     event_name="",
@@ -222,12 +1125,27 @@ def get_changed_files(
     pr_head_label="",
     pr_head_repo_full_name="",
     pr_head_sha="",
+    pr_number="",
+    comparison_engine="api",
+    path_groups="",
+    output_mode="outputs",
+    output_dir=None,
     token=None,
     session=None,
 ):
     """
     Compute and emit the `result` output for the changed-files action.
 
+    When ``path_groups`` is given, the payload also includes
+    ``matched_groups_json``: a JSON object mapping each group name to its
+    list of matched files.
+
+    With ``output_mode="files"``, the changed file paths are written straight
+    to file artifacts by
+    [](`~ccbr_actions.changed_files.write_changed_file_artifacts`), without
+    first joining them into one string, and the payload holds only the
+    artifact paths and counts.
+
     Args:
         paths (str, optional): .gitignore-style pattern list.
         event_name (str): GitHub event name.
@@ -240,26 +1158,65 @@ def get_changed_files(
         pr_head_label (str): Head label for pull requests.
         pr_head_repo_full_name (str): Head repository full name.
         pr_head_sha (str): Head SHA for pull requests.
+        pr_number (int or str, optional): Pull request number.
+        comparison_engine (str): One of ``api``, ``git``, or ``auto``.
+        path_groups (str or dict, optional): Named pattern groups, see
+            [](`~ccbr_actions.changed_files.parse_path_groups`).
+        output_mode (str): ``outputs`` (default) or ``files``, see
+            [](`~ccbr_actions.changed_files.validate_output_mode`).
+        output_dir (str or pathlib.Path, optional): Directory for the file
+            artifacts when ``output_mode`` is ``files``.
         token (str, optional): GitHub token.
-        session: Object with a requests-compatible ``get`` method.
+        session: Object with a requests-compatible ``get`` method. Defaults to
+            a new [](`~ccbr_actions.github.GitHubClient`) so that all API calls
+            for this event share one connection; it is closed before
+            returning. When ``CCBR_ACTIONS_CACHE_DIR``
+            is set, the client caches responses there with a
+            [](`~ccbr_actions.github.GitHubResponseCache`).
 
     Returns:
         str: JSON-encoded payload written to the `result` output.
     """
-    changed_file_list = get_changed_file_list(
-        event_name=event_name,
-        comparison_mode=comparison_mode,
-        repository=repository,
-        before=before,
-        after=after,
-        pr_base_repo_full_name=pr_base_repo_full_name,
-        pr_base_sha=pr_base_sha,
-        pr_head_label=pr_head_label,
-        pr_head_repo_full_name=pr_head_repo_full_name,
-        pr_head_sha=pr_head_sha,
-        token=token,
-        session=session,
-    )
-    result = match_paths_json(changed_file_list=changed_file_list, paths=paths)
+    validate_output_mode(output_mode)
+    owns_session = session is None
+    if owns_session:
+        cache = (
+            GitHubResponseCache() if os.environ.get("CCBR_ACTIONS_CACHE_DIR") else None
+        )
+        session = GitHubClient(token=token, cache=cache)
+    try:
+        changed_files = get_changed_file_names(
+            event_name=event_name,
+            comparison_mode=comparison_mode,
+            repository=repository,
+            before=before,
+            after=after,
+            pr_base_repo_full_name=pr_base_repo_full_name,
+            pr_base_sha=pr_base_sha,
+            pr_head_label=pr_head_label,
+            pr_head_repo_full_name=pr_head_repo_full_name,
+            pr_head_sha=pr_head_sha,
+            pr_number=pr_number,
+            comparison_engine=comparison_engine,
+            token=token,
+            session=session,
+        )
+    finally:
+        if owns_session:
+            session.close()
+    if output_mode == "files":
+        payload = write_changed_file_artifacts(
+            changed_files,
+            output_dir=output_dir,
+            paths=paths,
+            path_groups=path_groups,
+        )
+    else:
+        payload = match_paths(changed_file_list=changed_files, paths=paths)
+    if path_groups and output_mode == "outputs":
+        payload["matched_groups_json"] = json.dumps(
+            match_path_groups(changed_files, parse_path_groups(path_groups))
+        )
+    result = json.dumps(payload)
     set_output("result", result)
     return result
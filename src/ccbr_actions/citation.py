@@ -56,7 +56,7 @@ def write_citation(
 def update_citation(
     citation_file="CITATION.cff",
     version="${{ steps.set-version.output.NEXT_VERSION }}",
-    date=date_today(),
+    date=None,
     debug=False,
 ):
     """
@@ -68,12 +68,14 @@ def update_citation(
     Args:
         citation_file (str): The path to the citation file (default is "CITATION.cff").
         version (str): The version to set in the citation file (default is "${{ steps.set-version.output.NEXT_VERSION }}").
-        date (str): The release date to set in the citation file (default is today's date).
+        date (str): The release date to set in the citation file (default is today's date, resolved when called).
         debug (bool): If True, print the updated citation content instead of writing to the file (default is False).
 
     Examples:
         >>> update_citation(version="1.0.1", date="2023-10-01")
     """
+    if date is None:
+        date = date_today()
     citation = create_citation(citation_file, None)
     citation._implementation.cffobj["version"] = version
     citation._implementation.cffobj["date-released"] = date
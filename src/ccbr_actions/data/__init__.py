@@ -2,7 +2,14 @@
 Data files for CCBR actions
 """
 
+import functools
+import hashlib
 import importlib.resources
+import itertools
+import json
+import pathlib
+
+EXAMPLES_INDEX = "examples_index.json"
 
 
 def get_file_path(filename):
@@ -30,3 +37,89 @@ def get_file_path(filename):
     if not file_path.exists():
         raise FileNotFoundError(f"{filename} not found in package data")
     return file_path
+
+
+def example_description(text):
+    """
+    Describe an example workflow by its leading comment block, or else its name.
+
+    Only comments before the first YAML line are used, and only the top-level
+    `name:`, so inline comments and job or step names are ignored.
+
+    Args:
+        text (str): The content of the workflow file.
+
+    Returns:
+        str: The first non-empty line of the leading comment block, or the
+            workflow name if there is none.
+
+    Examples:
+        >>> example_description("# Build the docs\\nname: docs\\n")
+        'Build the docs'
+        >>> example_description("name: docs\\n# build on push\\non: push\\n")
+        'docs'
+    """
+    lines = text.splitlines()
+    header = itertools.takewhile(
+        lambda line: not line.strip() or line.lstrip().startswith("#"), lines
+    )
+    comments = [line.strip().lstrip("#").strip() for line in header]
+    names = [
+        line.split(":", 1)[1].strip() for line in lines if line.startswith("name:")
+    ]
+    descriptions = [comment for comment in comments if comment] + names + [""]
+    return descriptions[0]
+
+
+def build_examples_index(examples_dir):
+    """
+    Index the example workflow files in a directory.
+
+    Args:
+        examples_dir (str): Directory with the `*.yml` example workflows.
+
+    Returns:
+        dict: Maps each example name (the file name without `.yml`) to the
+            SHA-256 of its content and its description.
+    """
+    index = {}
+    for path in sorted(pathlib.Path(examples_dir).glob("*.yml")):
+        content = path.read_bytes()
+        index[path.stem] = {
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "description": example_description(content.decode()),
+        }
+    return index
+
+
+@functools.cache
+def read_examples_index():
+    """
+    Read the index of example workflows bundled with the package.
+
+    Returns:
+        dict: See [](`~ccbr_actions.data.build_examples_index`).
+    """
+    return json.loads(get_file_path(EXAMPLES_INDEX).read_text())
+
+
+def get_example_path(name):
+    """
+    Get the path of an example workflow bundled with the package.
+
+    Args:
+        name (str): The name of the example, without `.yml`.
+
+    Returns:
+        pathlib.Path: The path of the bundled file.
+
+    Raises:
+        FileNotFoundError: If the example is not bundled.
+
+    Examples:
+        >>> get_example_path("docs-mkdocs").name
+        'docs-mkdocs.yml'
+    """
+    if name not in read_examples_index():
+        raise FileNotFoundError(f"{name} is not a bundled example")
+    return get_file_path(f"examples/{name}.yml")
@@ -4,15 +4,26 @@ Prepare Docker build variables to match the legacy bash script.
 
 from __future__ import annotations
 
+import collections
+import concurrent.futures
 import datetime
+import fnmatch
+import glob
+import hashlib
+import json
 import os
 import pathlib
+import re
 import subprocess
-from typing import Dict, Optional
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
 import requests
+from pathspec import GitIgnoreSpec
 
-from .actions import set_output
+from .actions import OutputWriter
+from .github import GitHubClient, atomic_write, cache_root
 
 
 def base_image_name(dockerfile: str) -> str:
@@ -44,29 +55,103 @@ def tag_from_dockerfile(dockerfile: str) -> str:
     return bn_dockerfile.split(".", 1)[-1]
 
 
-def prepare_docker_build_variables(
+HEREDOC_PATTERN = re.compile(r"<<(-?)([\"']?)(\w+)\2")
+
+
+def dockerfile_instructions(dockerfile: str) -> List[Tuple[str, str]]:
+    """
+    Read the instructions of a Dockerfile.
+
+    Lines continued with a trailing backslash are joined and comment lines
+    are dropped. The bodies of heredocs (e.g. ``RUN <<EOF``) are kept on the
+    lines after the first line of the arguments. Parser directives other than
+    the default escape character are not supported.
+
+    Args:
+        dockerfile (str): Path to the Dockerfile.
+
+    Returns:
+        list[tuple[str, str]]: The upper-case instruction and its arguments,
+            in order.
+    """
+    with open(dockerfile, "r") as handle:
+        lines = handle.read().splitlines()
+    instructions = []
+    current = ""
+    heredoc_ends = []
+    for line in lines:
+        if heredoc_ends:
+            strip_tabs, delimiter = heredoc_ends[0]
+            if (line.lstrip("\t") if strip_tabs else line) == delimiter:
+                heredoc_ends.pop(0)
+            instruction, arguments = instructions[-1]
+            instructions[-1] = (instruction, f"{arguments}\n{line}")
+        elif line.strip().startswith("#") or not line.strip():
+            pass
+        elif line.rstrip().endswith("\\"):
+            current += line.rstrip()[:-1] + " "
+        else:
+            current += line
+            instruction, _, arguments = current.strip().partition(" ")
+            instructions.append((instruction.upper(), " ".join(arguments.split())))
+            heredoc_ends = [
+                (dash == "-", delimiter)
+                for dash, _, delimiter in HEREDOC_PATTERN.findall(arguments)
+            ]
+            current = ""
+    return instructions
+
+
+def split_instruction_arguments(arguments: str) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Split the arguments of an instruction such as ``COPY`` into flags and values.
+
+    Args:
+        arguments (str): The arguments, in shell form or JSON (exec) form.
+
+    Returns:
+        tuple[dict, list]: The leading ``--flag=value`` options and the
+            remaining values.
+
+    Examples:
+        >>> split_instruction_arguments("--chown=1000 --link src/ /opt/")
+        ({'chown': '1000', 'link': ''}, ['src/', '/opt/'])
+        >>> split_instruction_arguments('["a b.txt", "/opt/"]')
+        ({}, ['a b.txt', '/opt/'])
+    """
+    words = arguments.split()
+    flags = {}
+    while words and words[0].startswith("--"):
+        name, _, value = words.pop(0)[2:].partition("=")
+        flags[name] = value
+    values = words
+    remainder = " ".join(words)
+    if remainder.startswith("["):
+        try:
+            values = json.loads(remainder)
+        except ValueError:
+            values = words
+    return flags, values
+
+
+def docker_build_variables(
     dockerfile: str,
     suffix: str,
     dockerhub_account: str,
-    github_env: Optional[str] = None,
     now: Optional[datetime.datetime] = None,
 ) -> Dict[str, str]:
     """
-    Prepare Docker build variables and optionally write them to GITHUB_ENV.
+    Compute Docker build variables for a Dockerfile.
 
     Args:
             dockerfile (str): Path to the Dockerfile.
             suffix (str): Suffix for the image tag (e.g., "dev", "main").
             dockerhub_account (str): Docker Hub account/namespace.
-            github_env (str, optional): Path to the GitHub Actions env file.
             now (datetime, optional): Override current time for deterministic output.
 
     Returns:
             dict: Mapping of variable names to their values.
     """
-    print(f"Dockerfile: {dockerfile}")
-    print(f"suffix: {suffix}")
-
     dt = (now or datetime.datetime.now()).strftime("%Y-%m-%d_%H:%M:%S")
     bn_dockerfile = os.path.basename(dockerfile)
     tag = tag_from_dockerfile(dockerfile)
@@ -85,7 +170,7 @@ def prepare_docker_build_variables(
     mdfile = f"{dn_dockerfile}/{tag}.README.md"
     artifact_name = mdfile.replace("/", "_")
 
-    values = {
+    return {
         "DOCKERFILE_PATH": dockerfile,
         "DOCKERFILE_BASENAME": bn_dockerfile,
         "CONTEXT": str(pathlib.Path(dockerfile).parent),
@@ -98,11 +183,38 @@ def prepare_docker_build_variables(
         "ARTIFACT_NAME": artifact_name,
     }
 
+
+def prepare_docker_build_variables(
+    dockerfile: str,
+    suffix: str,
+    dockerhub_account: str,
+    github_env: Optional[str] = None,
+    now: Optional[datetime.datetime] = None,
+) -> Dict[str, str]:
+    """
+    Prepare Docker build variables and optionally write them to GITHUB_ENV.
+
+    Args:
+            dockerfile (str): Path to the Dockerfile.
+            suffix (str): Suffix for the image tag (e.g., "dev", "main").
+            dockerhub_account (str): Docker Hub account/namespace.
+            github_env (str, optional): Path to the GitHub Actions env file.
+            now (datetime, optional): Override current time for deterministic output.
+
+    Returns:
+            dict: Mapping of variable names to their values, see
+            [](`~ccbr_actions.docker.docker_build_variables`).
+    """
+    print(f"Dockerfile: {dockerfile}")
+    print(f"suffix: {suffix}")
+
+    values = docker_build_variables(dockerfile, suffix, dockerhub_account, now=now)
+
     env_path = github_env or os.environ.get("GITHUB_ENV")
     if env_path:
-        with open(env_path, "a") as env_handle:
+        with OutputWriter(github_env=env_path) as writer:
             for key, value in values.items():
-                env_handle.write(f"{key}={value}\n")
+                writer.set_env(key, value)
 
     return values
 
@@ -163,6 +275,193 @@ def dockerfile_last_commit_iso(dockerfile_path: str) -> str:
     return last_commit_iso
 
 
+class GitPathTimestampIndex:
+    """
+    Last commit timestamps of many paths from a single walk of the git history.
+
+    [](`~ccbr_actions.docker.dockerfile_last_commit_iso`) runs ``git log -1``
+    once per path, and each run walks the history again. This index walks it
+    once with ``git log --name-only -z``, records the newest commit time of
+    each path, and stops as soon as every requested path is found.
+
+    When ``cache_dir`` is given, the index is saved there along with the HEAD
+    commit it was built at. The next index for the same repository loads it
+    and, if HEAD moved forward, only reads the commits added since then.
+
+    Args:
+        repo_dir (str): A directory in the git repository. Relative paths are
+            looked up from here, as ``git log -- PATH`` would.
+        cache_dir (str, optional): Directory to save the index in between runs.
+    """
+
+    RECORD_SEPARATOR = "\x1e"
+
+    def __init__(self, repo_dir=".", cache_dir=None):
+        self.repo_dir = os.path.realpath(repo_dir)
+        self.cache_dir = pathlib.Path(cache_dir) if cache_dir else None
+        self.timestamps = {}
+        self.complete = False
+        self.commits_read = 0
+        self._lock = threading.Lock()
+        self.root = self._git("rev-parse", "--show-toplevel")
+        self.head = self._git("rev-parse", "HEAD") if self.root else ""
+        if self.head and self.cache_dir:
+            self._load()
+
+    def _git(self, *args):
+        output = ""
+        try:
+            output = subprocess.check_output(
+                ["git", *args],
+                cwd=self.repo_dir,
+                text=True,
+                stderr=subprocess.DEVNULL,
+            ).strip()
+        except (subprocess.CalledProcessError, OSError):
+            output = ""
+        return output
+
+    def key(self, path):
+        """
+        Get the path relative to the top of the repository, as git reports it.
+
+        Args:
+            path (str): A path, relative to ``repo_dir`` or absolute.
+
+        Returns:
+            str: The path relative to the repository root, with ``/`` separators.
+        """
+        full_path = os.path.join(self.repo_dir, path)
+        parent = os.path.realpath(os.path.dirname(full_path))
+        return pathlib.PurePath(
+            os.path.relpath(
+                os.path.join(parent, os.path.basename(full_path)), self.root
+            )
+        ).as_posix()
+
+    def _cache_path(self):
+        digest = hashlib.sha256(self.root.encode()).hexdigest()[:16]
+        return self.cache_dir / f"git_timestamps_{digest}.json"
+
+    def _load(self):
+        try:
+            saved = json.loads(self._cache_path().read_text())
+        except (OSError, ValueError):
+            saved = {}
+        saved_head = saved.get("head", "")
+        if saved_head == self.head:
+            self.timestamps = saved["timestamps"]
+            self.complete = saved["complete"]
+        elif saved_head and self._is_ancestor(saved_head):
+            self.timestamps = saved["timestamps"]
+            self.complete = saved["complete"]
+            newer = {}
+            self._walk(f"{saved_head}..{self.head}", newer, pending=None)
+            self.timestamps.update(newer)
+
+    def _is_ancestor(self, commit):
+        is_ancestor = False
+        try:
+            subprocess.check_call(
+                ["git", "merge-base", "--is-ancestor", commit, self.head],
+                cwd=self.repo_dir,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            is_ancestor = True
+        except (subprocess.CalledProcessError, OSError):
+            is_ancestor = False
+        return is_ancestor
+
+    def save(self):
+        """Save the index to ``cache_dir``. Does nothing without a ``cache_dir``."""
+        if self.cache_dir and self.head:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            state = {
+                "head": self.head,
+                "complete": self.complete,
+                "timestamps": self.timestamps,
+            }
+            atomic_write(self._cache_path(), json.dumps(state).encode())
+
+    def _walk(self, revisions, timestamps, pending):
+        """
+        Record the newest commit time of each path changed in ``revisions``.
+
+        Returns True if the whole range was read, or False if the walk stopped
+        early because every path in ``pending`` was found.
+        """
+        process = subprocess.Popen(
+            [
+                "git",
+                "log",
+                f"--format={self.RECORD_SEPARATOR}%cI",
+                "--name-only",
+                "-z",
+                revisions,
+                "--",
+            ],
+            cwd=self.repo_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        commit_time = ""
+        remainder = b""
+        chunk = process.stdout.read1(65536)
+        while chunk and pending != set():
+            *fields, remainder = (remainder + chunk).split(b"\0")
+            for field in fields:
+                name = field.decode(errors="surrogateescape").lstrip("\n")
+                if name.startswith(self.RECORD_SEPARATOR):
+                    commit_time = name[1:]
+                    self.commits_read += 1
+                elif name and name not in timestamps:
+                    timestamps[name] = commit_time
+                    if pending is not None:
+                        pending.discard(name)
+            chunk = process.stdout.read1(65536) if pending != set() else b""
+        finished = not chunk and pending != set()
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        return finished
+
+    def resolve(self, paths):
+        """
+        Find the last commit time of each path, walking the history if needed.
+
+        Args:
+            paths (list[str]): Paths, relative to ``repo_dir`` or absolute.
+
+        Returns:
+            dict: The ISO 8601 timestamp (git ``%cI`` format) for each path,
+                or an empty string when it has no git history.
+        """
+        keys = {path: self.key(path) for path in paths} if self.root else {}
+        with self._lock:
+            pending = {key for key in keys.values() if key not in self.timestamps}
+            if pending and self.head and not self.complete:
+                self.complete = self._walk(self.head, self.timestamps, pending)
+        return {path: self.timestamps.get(keys.get(path), "") for path in paths}
+
+    def last_commit_iso(self, path):
+        """
+        Get the last git commit timestamp of a path.
+
+        A drop-in replacement for
+        [](`~ccbr_actions.docker.dockerfile_last_commit_iso`).
+
+        Args:
+            path (str): A path, relative to ``repo_dir`` or absolute.
+
+        Returns:
+            str: ISO 8601 timestamp from git ``%cI`` format, or an empty string
+            when the file is untracked or has no git history.
+        """
+        return self.resolve([path])[path]
+
+
 def dockerhub_tag_last_updated(
     dockerhub_namespace: str,
     repo_name: str,
@@ -178,7 +477,8 @@ def dockerhub_tag_last_updated(
         repo_name (str): Docker Hub repository name.
         image_tag (str): Docker image tag.
         timeout (int): HTTP timeout in seconds.
-        session: Object with a requests-compatible ``get`` method.
+        session: Object with a requests-compatible ``get`` method, such as a
+            [](`~ccbr_actions.github.GitHubClient`) to reuse connections.
 
     Returns:
         str or None: ISO8601 ``last_updated`` value, or ``None`` when tag is absent.
@@ -196,30 +496,622 @@ def dockerhub_tag_last_updated(
     return last_updated
 
 
+class DockerHubTagIndex:
+    """
+    Last update times of all tags of Docker Hub repositories, listed in bulk.
+
+    [](`~ccbr_actions.docker.dockerhub_tag_last_updated`) sends one request per
+    tag. This index lists every tag of a repository with one paginated request
+    per 100 tags and answers all later lookups in that repository from memory.
+
+    With a ``cache_dir``, tag listings are also saved to disk and reused for
+    ``ttl`` seconds, so repeated checks in the same job send no requests.
+
+    Args:
+        session: Object with a requests-compatible ``get`` method, such as a
+            [](`~ccbr_actions.github.GitHubClient`) to reuse connections.
+        cache_dir (str, optional): Directory to save tag listings in.
+        ttl (float, optional): Seconds to reuse a saved listing. Defaults to
+            ``CCBR_ACTIONS_DOCKERHUB_TTL`` or five minutes.
+        page_size (int): Number of tags per page (at most 100).
+        timeout (int): HTTP timeout in seconds.
+        clock (callable): Returns the current time in seconds.
+    """
+
+    def __init__(
+        self,
+        session=requests,
+        cache_dir=None,
+        ttl=None,
+        page_size=100,
+        timeout=20,
+        clock=time.time,
+    ):
+        self.session = session
+        self.cache_dir = pathlib.Path(cache_dir) if cache_dir else None
+        self.ttl = float(
+            os.environ.get("CCBR_ACTIONS_DOCKERHUB_TTL", "300") if ttl is None else ttl
+        )
+        self.page_size = page_size
+        self.timeout = timeout
+        self.clock = clock
+        self.requests_sent = 0
+        self._repos = {}
+        self._locks = collections.defaultdict(threading.Lock)
+        self._lock = threading.Lock()
+
+    def _cache_path(self, dockerhub_namespace, repo_name):
+        digest = hashlib.sha256(f"{dockerhub_namespace}/{repo_name}".encode())
+        return self.cache_dir / f"{digest.hexdigest()}.json"
+
+    def _load(self, dockerhub_namespace, repo_name):
+        saved = None
+        if self.cache_dir:
+            try:
+                saved = json.loads(
+                    self._cache_path(dockerhub_namespace, repo_name).read_text()
+                )
+            except (OSError, ValueError):
+                saved = None
+        if saved and self.clock() - saved["fetched_at"] < self.ttl:
+            tags = saved["tags"]
+        else:
+            tags = None
+        return tags
+
+    def _store(self, dockerhub_namespace, repo_name, tags):
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            state = {"fetched_at": self.clock(), "tags": tags}
+            atomic_write(
+                self._cache_path(dockerhub_namespace, repo_name),
+                json.dumps(state).encode(),
+            )
+
+    def _fetch(self, dockerhub_namespace, repo_name):
+        url = (
+            f"https://hub.docker.com/v2/namespaces/{dockerhub_namespace}/"
+            f"repositories/{repo_name}/tags?page_size={self.page_size}"
+        )
+        tags = {}
+        while url:
+            response = self.session.get(url, timeout=self.timeout)
+            with self._lock:
+                self.requests_sent += 1
+            if response.status_code == 404:
+                url = None
+            else:
+                response.raise_for_status()
+                payload = response.json()
+                for tag in payload.get("results") or []:
+                    tags[tag["name"]] = (tag.get("last_updated") or "").strip()
+                url = payload.get("next")
+        return tags
+
+    def tags(self, dockerhub_namespace, repo_name):
+        """
+        List the tags of a repository, once per index.
+
+        Args:
+            dockerhub_namespace (str): Docker Hub namespace/org.
+            repo_name (str): Docker Hub repository name.
+
+        Returns:
+            dict: The ``last_updated`` timestamp of each tag, which is empty
+                when Docker Hub does not report one. Empty when the repository
+                does not exist.
+        """
+        key = (dockerhub_namespace, repo_name)
+        with self._locks[key]:
+            if key not in self._repos:
+                tags = self._load(*key)
+                if tags is None:
+                    tags = self._fetch(*key)
+                    self._store(*key, tags)
+                self._repos[key] = tags
+        return self._repos[key]
+
+    def last_updated(self, dockerhub_namespace, repo_name, image_tag):
+        """
+        Get Docker Hub tag ``last_updated`` timestamp.
+
+        A drop-in replacement for
+        [](`~ccbr_actions.docker.dockerhub_tag_last_updated`).
+
+        Args:
+            dockerhub_namespace (str): Docker Hub namespace/org.
+            repo_name (str): Docker Hub repository name.
+            image_tag (str): Docker image tag.
+
+        Returns:
+            str or None: ISO8601 ``last_updated`` value, or ``None`` when tag is absent.
+        """
+        return self.tags(dockerhub_namespace, repo_name).get(image_tag)
+
+
+CONTEXT_DIGEST_LABEL = "io.github.ccbr.context-digest"
+STALENESS_MODES = ("timestamp", "content")
+
+
+def dockerignore_spec(dockerfile: str, context: str) -> Optional[GitIgnoreSpec]:
+    """
+    Read the ``.dockerignore`` rules that apply to a build.
+
+    Like ``docker build``, a ``<Dockerfile>.dockerignore`` next to the
+    Dockerfile takes precedence over ``.dockerignore`` in the context.
+    Patterns are anchored to the context root and a later ``!`` pattern
+    re-includes files excluded by an earlier one.
+
+    Args:
+        dockerfile (str): Path to the Dockerfile.
+        context (str): Path to the build context.
+
+    Returns:
+        GitIgnoreSpec or None: The rules, or ``None`` when there is no ``.dockerignore``.
+    """
+    candidates = [f"{dockerfile}.dockerignore", os.path.join(context, ".dockerignore")]
+    ignore_files = [path for path in candidates if os.path.isfile(path)]
+    spec = None
+    if ignore_files:
+        patterns = []
+        with open(ignore_files[0], "r") as handle:
+            for raw_line in handle:
+                line = raw_line.strip()
+                if line and not line.startswith("#"):
+                    negate = "!" if line.startswith("!") else ""
+                    pattern = os.path.normpath(line.lstrip("!").strip()).lstrip("/")
+                    patterns.append(f"{negate}/{pattern}")
+        spec = GitIgnoreSpec.from_lines(patterns)
+    return spec
+
+
+def docker_context_files(dockerfile: str, context: Optional[str] = None) -> List[str]:
+    """
+    List the build context files that ``COPY`` and ``ADD`` instructions read.
+
+    Sources copied from other stages or images (``--from``), heredocs, and
+    remote URLs are not part of the context. A source that uses a variable
+    cannot be resolved without the build arguments, so the whole context is
+    listed instead.
+
+    Args:
+        dockerfile (str): Path to the Dockerfile.
+        context (str, optional): Path to the build context. Defaults to the
+            directory of the Dockerfile, as in the build-docker action.
+
+    Returns:
+        list[str]: Paths relative to the context, with ``/`` separators, that
+            are not excluded by [](`~ccbr_actions.docker.dockerignore_spec`).
+    """
+    context = context or os.path.dirname(dockerfile) or "."
+    context_root = os.path.realpath(context)
+    sources = []
+    for instruction, arguments in dockerfile_instructions(dockerfile):
+        if instruction in ("COPY", "ADD"):
+            flags, values = split_instruction_arguments(arguments.split("\n")[0])
+            if "from" not in flags:
+                sources.extend(
+                    source
+                    for source in values[:-1]
+                    if not source.startswith("<<") and "://" not in source
+                )
+    if any("$" in source for source in sources):
+        sources = ["."]
+    files = set()
+    for source in sources:
+        for match in _match_source(context_root, source):
+            for path in _walk_files(match):
+                relative = os.path.relpath(path, context_root)
+                if not relative.startswith(".."):
+                    files.add(pathlib.PurePath(relative).as_posix())
+    spec = dockerignore_spec(dockerfile, context)
+    if spec is not None:
+        files = {path for path in files if not spec.match_file(path)}
+    return sorted(files)
+
+
+def _match_source(context_root, source):
+    """Expand a ``COPY`` source pattern in the context, including hidden files like Docker does."""
+    matches = [context_root]
+    for part in os.path.normpath(source.lstrip("/")).split(os.sep):
+        if part == ".":
+            pass
+        elif glob.has_magic(part):
+            matches = [
+                os.path.join(path, name)
+                for path in matches
+                if os.path.isdir(path)
+                for name in sorted(os.listdir(path))
+                if fnmatch.fnmatchcase(name, part)
+            ]
+        else:
+            matches = [
+                os.path.join(path, part)
+                for path in matches
+                if os.path.lexists(os.path.join(path, part))
+            ]
+    return matches
+
+
+def _walk_files(path):
+    """List a file, or every file under a directory, without following symlinks."""
+    files = [path]
+    if os.path.isdir(path) and not os.path.islink(path):
+        files = [
+            os.path.join(dirpath, name)
+            for dirpath, _, filenames in os.walk(path)
+            for name in filenames
+        ]
+    return files
+
+
+def docker_context_digest(
+    dockerfile: str, context: Optional[str] = None, chunk_size: int = 1 << 20
+) -> str:
+    """
+    Hash a Dockerfile together with the build context files it copies.
+
+    The Dockerfile contributes its instructions as read by
+    [](`~ccbr_actions.docker.dockerfile_instructions`), so comments and
+    whitespace do not change the digest. Each context file contributes its
+    path, executable bit, size, and content (or its target, for symlinks),
+    read in chunks so large contexts are never held in memory.
+
+    Args:
+        dockerfile (str): Path to the Dockerfile.
+        context (str, optional): Path to the build context. Defaults to the
+            directory of the Dockerfile.
+        chunk_size (int): Number of bytes to read at a time.
+
+    Returns:
+        str: The digest, e.g. ``sha256:2c26b46b...``.
+    """
+    context = context or os.path.dirname(dockerfile) or "."
+    digest = hashlib.sha256(b"ccbr_actions-context-v1\0")
+    for instruction, arguments in dockerfile_instructions(dockerfile):
+        digest.update(f"{instruction} {arguments}\n".encode())
+    entries = [
+        (f"context/{path}", os.path.join(context, path))
+        for path in docker_context_files(dockerfile, context)
+    ]
+    for name, path in entries:
+        digest.update(name.encode() + b"\0")
+        if os.path.islink(path):
+            digest.update(b"link\0" + os.readlink(path).encode() + b"\0")
+        else:
+            mode = b"x" if os.stat(path).st_mode & 0o111 else b"-"
+            digest.update(mode + str(os.path.getsize(path)).encode() + b"\0")
+            with open(path, "rb") as handle:
+                chunk = handle.read(chunk_size)
+                while chunk:
+                    digest.update(chunk)
+                    chunk = handle.read(chunk_size)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def set_docker_context_digest_output(
+    dockerfile_path: str, context: Optional[str] = None
+) -> str:
+    """
+    Compute the build context digest and write it to the ``context_digest`` step output.
+
+    The build-docker action runs this for every build, including forced ones,
+    so each pushed image is labeled with
+    [](`~ccbr_actions.docker.CONTEXT_DIGEST_LABEL`) and can be compared in the
+    ``content`` staleness mode later.
+
+    Args:
+        dockerfile_path (str): Path to the Dockerfile.
+        context (str, optional): Path to the build context. Defaults to the
+            directory of the Dockerfile.
+
+    Returns:
+        str: The digest, see [](`~ccbr_actions.docker.docker_context_digest`).
+    """
+    context_digest = docker_context_digest(dockerfile_path, context)
+    with OutputWriter() as writer:
+        writer.set_output("context_digest", context_digest)
+    print(f"context_digest: {context_digest}")
+    return context_digest
+
+
+MANIFEST_MEDIA_TYPES = (
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+)
+
+
+def registry_image_labels(
+    dockerhub_namespace: str,
+    repo_name: str,
+    image_tag: str,
+    timeout: int = 20,
+    session=requests,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+) -> Optional[Dict[str, str]]:
+    """
+    Read the labels of a pushed image from the Docker Hub registry.
+
+    Resolves the tag to a manifest digest with a ``HEAD`` request, which does
+    not count against Docker Hub's pull rate limit. Labels are stored on disk
+    by manifest digest, which never changes, so an image that was already
+    read costs no further pulls. Otherwise the manifest (choosing the
+    ``linux/amd64`` image of a multi-platform index) and the image config
+    blob are fetched, without pulling any layers. Each manifest ``GET`` counts
+    as a pull, so credentials are used when available: authenticated pulls
+    have a much higher limit than anonymous ones.
+
+    Args:
+        dockerhub_namespace (str): Docker Hub namespace/org.
+        repo_name (str): Docker Hub repository name.
+        image_tag (str): Docker image tag.
+        timeout (int): HTTP timeout in seconds.
+        session: Object with requests-compatible ``get`` and ``head`` methods,
+            such as a [](`~ccbr_actions.github.GitHubClient`) to reuse connections.
+        username (str, optional): Docker Hub username. Defaults to
+            ``DOCKERHUB_USERNAME``.
+        password (str, optional): Docker Hub token or password. Defaults to
+            ``DOCKERHUB_TOKEN``.
+        cache_dir (str, optional): Directory to store labels in. Defaults to
+            the ``registry`` subdirectory of [](`~ccbr_actions.github.cache_root`).
+
+    Returns:
+        dict or None: The image labels, or ``None`` when the tag is absent.
+    """
+    repository = f"{dockerhub_namespace}/{repo_name}"
+    username = username or os.environ.get("DOCKERHUB_USERNAME")
+    password = password or os.environ.get("DOCKERHUB_TOKEN")
+    token_response = session.get(
+        "https://auth.docker.io/token",
+        params={
+            "service": "registry.docker.io",
+            "scope": f"repository:{repository}:pull",
+        },
+        auth=(username, password) if username and password else None,
+        timeout=timeout,
+    )
+    token_response.raise_for_status()
+    headers = {
+        "Authorization": f"Bearer {token_response.json()['token']}",
+        "Accept": ", ".join(MANIFEST_MEDIA_TYPES),
+    }
+    registry_url = f"https://registry-1.docker.io/v2/{repository}"
+    labels = None
+    response = session.head(
+        f"{registry_url}/manifests/{image_tag}", headers=headers, timeout=timeout
+    )
+    if response.status_code != 404:
+        response.raise_for_status()
+        manifest_digest = (getattr(response, "headers", None) or {}).get(
+            "Docker-Content-Digest", ""
+        )
+        cache_path = None
+        if manifest_digest:
+            cache_path = pathlib.Path(cache_dir or cache_root() / "registry") / (
+                manifest_digest.replace(":", "_") + ".json"
+            )
+        try:
+            labels = json.loads(cache_path.read_text()) if cache_path else None
+        except (OSError, ValueError):
+            labels = None
+        if labels is None:
+            labels = _fetch_image_labels(
+                registry_url, manifest_digest or image_tag, headers, timeout, session
+            )
+            if cache_path:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                atomic_write(cache_path, json.dumps(labels).encode())
+    return labels
+
+
+def _fetch_image_labels(registry_url, reference, headers, timeout, session):
+    """Read the labels from the config blob of the manifest at ``reference``."""
+    response = session.get(
+        f"{registry_url}/manifests/{reference}", headers=headers, timeout=timeout
+    )
+    response.raise_for_status()
+    manifest = response.json()
+    if "manifests" in manifest:
+        images = [
+            entry
+            for entry in manifest["manifests"]
+            if entry.get("platform", {}).get("os") != "unknown"
+        ]
+        amd64 = [
+            entry
+            for entry in images
+            if entry.get("platform", {}).get("architecture") == "amd64"
+        ]
+        response = session.get(
+            f"{registry_url}/manifests/{(amd64 or images)[0]['digest']}",
+            headers=headers,
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        manifest = response.json()
+    response = session.get(
+        f"{registry_url}/blobs/{manifest['config']['digest']}",
+        headers=headers,
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    return (response.json().get("config") or {}).get("Labels") or {}
+
+
+def evaluate_docker_build_content_staleness(
+    dockerfile_path: str,
+    image_name: str,
+    dockerhub_namespace: str,
+    repo_name: str,
+    context: Optional[str] = None,
+    session=requests,
+) -> Dict[str, str]:
+    """
+    Decide whether to build a Docker image by comparing build context digests.
+
+    The digest of the Dockerfile and the files it copies (see
+    [](`~ccbr_actions.docker.docker_context_digest`)) is compared with the
+    ``io.github.ccbr.context-digest`` label of the pushed image, so commits
+    that do not change what goes into the image do not trigger a build.
+
+    Args:
+        dockerfile_path (str): Path to Dockerfile in repository.
+        image_name (str): Target image name, including tag.
+        dockerhub_namespace (str): Docker Hub namespace/org.
+        repo_name (str): Docker Hub repository name.
+        context (str, optional): Path to the build context. Defaults to the
+            directory of the Dockerfile.
+        session: Object with requests-compatible ``get`` and ``head`` methods
+            used for the registry lookups, see
+            [](`~ccbr_actions.docker.registry_image_labels`).
+
+    Returns:
+        dict: Build decision fields suitable for GitHub Action outputs,
+            including the ``context_digest`` to label the new image with.
+    """
+    should_build = True
+    tag_exists = False
+    reason = "default_build"
+
+    context_digest = docker_context_digest(dockerfile_path, context)
+    image_tag = image_tag_from_image_name(image_name)
+    if not image_tag:
+        reason = "missing_image_tag"
+    else:
+        try:
+            labels = registry_image_labels(
+                dockerhub_namespace=dockerhub_namespace,
+                repo_name=repo_name,
+                image_tag=image_tag,
+                session=session,
+            )
+            if labels is None:
+                reason = "tag_not_found"
+            else:
+                tag_exists = True
+                tag_digest = labels.get(CONTEXT_DIGEST_LABEL, "")
+                if not tag_digest:
+                    reason = "tag_missing_context_digest"
+                elif tag_digest == context_digest:
+                    should_build = False
+                    reason = "context_digest_matches_tag"
+                else:
+                    reason = "context_digest_changed"
+        except requests.HTTPError as exc:
+            status_code = getattr(exc.response, "status_code", "unknown")
+            reason = f"dockerhub_http_{status_code}"
+        except (
+            requests.RequestException,
+            subprocess.CalledProcessError,
+            ValueError,
+        ) as exc:
+            reason = f"dockerhub_lookup_failed_{type(exc).__name__}"
+
+    return {
+        "should_build": "true" if should_build else "false",
+        "tag_exists": "true" if tag_exists else "false",
+        "dockerfile_last_commit": "",
+        "tag_last_updated": "",
+        "reason": reason,
+        "context_digest": context_digest,
+    }
+
+
 def evaluate_docker_build_staleness(
     dockerfile_path: str,
     image_name: str,
     dockerhub_namespace: str,
     repo_name: str,
+    session=requests,
+    git_index: Optional[GitPathTimestampIndex] = None,
+    tag_index: Optional[DockerHubTagIndex] = None,
+    staleness_mode: str = "timestamp",
+    context: Optional[str] = None,
 ) -> Dict[str, str]:
     """
     Decide whether to build a Docker image based on Dockerfile git history and tag freshness.
 
+    With ``staleness_mode="content"``, the decision is made by
+    [](`~ccbr_actions.docker.evaluate_docker_build_content_staleness`) instead.
+
     Args:
         dockerfile_path (str): Path to Dockerfile in repository.
         image_name (str): Target image name, including tag.
         dockerhub_namespace (str): Docker Hub namespace/org.
         repo_name (str): Docker Hub repository name.
+        session: Object with a requests-compatible ``get`` method used for the
+            Docker Hub lookup. Pass a [](`~ccbr_actions.github.GitHubClient`)
+            to reuse connections and pace requests with its
+            [](`~ccbr_actions.github.RateLimitScheduler`).
+        git_index (GitPathTimestampIndex, optional): Index to look up the last
+            commit of the Dockerfile in, shared between Dockerfiles. Without
+            one, [](`~ccbr_actions.docker.dockerfile_last_commit_iso`) is used.
+        tag_index (DockerHubTagIndex, optional): Index to look up the tag in,
+            shared between images. Without one,
+            [](`~ccbr_actions.docker.dockerhub_tag_last_updated`) is used with
+            ``session``.
+        staleness_mode (str): ``timestamp`` to compare the last commit of the
+            Dockerfile with the tag's last update, or ``content`` to compare
+            build context digests.
+        context (str, optional): Path to the build context, for the
+            ``content`` mode. Defaults to the directory of the Dockerfile.
 
     Returns:
         dict: Build decision fields suitable for GitHub Action outputs.
+
+    Raises:
+        ValueError: If ``staleness_mode`` is not one of ``STALENESS_MODES``.
     """
+    if staleness_mode not in STALENESS_MODES:
+        raise ValueError(
+            f"Unknown staleness mode '{staleness_mode}'. Choose from: {', '.join(STALENESS_MODES)}"
+        )
+    if staleness_mode == "content":
+        decision = evaluate_docker_build_content_staleness(
+            dockerfile_path=dockerfile_path,
+            image_name=image_name,
+            dockerhub_namespace=dockerhub_namespace,
+            repo_name=repo_name,
+            context=context,
+            session=session,
+        )
+    else:
+        decision = _evaluate_timestamp_staleness(
+            dockerfile_path,
+            image_name,
+            dockerhub_namespace,
+            repo_name,
+            session,
+            git_index,
+            tag_index,
+        )
+    return decision
+
+
+def _evaluate_timestamp_staleness(
+    dockerfile_path,
+    image_name,
+    dockerhub_namespace,
+    repo_name,
+    session,
+    git_index,
+    tag_index,
+):
+    """Compare the last commit of the Dockerfile with the last update of the tag."""
     should_build = True
     tag_exists = False
     tag_last_updated = ""
     reason = "default_build"
 
-    dockerfile_last_commit = dockerfile_last_commit_iso(dockerfile_path)
+    dockerfile_last_commit = (
+        git_index.last_commit_iso(dockerfile_path)
+        if git_index
+        else dockerfile_last_commit_iso(dockerfile_path)
+    )
     if not dockerfile_last_commit:
         reason = "no_git_history_for_dockerfile"
     else:
@@ -228,10 +1120,15 @@ def evaluate_docker_build_staleness(
             reason = "missing_image_tag"
         else:
             try:
-                tag_last_updated_value = dockerhub_tag_last_updated(
-                    dockerhub_namespace=dockerhub_namespace,
-                    repo_name=repo_name,
-                    image_tag=image_tag,
+                tag_last_updated_value = (
+                    tag_index.last_updated(dockerhub_namespace, repo_name, image_tag)
+                    if tag_index
+                    else dockerhub_tag_last_updated(
+                        dockerhub_namespace=dockerhub_namespace,
+                        repo_name=repo_name,
+                        image_tag=image_tag,
+                        session=session,
+                    )
                 )
                 if tag_last_updated_value is None:
                     reason = "tag_not_found"
@@ -251,7 +1148,11 @@ def evaluate_docker_build_staleness(
             except requests.HTTPError as exc:
                 status_code = getattr(exc.response, "status_code", "unknown")
                 reason = f"dockerhub_http_{status_code}"
-            except Exception as exc:
+            except (
+                requests.RequestException,
+                subprocess.CalledProcessError,
+                ValueError,
+            ) as exc:
                 reason = f"dockerhub_lookup_failed_{type(exc).__name__}"
 
     return {
@@ -268,6 +1169,9 @@ def evaluate_docker_build_staleness_and_set_outputs(
     image_name: str,
     dockerhub_namespace: str,
     repo_name: str,
+    session=requests,
+    staleness_mode: str = "timestamp",
+    context: Optional[str] = None,
 ) -> Dict[str, str]:
     """
     Evaluate Docker build staleness and set step outputs.
@@ -277,6 +1181,11 @@ def evaluate_docker_build_staleness_and_set_outputs(
         image_name (str): Target image name, including tag.
         dockerhub_namespace (str): Docker Hub namespace/org.
         repo_name (str): Docker Hub repository name.
+        session: Object with a requests-compatible ``get`` method, see
+            [](`~ccbr_actions.docker.evaluate_docker_build_staleness`).
+        staleness_mode (str): ``timestamp`` or ``content``, see
+            [](`~ccbr_actions.docker.evaluate_docker_build_staleness`).
+        context (str, optional): Path to the build context, for the ``content`` mode.
 
     Returns:
         dict: Build decision fields written to GitHub Action outputs.
@@ -286,12 +1195,21 @@ def evaluate_docker_build_staleness_and_set_outputs(
         image_name=image_name,
         dockerhub_namespace=dockerhub_namespace,
         repo_name=repo_name,
+        session=session,
+        staleness_mode=staleness_mode,
+        context=context,
     )
-    for name, value in result.items():
-        set_output(name, value)
+    with OutputWriter() as writer:
+        for name, value in result.items():
+            writer.set_output(name, value)
 
     if result["should_build"] == "true":
         print(f"::notice::Will build image. reason={result['reason']}")
+    elif staleness_mode == "content":
+        print(
+            "::notice::Skipping docker build because the Docker Hub image was "
+            f"built from the same context (context_digest={result['context_digest']})."
+        )
     else:
         print(
             "::notice::Skipping docker build because Docker Hub tag is up-to-date "
@@ -300,3 +1218,370 @@ def evaluate_docker_build_staleness_and_set_outputs(
         )
 
     return result
+
+
+def evaluate_docker_build_staleness_many(
+    dockerfiles,
+    dockerhub_namespace: str,
+    suffix: str,
+    max_workers: int = 8,
+    session=None,
+    git_index: Optional[GitPathTimestampIndex] = None,
+    tag_index: Optional[DockerHubTagIndex] = None,
+    staleness_mode: str = "timestamp",
+):
+    """
+    Decide which of many Dockerfiles need their images built, concurrently.
+
+    Each Dockerfile is evaluated with
+    [](`~ccbr_actions.docker.evaluate_docker_build_staleness`) for the image
+    name that [](`~ccbr_actions.docker.docker_build_variables`) gives it. The
+    last commits of all Dockerfiles are found in one walk of the git history,
+    and the tags of each Docker Hub repository are listed once.
+
+    Args:
+        dockerfiles (list[str]): Paths to Dockerfiles in the repository.
+        dockerhub_namespace (str): Docker Hub namespace/org.
+        suffix (str): Suffix for the image tags (e.g., "dev", "main").
+        max_workers (int): Maximum number of Dockerfiles evaluated at the same time.
+        session: Object with a requests-compatible ``get`` method used for the
+            Docker Hub lookups. Defaults to a pooled
+            [](`~ccbr_actions.github.GitHubClient`) shared by all lookups.
+        git_index (GitPathTimestampIndex, optional): Index of last commit
+            timestamps. Defaults to a new
+            [](`~ccbr_actions.docker.GitPathTimestampIndex`) of the current directory.
+        tag_index (DockerHubTagIndex, optional): Index of Docker Hub tags.
+            Defaults to a new [](`~ccbr_actions.docker.DockerHubTagIndex`)
+            using ``session``.
+        staleness_mode (str): ``timestamp`` or ``content``, see
+            [](`~ccbr_actions.docker.evaluate_docker_build_staleness`).
+
+    Returns:
+        list[dict]: For each Dockerfile, in order, its ``dockerfile``,
+            ``image_name``, and ``repo_name`` with the build decision fields.
+            Dockerfiles whose names have no tag get ``should_build`` "true"
+            with reason ``invalid_dockerfile_name``.
+    """
+    owns_session = session is None
+    if owns_session:
+        session = GitHubClient(pool_maxsize=max_workers)
+    git_index = git_index or GitPathTimestampIndex()
+    tag_index = tag_index or DockerHubTagIndex(session=session)
+    if staleness_mode == "timestamp":
+        git_index.resolve(dockerfiles)
+
+    def evaluate(dockerfile):
+        result = {"dockerfile": dockerfile, "image_name": "", "repo_name": ""}
+        try:
+            values = docker_build_variables(dockerfile, suffix, dockerhub_namespace)
+        except (ValueError, OSError) as exc:
+            values = None
+            result.update(
+                should_build="true",
+                tag_exists="false",
+                dockerfile_last_commit="",
+                tag_last_updated="",
+                reason=f"invalid_dockerfile_name: {exc}",
+            )
+        if values is not None:
+            result.update(image_name=values["IMAGENAME"], repo_name=values["REPONAME"])
+            result.update(
+                evaluate_docker_build_staleness(
+                    dockerfile_path=dockerfile,
+                    image_name=values["IMAGENAME"],
+                    dockerhub_namespace=dockerhub_namespace,
+                    repo_name=values["REPONAME"],
+                    session=session,
+                    git_index=git_index,
+                    tag_index=tag_index,
+                    staleness_mode=staleness_mode,
+                )
+            )
+        return result
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(evaluate, dockerfiles))
+    finally:
+        if owns_session:
+            session.close()
+    return results
+
+
+def docker_build_matrix(results):
+    """
+    Build a GitHub Actions matrix of only the images that need building.
+
+    Args:
+        results (list[dict]): Results of
+            [](`~ccbr_actions.docker.evaluate_docker_build_staleness_many`).
+
+    Returns:
+        dict: A matrix with an ``include`` entry (``dockerfile``, ``image_name``,
+            ``reason``) for each stale image, for use with ``fromJson``.
+
+    Examples:
+        >>> docker_build_matrix([
+        ...     {"dockerfile": "bwa/Dockerfile.v1", "image_name": "nciccbr/bwa:v1", "should_build": "true", "reason": "tag_not_found"},
+        ...     {"dockerfile": "star/Dockerfile.v2", "image_name": "nciccbr/star:v2", "should_build": "false", "reason": "tag_is_newer_or_equal_to_dockerfile"},
+        ... ])
+        {'include': [{'dockerfile': 'bwa/Dockerfile.v1', 'image_name': 'nciccbr/bwa:v1', 'reason': 'tag_not_found'}]}
+    """
+    return {
+        "include": [
+            {key: result[key] for key in ("dockerfile", "image_name", "reason")}
+            for result in results
+            if result["should_build"] == "true"
+        ]
+    }
+
+
+BUILD_ARG_PATTERN = re.compile(r"\$\{(\w+)(?::([-+])([^}]*))?\}|\$(\w+)")
+
+
+def substitute_build_args(text: str, build_args: Dict[str, str]) -> str:
+    """
+    Replace ``$NAME``, ``${NAME}``, ``${NAME:-default}``, and ``${NAME:+value}``
+    with build argument values, like Docker does in ``FROM`` lines.
+
+    Args:
+        text (str): Text with variable references.
+        build_args (dict): Values of the build arguments. Missing ones are empty.
+
+    Returns:
+        str: The text with variables replaced.
+
+    Examples:
+        >>> substitute_build_args("nciccbr/${BASE:-ccbr_base}:$TAG", {"TAG": "v1"})
+        'nciccbr/ccbr_base:v1'
+    """
+
+    def replace(match):
+        name = match.group(1) or match.group(4)
+        value = build_args.get(name, "")
+        if match.group(2) == "-":
+            value = value or match.group(3)
+        elif match.group(2) == "+":
+            value = match.group(3) if value else ""
+        return value
+
+    return BUILD_ARG_PATTERN.sub(replace, text)
+
+
+def normalize_image_reference(reference: str) -> str:
+    """
+    Write a Docker Hub image reference in full, as ``namespace/repo:tag``.
+
+    Args:
+        reference (str): An image reference, e.g. ``ubuntu`` or ``docker.io/nciccbr/bwa:v1``.
+
+    Returns:
+        str: The reference without the registry host or digest, with the
+            ``library`` namespace and ``latest`` tag filled in.
+
+    Examples:
+        >>> normalize_image_reference("ubuntu")
+        'library/ubuntu:latest'
+        >>> normalize_image_reference("docker.io/nciccbr/bwa:v1@sha256:abc")
+        'nciccbr/bwa:v1'
+    """
+    name = reference.split("@", 1)[0]
+    for registry in ("docker.io/", "index.docker.io/", "registry-1.docker.io/"):
+        name = name.removeprefix(registry)
+    if not image_tag_from_image_name(name):
+        name = f"{name}:latest"
+    if "/" not in name:
+        name = f"library/{name}"
+    return name
+
+
+def dockerfile_base_images(
+    dockerfile: str, build_args: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """
+    List the images a Dockerfile builds on.
+
+    These are the images of ``FROM`` instructions and ``COPY --from`` options
+    that are not earlier stages of the same Dockerfile (by ``AS`` alias or
+    index). Variables in them are replaced with the defaults of ``ARG``
+    instructions before the first ``FROM``, or with ``build_args``.
+
+    Args:
+        dockerfile (str): Path to the Dockerfile.
+        build_args (dict, optional): Build argument values that override the
+            ``ARG`` defaults.
+
+    Returns:
+        list[str]: Normalized image references (see
+            [](`~ccbr_actions.docker.normalize_image_reference`)), in order,
+            without duplicates.
+    """
+    global_args = {}
+    stages = set()
+    stage_count = 0
+    images = []
+    for instruction, arguments in dockerfile_instructions(dockerfile):
+        if instruction == "ARG" and not stage_count:
+            for definition in arguments.split():
+                name, _, value = definition.partition("=")
+                global_args[name] = value.strip("\"'")
+        elif instruction == "FROM":
+            _, values = split_instruction_arguments(arguments)
+            image = substitute_build_args(
+                values[0], {**global_args, **(build_args or {})}
+            )
+            if image.lower() not in stages and image != "scratch":
+                images.append(normalize_image_reference(image))
+            stages.add(str(stage_count))
+            stage_count += 1
+            if len(values) == 3 and values[1].upper() == "AS":
+                stages.add(values[2].lower())
+        elif instruction == "COPY":
+            flags, _ = split_instruction_arguments(arguments.split("\n")[0])
+            source = flags.get("from", "")
+            if source and source.lower() not in stages:
+                images.append(normalize_image_reference(source))
+    return list(dict.fromkeys(images))
+
+
+def docker_build_graph(
+    dockerfiles, dockerhub_namespace: str, suffix: str
+) -> Dict[str, List[str]]:
+    """
+    Find which of the Dockerfiles are built on images built by the others.
+
+    A Dockerfile depends on another when one of its base images (see
+    [](`~ccbr_actions.docker.dockerfile_base_images`)) is the image the other
+    is pushed as with this suffix, e.g. ``nciccbr/base:v1-dev`` for ``dev``.
+    The plain tag from the file name (e.g. ``nciccbr/base:v1``) only matches
+    for ``main``, since that is the only suffix that pushes it.
+
+    Args:
+        dockerfiles (list[str]): Paths to Dockerfiles in the repository.
+        dockerhub_namespace (str): Docker Hub namespace/org.
+        suffix (str): Suffix for the image tags (e.g., "dev", "main").
+
+    Returns:
+        dict: The Dockerfiles each Dockerfile depends on, in the order of ``dockerfiles``.
+    """
+    built_by = {}
+    for dockerfile in dockerfiles:
+        image = docker_build_variables(dockerfile, suffix, dockerhub_namespace)[
+            "IMAGENAME"
+        ]
+        built_by.setdefault(normalize_image_reference(image), dockerfile)
+    return {
+        dockerfile: list(
+            dict.fromkeys(
+                built_by[image]
+                for image in dockerfile_base_images(dockerfile)
+                if built_by.get(image, dockerfile) != dockerfile
+            )
+        )
+        for dockerfile in dockerfiles
+    }
+
+
+def plan_docker_builds(
+    dockerfiles,
+    stale: Optional[Dict[str, str]] = None,
+    dockerhub_namespace: str = "nciccbr",
+    suffix: str = "feat",
+) -> Dict[str, object]:
+    """
+    Plan the order of Docker builds so that base images are built first.
+
+    Every Dockerfile that depends, directly or not, on a stale one is stale
+    too, because its base image is about to change. The stale Dockerfiles are
+    split into waves: each wave only depends on images of earlier waves (or
+    images that are up to date), so the images in a wave can be built in
+    parallel.
+
+    Args:
+        dockerfiles (list[str]): Paths to all Dockerfiles in the repository,
+            so that dependents of stale images are found.
+        stale (dict, optional): The reason each stale Dockerfile needs
+            building, e.g. from
+            [](`~ccbr_actions.docker.evaluate_docker_build_staleness_many`).
+            Defaults to all Dockerfiles, with reason ``requested``.
+        dockerhub_namespace (str): Docker Hub namespace/org.
+        suffix (str): Suffix for the image tags (e.g., "dev", "main").
+
+    Returns:
+        dict: ``waves``, a list of GitHub Actions matrices (each with an
+            ``include`` entry of ``dockerfile``, ``image_name``, ``reason``, and
+            ``depends_on`` for each image), and ``matrix``, all entries in
+            build order with their ``wave`` number.
+
+    Raises:
+        ValueError: If the Dockerfiles depend on each other in a cycle.
+    """
+    dockerfiles = list(dict.fromkeys(dockerfiles))
+    stale = (
+        {dockerfile: "requested" for dockerfile in dockerfiles}
+        if stale is None
+        else dict(stale)
+    )
+    dockerfiles.extend(
+        dockerfile for dockerfile in stale if dockerfile not in dockerfiles
+    )
+    graph = docker_build_graph(dockerfiles, dockerhub_namespace, suffix)
+    dependents = collections.defaultdict(list)
+    for dockerfile, dependencies in graph.items():
+        for dependency in dependencies:
+            dependents[dependency].append(dockerfile)
+
+    reasons = dict(stale)
+    queue = collections.deque(stale)
+    while queue:
+        dockerfile = queue.popleft()
+        for dependent in dependents[dockerfile]:
+            if dependent not in reasons:
+                reasons[dependent] = f"base_image_stale: {dockerfile}"
+                queue.append(dependent)
+
+    waves = {}
+    visiting = {}
+
+    def wave_of(dockerfile):
+        if dockerfile in visiting:
+            raise ValueError(
+                f"Dockerfiles depend on each other in a cycle: {' -> '.join([*visiting, dockerfile])}"
+            )
+        if dockerfile not in waves:
+            visiting[dockerfile] = True
+            waves[dockerfile] = 1 + max(
+                [wave_of(dep) for dep in graph[dockerfile] if dep in reasons],
+                default=-1,
+            )
+            visiting.pop(dockerfile)
+        return waves[dockerfile]
+
+    entries = []
+    for dockerfile in dockerfiles:
+        if dockerfile in reasons:
+            values = docker_build_variables(dockerfile, suffix, dockerhub_namespace)
+            entries.append(
+                {
+                    "dockerfile": dockerfile,
+                    "image_name": values["IMAGENAME"],
+                    "reason": reasons[dockerfile],
+                    "depends_on": [dep for dep in graph[dockerfile] if dep in reasons],
+                    "wave": wave_of(dockerfile),
+                }
+            )
+    entries.sort(key=lambda entry: entry["wave"])
+    wave_count = max([entry["wave"] for entry in entries], default=-1) + 1
+    return {
+        "waves": [
+            {
+                "include": [
+                    {key: value for key, value in entry.items() if key != "wave"}
+                    for entry in entries
+                    if entry["wave"] == wave
+                ]
+            }
+            for wave in range(wave_count)
+        ],
+        "matrix": {"include": entries},
+    }
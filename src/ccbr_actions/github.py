@@ -2,10 +2,31 @@
 Shared utilities for interacting with the GitHub API.
 """
 
+import concurrent.futures
+import functools
+import hashlib
+import json
+import os
+import pathlib
+import random
+import re
+import tempfile
+import threading
+import time
+import urllib.parse
+
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 
 GITHUB_API_URL = "https://api.github.com"
 
+# Endpoints addressed by full commit SHAs never change once they exist.
+_SHA = r"[0-9a-f]{40}"
+IMMUTABLE_ENDPOINT_PATTERN = re.compile(
+    rf"/repos/[^/]+/[^/]+/(?:commits/{_SHA}|compare/{_SHA}\.\.\.{_SHA}|git/(?:commits|trees|blobs)/{_SHA})"
+)
+
 
 def github_api_headers(token=None, accept="application/vnd.github+json"):
     """
@@ -27,6 +48,756 @@ def github_api_headers(token=None, accept="application/vnd.github+json"):
     return headers
 
 
+def cache_root():
+    """
+    Get the root directory of the ccbr_actions caches.
+
+    Returns:
+        pathlib.Path: ``CCBR_ACTIONS_CACHE_DIR`` if set, otherwise ``~/.cache/ccbr_actions``.
+    """
+    return pathlib.Path(
+        os.environ.get("CCBR_ACTIONS_CACHE_DIR")
+        or pathlib.Path.home() / ".cache" / "ccbr_actions"
+    )
+
+
+def default_cache_dir():
+    """
+    Get the default directory for cached GitHub API responses.
+
+    Returns:
+        pathlib.Path: The ``github`` subdirectory of
+            [](`~ccbr_actions.github.cache_root`).
+    """
+    return cache_root() / "github"
+
+
+def is_immutable_url(url):
+    """
+    Check whether a GitHub API URL addresses immutable, SHA-addressed data.
+
+    Commits, comparisons between two full SHAs, and git objects never change,
+    so cached responses for them are reused without revalidation.
+
+    Args:
+        url (str): Full request URL, including any query string.
+
+    Returns:
+        bool: True if the URL path is a SHA-addressed endpoint.
+
+    Examples:
+        >>> is_immutable_url(f"{GITHUB_API_URL}/repos/CCBR/actions/commits/{'a' * 40}")
+        True
+        >>> is_immutable_url(f"{GITHUB_API_URL}/repos/CCBR/actions/commits/main")
+        False
+    """
+    path = urllib.parse.urlsplit(url).path
+    return bool(IMMUTABLE_ENDPOINT_PATTERN.fullmatch(path))
+
+
+class GitHubResponseCache:
+    """
+    On-disk cache of GitHub API GET responses using conditional requests.
+
+    Responses are stored with their ``ETag`` and ``Last-Modified`` headers.
+    Later requests for the same URL send ``If-None-Match`` and
+    ``If-Modified-Since``; a ``304 Not Modified`` reply (which does not count
+    against the GitHub rate limit) is answered from disk. SHA-addressed
+    endpoints (see [](`~ccbr_actions.github.is_immutable_url`)) are served
+    from disk without contacting GitHub at all.
+
+    Entries are keyed by the full URL, the ``Accept`` header, and a hash of
+    the ``Authorization`` header, so responses are never shared between
+    tokens. When the cache grows beyond ``max_size`` bytes, the least
+    recently used entries are removed.
+
+    The cache is a plain directory of files, so it can be persisted between
+    workflow runs with ``actions/cache``.
+
+    Args:
+        directory (str or pathlib.Path, optional): Cache directory. Defaults to
+            [](`~ccbr_actions.github.default_cache_dir`).
+        max_size (int): Maximum total size of cached responses in bytes.
+
+    Examples:
+        >>> cache = GitHubResponseCache()
+        >>> with GitHubClient(token="ghp_...", cache=cache) as client:
+        ...     list_rulesets("CCBR/actions", session=client)
+
+        Persist the cache between workflow runs:
+
+        ```yaml
+        - uses: actions/cache@v4
+          with:
+            path: ~/.cache/ccbr_actions
+            key: ccbr-actions-${{ github.run_id }}
+            restore-keys: ccbr-actions-
+        ```
+    """
+
+    def __init__(self, directory=None, max_size=100 * 1024 * 1024):
+        self.directory = pathlib.Path(directory or default_cache_dir())
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(url, headers=None):
+        """
+        Build the cache key for a GET request.
+
+        Args:
+            url (str): Full request URL, including any query string.
+            headers (dict, optional): Request headers.
+
+        Returns:
+            str: Hex digest identifying the URL and token scope.
+        """
+        headers = CaseInsensitiveDict(headers or {})
+        token_scope = hashlib.sha256(
+            headers.get("Authorization", "").encode()
+        ).hexdigest()
+        return hashlib.sha256(
+            json.dumps([url, headers.get("Accept", ""), token_scope]).encode()
+        ).hexdigest()
+
+    def _paths(self, key):
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def load(self, key):
+        """
+        Load a cached response.
+
+        Args:
+            key (str): Cache key from [](`~ccbr_actions.github.GitHubResponseCache.key`).
+
+        Returns:
+            dict or None: Entry metadata with the response ``body`` bytes, or
+                None if the entry is missing or unreadable.
+        """
+        meta_path, body_path = self._paths(key)
+        entry = None
+        try:
+            entry = json.loads(meta_path.read_text())
+            entry["body"] = body_path.read_bytes()
+        except (OSError, ValueError):
+            entry = None
+        return entry
+
+    def store(self, key, response):
+        """
+        Store a successful response, then evict old entries if needed.
+
+        Args:
+            key (str): Cache key from [](`~ccbr_actions.github.GitHubResponseCache.key`).
+            response (requests.Response): Response with status 200.
+        """
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in {"content-encoding", "content-length"}
+        }
+        entry = {
+            "url": response.url,
+            "status_code": response.status_code,
+            "encoding": response.encoding,
+            "headers": headers,
+        }
+        meta_path, body_path = self._paths(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atomic_write(body_path, response.content)
+        atomic_write(meta_path, json.dumps(entry).encode())
+        self.evict()
+
+    def touch(self, key):
+        """Mark an entry as recently used."""
+        for path in self._paths(key):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits ``max_size``."""
+        with self._lock:
+            entries = {}
+            paths = [*self.directory.glob("*.json"), *self.directory.glob("*.body")]
+            for path in paths:
+                try:
+                    stat = path.stat()
+                except OSError:
+                    stat = None
+                if stat:
+                    last_used, size = entries.get(path.stem, (0, 0))
+                    entries[path.stem] = (
+                        max(last_used, stat.st_mtime),
+                        size + stat.st_size,
+                    )
+            total_size = sum(size for _last_used, size in entries.values())
+            for key, (_last_used, size) in sorted(
+                entries.items(), key=lambda item: item[1][0]
+            ):
+                if total_size > self.max_size:
+                    for path in self._paths(key):
+                        path.unlink(missing_ok=True)
+                    total_size -= size
+
+    def record(self, outcome):
+        """Count a cache ``hit``, ``revalidated`` response, or ``miss``."""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        """
+        Report cache usage.
+
+        Returns:
+            dict: Numbers of ``hits`` served without a request,
+                ``revalidated`` responses (304), and ``misses``.
+        """
+        with self._lock:
+            stats = {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+            }
+        return stats
+
+    @staticmethod
+    def to_response(entry):
+        """
+        Rebuild a ``requests.Response`` from a cached entry.
+
+        Args:
+            entry (dict): Entry from [](`~ccbr_actions.github.GitHubResponseCache.load`).
+
+        Returns:
+            requests.Response: Response with the cached status, headers, and body.
+        """
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.reason = "OK"
+        response.url = entry["url"]
+        response.encoding = entry["encoding"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"]
+        return response
+
+
+def atomic_write(path, data):
+    """Write bytes to ``path`` via a temporary file so readers never see partial files."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+
+def _header_number(headers, *names):
+    """Read the first numeric value of the first present header, e.g. ``100;w=21600`` -> 100."""
+    values = [headers.get(name) for name in names if headers.get(name) is not None]
+    number = None
+    if values:
+        try:
+            number = float(str(values[0]).split(";")[0].strip())
+        except ValueError:
+            number = None
+    return number
+
+
+def is_secondary_rate_limit(response):
+    """
+    Check whether a response is a GitHub secondary rate limit (or exhausted primary limit).
+
+    GitHub reports both as ``403`` (or ``429``) with either a ``Retry-After``
+    header, ``X-RateLimit-Remaining: 0``, or a message mentioning the rate limit.
+
+    Args:
+        response (requests.Response): HTTP response.
+
+    Returns:
+        bool: True if the request was rejected because of a rate limit.
+    """
+    headers = getattr(response, "headers", None) or {}
+    text = str(getattr(response, "text", "") or "").lower()
+    return response.status_code in {403, 429} and (
+        "Retry-After" in headers
+        or _header_number(headers, "X-RateLimit-Remaining") == 0
+        or "rate limit" in text
+    )
+
+
+class _TokenBucket:
+    """Token bucket that hands out request slots at ``rate`` per second."""
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+        self.paused_until = now
+
+    def reserve(self, now):
+        """Take one token and return how many seconds to wait before using it."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(-self.tokens / self.rate, self.paused_until - now, 0.0)
+
+
+class RateLimitScheduler:
+    """
+    Rate-limit-aware scheduler for HTTP requests to GitHub and Docker Hub.
+
+    Only requests sent through a [](`~ccbr_actions.github.GitHubClient`) are
+    scheduled. Helpers that are called with their default ``session=requests``
+    send plain requests and bypass the scheduler, so pass a client as
+    ``session`` to pace them.
+
+    Each host gets a token bucket, so concurrent requests are spread out
+    instead of being sent in bursts. After every response the scheduler reads
+    ``X-RateLimit-Remaining`` and ``X-RateLimit-Reset`` (or Docker Hub's
+    ``RateLimit-Remaining``) and slows the host's bucket down to spread the
+    remaining budget until the reset, pausing entirely when it is exhausted.
+
+    Responses with status ``429`` or secondary rate limit ``403``
+    (see [](`~ccbr_actions.github.is_secondary_rate_limit`)) are retried for
+    every method, because the request was rejected before it was applied.
+    ``5xx`` responses are only retried for idempotent methods: a ``POST``
+    that failed with ``502`` may already have been applied, and sending it
+    again could e.g. create a duplicate ruleset or workflow run. The delay
+    honours ``Retry-After`` and the rate limit reset time when present, and
+    otherwise uses exponential backoff with full jitter.
+
+    Time spent waiting is recorded per host and reported by
+    [](`~ccbr_actions.github.RateLimitScheduler.summary`) to help tune concurrency.
+
+    Args:
+        rate (float): Maximum requests per second per host.
+        burst (int): Number of requests per host that may be sent back to back.
+        max_retries (int): Maximum number of retries per request.
+        backoff_base (float): Backoff in seconds before the first retry.
+        backoff_max (float): Upper bound for a single backoff or rate limit wait.
+        min_rate (float): Lowest request rate used when spreading a nearly
+            exhausted rate limit budget.
+
+    Examples:
+        >>> scheduler = RateLimitScheduler(rate=5)
+        >>> with GitHubClient(token="ghp_...", scheduler=scheduler) as client:
+        ...     for repo in repos:
+        ...         list_rulesets(repo, session=client)
+        >>> print(scheduler.format_summary())
+    """
+
+    RATE_LIMIT_STATUS_CODES = frozenset({429})
+    SERVER_ERROR_STATUS_CODES = frozenset({500, 502, 503, 504})
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+
+    def __init__(
+        self,
+        rate=10.0,
+        burst=20,
+        max_retries=5,
+        backoff_base=1.0,
+        backoff_max=60.0,
+        min_rate=0.05,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.min_rate = min_rate
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._stats = {}
+        # overridable for testing
+        self.sleep = time.sleep
+        self.clock = time.monotonic
+        self.wall_clock = time.time
+        self.jitter = random.random
+
+    def _host_stats(self, host):
+        return self._stats.setdefault(
+            host,
+            {
+                "requests": 0,
+                "retries": 0,
+                "throttle_seconds": 0.0,
+                "backoff_seconds": 0.0,
+            },
+        )
+
+    def _bucket(self, host):
+        if host not in self._buckets:
+            self._buckets[host] = _TokenBucket(self.rate, self.burst, self.clock())
+        return self._buckets[host]
+
+    def _wait(self, host, seconds, kind):
+        seconds = min(max(seconds, 0.0), self.backoff_max)
+        if seconds > 0:
+            with self._lock:
+                self._host_stats(host)[f"{kind}_seconds"] += seconds
+            self.sleep(seconds)
+
+    def acquire(self, host):
+        """
+        Wait until the host's token bucket allows another request.
+
+        Args:
+            host (str): Host name, e.g. ``api.github.com``.
+        """
+        with self._lock:
+            delay = self._bucket(host).reserve(self.clock())
+            self._host_stats(host)["requests"] += 1
+        self._wait(host, delay, "throttle")
+
+    def update(self, host, response):
+        """
+        Adapt the host's request rate to the rate limit headers of a response.
+
+        Args:
+            host (str): Host name.
+            response (requests.Response): HTTP response.
+        """
+        headers = getattr(response, "headers", None) or {}
+        remaining = _header_number(
+            headers, "X-RateLimit-Remaining", "RateLimit-Remaining"
+        )
+        reset = _header_number(headers, "X-RateLimit-Reset", "RateLimit-Reset")
+        if remaining is not None and reset is not None:
+            now = self.clock()
+            seconds_to_reset = max(reset - self.wall_clock(), 1.0)
+            with self._lock:
+                bucket = self._bucket(host)
+                bucket.rate = min(
+                    self.rate, max(remaining / seconds_to_reset, self.min_rate)
+                )
+                if remaining <= 0:
+                    bucket.paused_until = now + min(seconds_to_reset, self.backoff_max)
+
+    def retry_delay(self, response, attempt, method="GET"):
+        """
+        Decide whether and how long to wait before retrying a response.
+
+        Args:
+            response (requests.Response): HTTP response.
+            attempt (int): Number of retries already made for this request.
+            method (str): HTTP method of the request.
+
+        Returns:
+            float or None: Seconds to wait before retrying, or None to accept
+                the response.
+        """
+        headers = getattr(response, "headers", None) or {}
+        is_retryable = (
+            response.status_code in self.RATE_LIMIT_STATUS_CODES
+            or is_secondary_rate_limit(response)
+            or (
+                response.status_code in self.SERVER_ERROR_STATUS_CODES
+                and method.upper() in self.IDEMPOTENT_METHODS
+            )
+        )
+        retry_after = _header_number(headers, "Retry-After")
+        reset = _header_number(headers, "X-RateLimit-Reset", "RateLimit-Reset")
+        remaining = _header_number(
+            headers, "X-RateLimit-Remaining", "RateLimit-Remaining"
+        )
+        delay = None
+        if is_retryable and attempt < self.max_retries:
+            if retry_after is not None:
+                delay = retry_after
+            elif remaining == 0 and reset is not None:
+                delay = reset - self.wall_clock()
+            else:
+                delay = self.jitter() * min(
+                    self.backoff_max, self.backoff_base * 2**attempt
+                )
+        return delay
+
+    def send(self, url, send, *args, method="GET", **kwargs):
+        """
+        Send a request through the scheduler, retrying rate-limited and failed responses.
+
+        Args:
+            url (str): Request URL, used to pick the host's token bucket.
+            send (callable): Function performing the request and returning a
+                response, e.g. ``session.request``.
+            *args: Positional arguments passed to ``send``.
+            method (str): HTTP method of the request, which decides whether
+                server errors are retried (see
+                [](`~ccbr_actions.github.RateLimitScheduler.retry_delay`)).
+            **kwargs: Keyword arguments passed to ``send``.
+
+        Returns:
+            requests.Response: The final response.
+        """
+        host = urllib.parse.urlsplit(url).netloc
+        attempt = 0
+        response = None
+        is_done = False
+        while not is_done:
+            self.acquire(host)
+            response = send(*args, **kwargs)
+            self.update(host, response)
+            delay = self.retry_delay(response, attempt, method)
+            is_done = delay is None
+            if not is_done:
+                with self._lock:
+                    self._host_stats(host)["retries"] += 1
+                self._wait(host, delay, "backoff")
+                attempt += 1
+        return response
+
+    def summary(self):
+        """
+        Summarize requests, retries, and time spent waiting.
+
+        Returns:
+            dict: Totals (``requests``, ``retries``, ``throttle_seconds``,
+                ``backoff_seconds``, ``wait_seconds``) and the same numbers
+                per host under ``hosts``.
+        """
+        with self._lock:
+            hosts = {host: dict(stats) for host, stats in self._stats.items()}
+        totals = {
+            key: sum(stats[key] for stats in hosts.values())
+            for key in ("requests", "retries", "throttle_seconds", "backoff_seconds")
+        }
+        totals["wait_seconds"] = totals["throttle_seconds"] + totals["backoff_seconds"]
+        return {**totals, "hosts": hosts}
+
+    def format_summary(self):
+        """
+        Format the wait summary as a Markdown table, e.g. for ``GITHUB_STEP_SUMMARY``.
+
+        Returns:
+            str: Markdown table with one row per host.
+        """
+        summary = self.summary()
+        rows = [
+            "| host | requests | retries | throttled (s) | backoff (s) |",
+            "| --- | ---: | ---: | ---: | ---: |",
+        ]
+        rows.extend(
+            f"| {host} | {stats['requests']} | {stats['retries']} | "
+            f"{stats['throttle_seconds']:.1f} | {stats['backoff_seconds']:.1f} |"
+            for host, stats in sorted(summary["hosts"].items())
+        )
+        rows.append(
+            f"\nTotal time waiting for rate limits: {summary['wait_seconds']:.1f} s"
+        )
+        return "\n".join(rows) + "\n"
+
+
+@functools.cache
+def default_scheduler():
+    """
+    Get the scheduler shared by all [](`~ccbr_actions.github.GitHubClient`) instances by default.
+
+    Sharing one scheduler keeps concurrent clients within a single per-host budget.
+
+    Returns:
+        RateLimitScheduler: The process-wide scheduler.
+    """
+    return RateLimitScheduler()
+
+
+class GitHubClient:
+    """
+    Pooled, keep-alive HTTP client for the GitHub API.
+
+    Owns a ``requests.Session`` whose connection pool is reused across calls,
+    so looping over many repositories pays TCP and TLS setup once per host
+    instead of once per request. Instances can be passed anywhere a
+    ``session`` argument is accepted (e.g. [](`~ccbr_actions.github.list_rulesets`),
+    [](`~ccbr_actions.github.copy_ruleset`),
+    [](`~ccbr_actions.changed_files.get_changed_file_list`), and
+    [](`~ccbr_actions.docker.dockerhub_tag_last_updated`)).
+
+    The authorization header is only attached to requests sent to the
+    GitHub API host, so the same client can safely be used for other hosts
+    such as Docker Hub.
+
+    With a [](`~ccbr_actions.github.GitHubResponseCache`), GET requests to the
+    GitHub API are revalidated with conditional headers and answered from
+    disk when unchanged.
+
+    Every request that goes over the network is paced and retried by a
+    [](`~ccbr_actions.github.RateLimitScheduler`).
+
+    Args:
+        token (str, optional): GitHub token shared by all requests to the GitHub API.
+        pool_connections (int): Number of per-host connection pools to cache.
+        pool_maxsize (int): Maximum number of connections kept alive per host.
+        base_url (str): Base URL of the GitHub API.
+        cache (GitHubResponseCache, optional): On-disk cache for GET responses.
+        scheduler (RateLimitScheduler, optional): Scheduler pacing requests per
+            host. Defaults to [](`~ccbr_actions.github.default_scheduler`).
+
+    Examples:
+        >>> with GitHubClient(token="ghp_...") as client:
+        ...     for repo in ["CCBR/actions", "CCBR/Tools"]:
+        ...         list_rulesets(repo, session=client)
+        ...     client.connection_stats()
+        {'requests': 2, 'connections_opened': 1, 'connections_reused': 1}
+    """
+
+    def __init__(
+        self,
+        token=None,
+        pool_connections=10,
+        pool_maxsize=10,
+        base_url=GITHUB_API_URL,
+        cache=None,
+        scheduler=None,
+    ):
+        self.token = token
+        self.base_url = base_url
+        self.cache = cache
+        self.scheduler = scheduler or default_scheduler()
+        self._api_host = urllib.parse.urlsplit(base_url).netloc
+        self._auth_headers = github_api_headers(token=token)
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session = requests.Session()
+        self.session.headers["Connection"] = "keep-alive"
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self._lock = threading.Lock()
+        self._request_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def is_api_url(self, url):
+        """
+        Check whether a URL points at the GitHub API host of this client.
+
+        Args:
+            url (str): Full request URL.
+
+        Returns:
+            bool: True if ``url`` has the same host as ``base_url``.
+        """
+        return urllib.parse.urlsplit(url).netloc == self._api_host
+
+    def request(self, method, url, headers=None, **kwargs):
+        """
+        Send a request over the pooled session.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Full request URL.
+            headers (dict, optional): Extra headers. These take precedence over
+                the client's shared GitHub headers.
+            **kwargs: Additional arguments passed to ``requests.Session.request``.
+
+        Returns:
+            requests.Response: HTTP response.
+        """
+        request_headers = dict(self._auth_headers) if self.is_api_url(url) else {}
+        request_headers.update(headers or {})
+        response = None
+        if self.cache is not None and method == "GET" and self.is_api_url(url):
+            response = self._cached_get(url, request_headers, **kwargs)
+        else:
+            response = self._send(method, url, request_headers, **kwargs)
+        return response
+
+    def _send(self, method, url, headers, **kwargs):
+        send = functools.partial(
+            self._send_once, method=method, url=url, headers=headers, **kwargs
+        )
+        return self.scheduler.send(url, send, method=method)
+
+    def _send_once(self, **kwargs):
+        response = self.session.request(**kwargs)
+        with self._lock:
+            self._request_count += 1
+        return response
+
+    def _cached_get(self, url, headers, params=None, **kwargs):
+        full_url = requests.Request("GET", url, params=params).prepare().url
+        key = self.cache.key(full_url, headers)
+        entry = self.cache.load(key)
+        response = None
+        if entry is not None and is_immutable_url(full_url):
+            self.cache.record("hits")
+            self.cache.touch(key)
+            response = self.cache.to_response(entry)
+        else:
+            conditional_headers = dict(headers)
+            entry_headers = CaseInsensitiveDict(entry["headers"] if entry else {})
+            if "ETag" in entry_headers:
+                conditional_headers["If-None-Match"] = entry_headers["ETag"]
+            if "Last-Modified" in entry_headers:
+                conditional_headers["If-Modified-Since"] = entry_headers[
+                    "Last-Modified"
+                ]
+            response = self._send("GET", full_url, conditional_headers, **kwargs)
+            if response.status_code == 304 and entry is not None:
+                self.cache.record("revalidated")
+                self.cache.touch(key)
+                response = self.cache.to_response(entry)
+            else:
+                self.cache.record("misses")
+                is_cacheable = response.status_code == 200 and (
+                    "ETag" in response.headers
+                    or "Last-Modified" in response.headers
+                    or is_immutable_url(full_url)
+                )
+                if is_cacheable:
+                    self.cache.store(key, response)
+        return response
+
+    def get(self, url, **kwargs):
+        """Send a GET request. See [](`~ccbr_actions.github.GitHubClient.request`)."""
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        """Send a HEAD request. See [](`~ccbr_actions.github.GitHubClient.request`)."""
+        return self.request("HEAD", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Send a POST request. See [](`~ccbr_actions.github.GitHubClient.request`)."""
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        """Send a PUT request. See [](`~ccbr_actions.github.GitHubClient.request`)."""
+        return self.request("PUT", url, **kwargs)
+
+    def connection_stats(self):
+        """
+        Report how many requests were served by reused connections.
+
+        Returns:
+            dict: ``requests`` sent, ``connections_opened`` by the pool, and
+                ``connections_reused`` (requests that did not need a new connection).
+        """
+        # urllib3's pool container does not support iteration, only keys()
+        pools = self._adapter.poolmanager.pools
+        connections_opened = sum(
+            getattr(pools[key], "num_connections", 0) for key in list(pools.keys())
+        )
+        with self._lock:
+            request_count = self._request_count
+        return {
+            "requests": request_count,
+            "connections_opened": connections_opened,
+            "connections_reused": max(request_count - connections_opened, 0),
+        }
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
 def github_api_request(method, url, token=None, session=requests, **kwargs):
     """
     Execute a GitHub API request.
@@ -35,7 +806,11 @@ def github_api_request(method, url, token=None, session=requests, **kwargs):
         method (str): HTTP method.
         url (str): Full API URL.
         token (str, optional): GitHub token.
-        session: Object with a requests-compatible ``request`` method.
+        session: Object with a requests-compatible ``request`` method, such
+            as a [](`~ccbr_actions.github.GitHubClient`). Only requests sent
+            through a client are paced by its
+            [](`~ccbr_actions.github.RateLimitScheduler`); the default
+            ``requests`` module is not.
         **kwargs: Additional arguments passed to ``session.request``.
 
     Returns:
@@ -78,6 +853,136 @@ def github_api_get(url, token=None, session=requests, **kwargs):
     return response.json()
 
 
+def github_api_paginate(
+    url, token=None, session=requests, per_page=100, items_key=None, **kwargs
+):
+    """
+    Lazily iterate over every item of a paginated GitHub API listing.
+
+    Follows ``Link: rel="next"`` headers one page at a time and yields items
+    as each page arrives, so callers can stop early without fetching the
+    remaining pages and memory use stays flat for large listings.
+
+    Args:
+        url (str): Full API URL of the first page.
+        token (str, optional): GitHub token.
+        session: Object with a requests-compatible ``request`` method.
+        per_page (int): Number of items to request per page (GitHub allows up to 100).
+        items_key (str, optional): Key holding the item list when the endpoint
+            wraps results in an object (e.g. ``"workflow_runs"``).
+        **kwargs: Additional arguments passed to ``github_api_request``.
+
+    Yields:
+        dict: Items from each page, in order.
+
+    Raises:
+        requests.HTTPError: If any page request fails.
+
+    Examples:
+        >>> for ruleset in github_api_paginate(
+        ...     "https://api.github.com/repos/CCBR/actions/rulesets"
+        ... ):
+        ...     print(ruleset["name"])
+    """
+    params = dict(kwargs.pop("params", None) or {})
+    params.setdefault("per_page", per_page)
+    next_url = url
+    while next_url:
+        response = github_api_request(
+            method="GET",
+            url=next_url,
+            token=token,
+            session=session,
+            params=params,
+            **kwargs,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        yield from payload[items_key] if items_key else payload
+        # the next link already carries the query string of the first request
+        params = None
+        links = getattr(response, "links", None) or {}
+        next_url = links.get("next", {}).get("url")
+
+
+def github_api_get_all_pages(
+    url,
+    token=None,
+    session=requests,
+    per_page=100,
+    items_key=None,
+    max_workers=8,
+    **kwargs,
+):
+    """
+    Fetch every page of a GitHub API listing, requesting pages concurrently.
+
+    The first page is fetched on its own to learn the page count from the
+    ``Link: rel="last"`` header. The remaining pages are then requested in
+    parallel, so large listings take roughly as long as the slowest page
+    rather than the sum of all pages.
+
+    Args:
+        url (str): Full API URL of the listing.
+        token (str, optional): GitHub token.
+        session: Object with a requests-compatible ``request`` method. It is
+            shared by the worker threads.
+        per_page (int, optional): Number of items to request per page. Pass
+            ``None`` to use the endpoint's default page size.
+        items_key (str, optional): Key holding the item list when the endpoint
+            wraps results in an object (e.g. ``"files"`` for commits).
+        max_workers (int): Maximum number of pages fetched at the same time.
+        **kwargs: Additional arguments passed to ``github_api_request``.
+
+    Returns:
+        list: Items from all pages, in page order.
+
+    Raises:
+        requests.HTTPError: If any page request fails.
+    """
+    base_params = dict(kwargs.pop("params", None) or {})
+    if per_page:
+        base_params["per_page"] = per_page
+
+    def fetch_page(page):
+        response = github_api_request(
+            method="GET",
+            url=url,
+            token=token,
+            session=session,
+            params={**base_params, "page": page},
+            **kwargs,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        items = payload[items_key] if items_key else payload
+        return items, getattr(response, "links", None) or {}
+
+    items, links = fetch_page(1)
+    last_page = last_page_number(links)
+    all_items = list(items)
+    if last_page > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for page_items, _links in pool.map(fetch_page, range(2, last_page + 1)):
+                all_items.extend(page_items)
+    return all_items
+
+
+def last_page_number(links):
+    """
+    Get the last page number from parsed ``Link`` header relations.
+
+    Args:
+        links (dict): Parsed ``Link`` relations as provided by ``requests.Response.links``.
+
+    Returns:
+        int: Page number of the ``last`` relation, or 1 when there is none.
+    """
+    last_url = links.get("last", {}).get("url", "")
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(last_url).query)
+    return int(query.get("page", ["1"])[0])
+
+
 def github_api_post(url, token=None, session=requests, **kwargs):
     """
     Perform a POST request against the GitHub API.
@@ -96,15 +1001,37 @@ def github_api_post(url, token=None, session=requests, **kwargs):
     )
 
 
+def github_api_put(url, token=None, session=requests, **kwargs):
+    """
+    Perform a PUT request against the GitHub API.
+
+    Args:
+        url (str): Full API URL.
+        token (str, optional): GitHub token.
+        session: Object with a requests-compatible ``request`` method.
+        **kwargs: Additional arguments passed to ``github_api_request``.
+
+    Returns:
+        requests.Response: HTTP response.
+    """
+    return github_api_request(
+        method="PUT", url=url, token=token, session=session, **kwargs
+    )
+
+
 def list_rulesets(repo, token=None, session=requests):
     """
     List all rulesets for a GitHub repository.
 
+    All pages of the listing are fetched with
+    [](`~ccbr_actions.github.github_api_paginate`).
+
     Args:
         repo (str): Repository in ``owner/repo`` format.
         token (str, optional): GitHub token with ``repo`` scope.
         session: Object with a requests-compatible ``request`` method, or a
-            method-only interface providing ``get``.
+            method-only interface providing ``get``. Pass a
+            [](`~ccbr_actions.github.GitHubClient`) to reuse connections.
     Returns:
         list[dict]: Rulesets as returned by the GitHub API. Each item
             contains at minimum ``id``, ``name``, and ``enforcement``.
@@ -116,7 +1043,242 @@ def list_rulesets(repo, token=None, session=requests):
         >>> list_rulesets("CCBR/actions", token="ghp_...")
     """
     url = f"{GITHUB_API_URL}/repos/{repo}/rulesets"
-    return github_api_get(url, token=token, session=session)
+    return list(github_api_paginate(url, token=token, session=session))
+
+
+def read_repos_file(path):
+    """
+    Read a list of repositories from a JSON file.
+
+    Accepts either the ``.github/repos.json`` layout, mapping owners to
+    repository names, or a plain list of ``owner/repo`` strings.
+
+    Args:
+        path (str or pathlib.Path): Path to the JSON file.
+
+    Returns:
+        list[str]: Repositories in ``owner/repo`` format, in file order.
+
+    Raises:
+        ValueError: If the file has neither layout.
+
+    Examples:
+        >>> read_repos_file(".github/repos.json")[:2]
+        ['CCBR/actions', 'CCBR/ASPEN']
+    """
+    data = json.loads(pathlib.Path(path).read_text())
+    repos = None
+    if isinstance(data, dict) and isinstance(data.get("owners"), dict):
+        repos = [
+            f"{owner}/{name}"
+            for owner, names in data["owners"].items()
+            for name in names
+        ]
+    elif isinstance(data, list) and all(isinstance(repo, str) for repo in data):
+        repos = list(data)
+    else:
+        raise ValueError(
+            f"{path} must contain {{'owners': {{owner: [repo, ...]}}}} or a list of 'owner/repo' strings."
+        )
+    return repos
+
+
+# Fields GitHub returns for a ruleset that cannot be sent when creating or updating one.
+RULESET_READ_ONLY_FIELDS = frozenset(
+    {
+        "id",
+        "node_id",
+        "created_at",
+        "updated_at",
+        "_links",
+        "source",
+        "source_type",
+        "current_user_can_bypass",
+    }
+)
+
+
+def find_ruleset(rulesets, ruleset_name, repo):
+    """
+    Find a ruleset by name.
+
+    Args:
+        rulesets (list[dict]): Rulesets as returned by
+            [](`~ccbr_actions.github.list_rulesets`).
+        ruleset_name (str): Name of the ruleset to find.
+        repo (str): Repository the rulesets belong to, used in the error message.
+
+    Returns:
+        dict: The first ruleset named ``ruleset_name``.
+
+    Raises:
+        ValueError: If no ruleset with ``ruleset_name`` is found.
+    """
+    match = next((r for r in rulesets if r.get("name") == ruleset_name), None)
+    if match is None:
+        available = [r.get("name") for r in rulesets]
+        raise ValueError(
+            f"Ruleset {ruleset_name!r} not found in {repo!r}. "
+            f"Available rulesets: {available}"
+        )
+    return match
+
+
+def ruleset_payload(ruleset):
+    """
+    Build a create/update payload from a full ruleset definition.
+
+    Args:
+        ruleset (dict): Ruleset as returned by the ruleset detail endpoint.
+
+    Returns:
+        dict: The ruleset without read-only fields.
+    """
+    return {k: v for k, v in ruleset.items() if k not in RULESET_READ_ONLY_FIELDS}
+
+
+def _normalize_json(value):
+    """Recursively sort lists so that JSON values compare regardless of item order."""
+    normalized = value
+    if isinstance(value, dict):
+        normalized = {key: _normalize_json(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        normalized = sorted(
+            (_normalize_json(item) for item in value),
+            key=lambda item: json.dumps(item, sort_keys=True),
+        )
+    return normalized
+
+
+def normalize_ruleset(ruleset):
+    """
+    Normalize a ruleset definition for comparison.
+
+    Read-only fields are dropped (see
+    [](`~ccbr_actions.github.ruleset_payload`)) and every list is sorted, since
+    the order of rules, conditions, and bypass actors has no meaning.
+
+    Args:
+        ruleset (dict): Ruleset definition or payload.
+
+    Returns:
+        dict: Normalized ruleset.
+
+    Examples:
+        >>> normalize_ruleset({"id": 1, "name": "main", "rules": [{"type": "b"}, {"type": "a"}]})
+        {'name': 'main', 'rules': [{'type': 'a'}, {'type': 'b'}]}
+    """
+    return _normalize_json(ruleset_payload(ruleset))
+
+
+def ruleset_sync_action(existing, payload):
+    """
+    Decide how to bring a repository's ruleset in line with a payload.
+
+    Args:
+        existing (dict or None): Full definition of the target's ruleset with
+            the same name, or None if there is none.
+        payload (dict): Desired ruleset payload.
+
+    Returns:
+        str: ``created`` if the ruleset is missing, ``unchanged`` if the
+            normalized definitions match, otherwise ``updated``.
+    """
+    action = "created"
+    if existing is not None:
+        action = (
+            "unchanged"
+            if normalize_ruleset(existing) == normalize_ruleset(payload)
+            else "updated"
+        )
+    return action
+
+
+def repository_rulesets(rulesets):
+    """Keep only rulesets defined on the repository itself, not inherited from its organization."""
+    return [r for r in rulesets if r.get("source_type", "Repository") == "Repository"]
+
+
+def get_ruleset_by_name(repo, ruleset_name, token=None, session=requests):
+    """
+    Fetch the full definition of a repository's ruleset by name.
+
+    Args:
+        repo (str): Repository in ``owner/repo`` format.
+        ruleset_name (str): Name of the ruleset.
+        token (str, optional): GitHub token with ``repo`` scope.
+        session: Object with a requests-compatible ``request`` method.
+
+    Returns:
+        dict: Ruleset as returned by the ruleset detail endpoint (the list
+            endpoint omits some fields).
+
+    Raises:
+        ValueError: If no ruleset with ``ruleset_name`` is found in ``repo``.
+        requests.HTTPError: If any GitHub API request fails.
+    """
+    list_url = f"{GITHUB_API_URL}/repos/{repo}/rulesets"
+    rulesets = list(github_api_paginate(list_url, token=token, session=session))
+    match = find_ruleset(rulesets, ruleset_name, repo)
+    return github_api_get(f"{list_url}/{match['id']}", token=token, session=session)
+
+
+def read_ruleset_snapshot(path):
+    """
+    Read a ruleset snapshot written by [](`~ccbr_actions.github.write_ruleset_snapshot`).
+
+    Args:
+        path (str or pathlib.Path): Path to the JSON Lines snapshot.
+
+    Returns:
+        list[dict]: Snapshot records, or an empty list if the file does not exist.
+    """
+    path = pathlib.Path(path)
+    records = []
+    if path.exists():
+        with open(path, encoding="utf-8") as fh:
+            records = [json.loads(line) for line in fh if line.strip()]
+    return records
+
+
+def write_ruleset_snapshot(path, records):
+    """
+    Write a ruleset snapshot as compact JSON Lines.
+
+    Each line holds one ruleset: ``repo``, ``id``, ``name``, ``updated_at``,
+    and the full ``ruleset`` definition. Records are sorted by repository and
+    ruleset ID so snapshots diff cleanly, and the file is replaced atomically.
+
+    Args:
+        path (str or pathlib.Path): Path to the JSON Lines snapshot.
+        records (list[dict]): Snapshot records.
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = [
+        json.dumps(record, separators=(",", ":"), sort_keys=True)
+        for record in sorted(records, key=lambda r: (r["repo"], r["id"]))
+    ]
+    atomic_write(path, "".join(f"{line}\n" for line in lines).encode())
+
+
+def find_snapshot_ruleset(records, repo, ruleset_name):
+    """
+    Find a ruleset definition in a snapshot, without using the network.
+
+    Args:
+        records (list[dict]): Records from [](`~ccbr_actions.github.read_ruleset_snapshot`).
+        repo (str): Repository in ``owner/repo`` format.
+        ruleset_name (str): Name of the ruleset.
+
+    Returns:
+        dict: The full ruleset definition.
+
+    Raises:
+        ValueError: If the snapshot has no ruleset with ``ruleset_name`` for ``repo``.
+    """
+    rulesets = [record["ruleset"] for record in records if record["repo"] == repo]
+    return find_ruleset(rulesets, ruleset_name, repo)
 
 
 def copy_ruleset(
@@ -125,6 +1287,7 @@ def copy_ruleset(
     ruleset_name,
     token=None,
     session=requests,
+    ruleset=None,
 ):
     """
     Copy a ruleset from one GitHub repository to another.
@@ -138,7 +1301,11 @@ def copy_ruleset(
         ruleset_name (str): Name of the ruleset to copy.
         token (str, optional): GitHub token with ``repo`` scope.
         session: Object with a requests-compatible ``request`` method, or a
-            method-only interface providing ``get``/``post``.
+            method-only interface providing ``get``/``post``. Pass a
+            [](`~ccbr_actions.github.GitHubClient`) to reuse connections.
+        ruleset (dict, optional): Full source ruleset definition, e.g. from a
+            snapshot (see [](`~ccbr_actions.github.find_snapshot_ruleset`)).
+            When given, the source repository is not queried.
     Returns:
         dict: The created ruleset as returned by the GitHub API.
 
@@ -155,30 +1322,114 @@ def copy_ruleset(
         ...     token="ghp_...",
         ... )
     """
-    # Fetch all rulesets from the source repository
-    list_url = f"{GITHUB_API_URL}/repos/{source_repo}/rulesets"
-    rulesets = github_api_get(list_url, token=token, session=session)
-
-    # Find the matching ruleset by name
-    match = next((r for r in rulesets if r.get("name") == ruleset_name), None)
-    if match is None:
-        available = [r.get("name") for r in rulesets]
-        raise ValueError(
-            f"Ruleset {ruleset_name!r} not found in {source_repo!r}. "
-            f"Available rulesets: {available}"
+    if ruleset is None:
+        ruleset = get_ruleset_by_name(
+            source_repo, ruleset_name, token=token, session=session
         )
 
-    # Fetch the full ruleset definition (the list endpoint omits some fields)
-    ruleset_id = match["id"]
-    detail_url = f"{GITHUB_API_URL}/repos/{source_repo}/rulesets/{ruleset_id}"
-    ruleset = github_api_get(detail_url, token=token, session=session)
-
     # Build the payload for the target repository, dropping read-only fields
-    _read_only_fields = {"id", "node_id", "created_at", "updated_at", "_links"}
-    payload = {k: v for k, v in ruleset.items() if k not in _read_only_fields}
+    payload = ruleset_payload(ruleset)
 
     # Create the ruleset in the target repository
     create_url = f"{GITHUB_API_URL}/repos/{target_repo}/rulesets"
     response = github_api_post(create_url, token=token, session=session, json=payload)
     response.raise_for_status()
     return response.json()
+
+
+def sync_ruleset(
+    source_repo,
+    target_repo,
+    ruleset_name,
+    token=None,
+    session=requests,
+    ruleset=None,
+):
+    """
+    Idempotently sync a ruleset from one GitHub repository to another.
+
+    Unlike [](`~ccbr_actions.github.copy_ruleset`), which always creates a
+    new ruleset, the target's rulesets are matched by name and the normalized
+    definitions are compared (see [](`~ccbr_actions.github.normalize_ruleset`)).
+    Nothing is written when they already match, an existing ruleset is
+    updated in place when they differ, and a ruleset is created only when
+    the target has none with that name.
+
+    Args:
+        source_repo (str): Source repository in ``owner/repo`` format.
+        target_repo (str): Target repository in ``owner/repo`` format.
+        ruleset_name (str): Name of the ruleset to sync.
+        token (str, optional): GitHub token with ``repo`` scope.
+        session: Object with a requests-compatible ``request`` method, or a
+            method-only interface providing ``get``/``post``/``put``.
+        ruleset (dict, optional): Full source ruleset definition. When given,
+            the source repository is not queried.
+
+    Returns:
+        dict: ``action`` (``created``, ``updated``, or ``unchanged``) and the
+            target's resulting ``ruleset``.
+
+    Raises:
+        ValueError: If no ruleset with ``ruleset_name`` is found in
+            ``source_repo``.
+        requests.HTTPError: If any GitHub API request fails.
+
+    Examples:
+        >>> sync_ruleset("CCBR/actions", "CCBR/other-repo", "Require PR reviews")
+        {'action': 'unchanged', 'ruleset': {...}}
+    """
+    if ruleset is None:
+        ruleset = get_ruleset_by_name(
+            source_repo, ruleset_name, token=token, session=session
+        )
+    payload = ruleset_payload(ruleset)
+    return sync_ruleset_payload(target_repo, payload, token=token, session=session)
+
+
+def sync_ruleset_payload(target_repo, payload, token=None, session=requests):
+    """
+    Create, update, or leave alone a target repository's ruleset to match a payload.
+
+    See [](`~ccbr_actions.github.sync_ruleset`).
+
+    Args:
+        target_repo (str): Target repository in ``owner/repo`` format.
+        payload (dict): Desired ruleset payload; its ``name`` is matched
+            against the target's rulesets.
+        token (str, optional): GitHub token with ``repo`` scope.
+        session: Object with a requests-compatible ``request`` method.
+
+    Returns:
+        dict: ``action`` (``created``, ``updated``, or ``unchanged``) and the
+            target's resulting ``ruleset``.
+
+    Raises:
+        requests.HTTPError: If any GitHub API request fails.
+    """
+    target_url = f"{GITHUB_API_URL}/repos/{target_repo}/rulesets"
+    target_rulesets = repository_rulesets(
+        list(github_api_paginate(target_url, token=token, session=session))
+    )
+    match = next(
+        (r for r in target_rulesets if r.get("name") == payload.get("name")), None
+    )
+    existing = (
+        github_api_get(f"{target_url}/{match['id']}", token=token, session=session)
+        if match
+        else None
+    )
+    action = ruleset_sync_action(existing, payload)
+    ruleset = existing
+    if action == "created":
+        response = github_api_post(
+            target_url, token=token, session=session, json=payload
+        )
+        response.raise_for_status()
+        ruleset = response.json()
+    elif action == "updated":
+        response = github_api_put(
+            f"{target_url}/{existing['id']}", token=token, session=session, json=payload
+        )
+        response.raise_for_status()
+        ruleset = response.json()
+    return {"action": action, "ruleset": ruleset}
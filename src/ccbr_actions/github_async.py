@@ -0,0 +1,481 @@
+"""
+Awaitable equivalents of the GitHub API helpers for high-concurrency fan-out.
+
+Requests run on a thread pool over one pooled
+[](`~ccbr_actions.github.GitHubClient`), so many repositories can be
+processed at once while connections, rate limits, and response caching are
+shared with the synchronous helpers in [](`~ccbr_actions.github`).
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+
+import requests
+
+from .github import (
+    GITHUB_API_URL,
+    GitHubClient,
+    find_ruleset,
+    github_api_get,
+    github_api_post,
+    github_api_request,
+    repository_rulesets,
+    ruleset_payload,
+    sync_ruleset_payload,
+)
+
+
+class AsyncGitHubClient:
+    """
+    Shared connection pool and concurrency limit for the async GitHub helpers.
+
+    Blocking requests run on a dedicated thread pool sized to
+    ``max_concurrency``, and a semaphore bounds how many are in flight at
+    once, so ``asyncio.gather`` over hundreds of calls never opens more than
+    ``max_concurrency`` connections.
+
+    Args:
+        token (str, optional): GitHub token.
+        max_concurrency (int): Maximum number of requests in flight.
+        session: Object with a requests-compatible ``request`` or ``get``/``post``
+            interface. Defaults to a new [](`~ccbr_actions.github.GitHubClient`)
+            with a connection pool of ``max_concurrency``.
+
+    Examples:
+        >>> async def main():
+        ...     async with AsyncGitHubClient(token="ghp_...") as client:
+        ...         return await asyncio.gather(
+        ...             *(list_rulesets(repo, client) for repo in repos)
+        ...         )
+        >>> run(main())
+    """
+
+    def __init__(self, token=None, max_concurrency=10, session=None):
+        self.token = token
+        self.max_concurrency = max_concurrency
+        self.session = session or GitHubClient(
+            token=token, pool_maxsize=max_concurrency
+        )
+        self._owns_session = session is None
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="ccbr-actions-github"
+        )
+        self._semaphores = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _semaphore(self):
+        # semaphores belong to an event loop, so keep one per running loop
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    async def call(self, func, *args, **kwargs):
+        """
+        Run a blocking function on the client's thread pool.
+
+        Args:
+            func (callable): Function to call.
+            *args: Positional arguments passed to ``func``.
+            **kwargs: Keyword arguments passed to ``func``.
+
+        Returns:
+            The return value of ``func``.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._semaphore():
+            result = await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+        return result
+
+    def close(self):
+        """Shut down the thread pool and close the session if the client created it."""
+        self._executor.shutdown(wait=True)
+        if self._owns_session:
+            self.session.close()
+
+
+def run(coroutine):
+    """
+    Run a coroutine from synchronous code and return its result.
+
+    Uses ``asyncio.run``, or a helper thread when an event loop is already
+    running in this thread (e.g. in Jupyter).
+
+    Args:
+        coroutine: Coroutine to run.
+
+    Returns:
+        The coroutine's result.
+    """
+    try:
+        asyncio.get_running_loop()
+        is_loop_running = True
+    except RuntimeError:
+        is_loop_running = False
+    if is_loop_running:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(asyncio.run, coroutine).result()
+    else:
+        result = asyncio.run(coroutine)
+    return result
+
+
+async def api_get(url, client, **kwargs):
+    """
+    Awaitable [](`~ccbr_actions.github.github_api_get`).
+
+    Args:
+        url (str): Full API URL.
+        client (AsyncGitHubClient): Shared client.
+        **kwargs: Additional arguments passed to ``github_api_get``.
+
+    Returns:
+        dict: Parsed JSON response.
+    """
+    return await client.call(
+        github_api_get, url, token=client.token, session=client.session, **kwargs
+    )
+
+
+async def api_post(url, client, **kwargs):
+    """
+    Awaitable [](`~ccbr_actions.github.github_api_post`).
+
+    Args:
+        url (str): Full API URL.
+        client (AsyncGitHubClient): Shared client.
+        **kwargs: Additional arguments passed to ``github_api_post``.
+
+    Returns:
+        requests.Response: HTTP response.
+    """
+    return await client.call(
+        github_api_post, url, token=client.token, session=client.session, **kwargs
+    )
+
+
+async def paginate(url, client, per_page=100, items_key=None, **kwargs):
+    """
+    Asynchronously iterate over every item of a paginated GitHub API listing.
+
+    Awaitable counterpart of [](`~ccbr_actions.github.github_api_paginate`):
+    follows ``Link: rel="next"`` headers one page at a time.
+
+    Args:
+        url (str): Full API URL of the first page.
+        client (AsyncGitHubClient): Shared client.
+        per_page (int): Number of items to request per page.
+        items_key (str, optional): Key holding the item list when the endpoint
+            wraps results in an object.
+        **kwargs: Additional arguments passed to ``github_api_request``.
+
+    Yields:
+        dict: Items from each page, in order.
+
+    Raises:
+        requests.HTTPError: If any page request fails.
+    """
+    params = dict(kwargs.pop("params", None) or {})
+    params.setdefault("per_page", per_page)
+    next_url = url
+    while next_url:
+        response = await client.call(
+            github_api_request,
+            "GET",
+            next_url,
+            token=client.token,
+            session=client.session,
+            params=params,
+            **kwargs,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        for item in payload[items_key] if items_key else payload:
+            yield item
+        params = None
+        links = getattr(response, "links", None) or {}
+        next_url = links.get("next", {}).get("url")
+
+
+async def list_rulesets(repo, client):
+    """
+    Awaitable [](`~ccbr_actions.github.list_rulesets`).
+
+    Args:
+        repo (str): Repository in ``owner/repo`` format.
+        client (AsyncGitHubClient): Shared client.
+
+    Returns:
+        list[dict]: Rulesets as returned by the GitHub API.
+    """
+    url = f"{GITHUB_API_URL}/repos/{repo}/rulesets"
+    return [ruleset async for ruleset in paginate(url, client)]
+
+
+async def get_ruleset(repo, ruleset_id, client):
+    """
+    Fetch the full definition of a ruleset.
+
+    Args:
+        repo (str): Repository in ``owner/repo`` format.
+        ruleset_id (int): Ruleset ID.
+        client (AsyncGitHubClient): Shared client.
+
+    Returns:
+        dict: Ruleset as returned by the ruleset detail endpoint.
+    """
+    url = f"{GITHUB_API_URL}/repos/{repo}/rulesets/{ruleset_id}"
+    return await api_get(url, client)
+
+
+async def copy_ruleset(source_repo, target_repo, ruleset_name, client):
+    """
+    Awaitable [](`~ccbr_actions.github.copy_ruleset`).
+
+    Args:
+        source_repo (str): Source repository in ``owner/repo`` format.
+        target_repo (str): Target repository in ``owner/repo`` format.
+        ruleset_name (str): Name of the ruleset to copy.
+        client (AsyncGitHubClient): Shared client.
+
+    Returns:
+        dict: The created ruleset as returned by the GitHub API.
+
+    Raises:
+        ValueError: If no ruleset with ``ruleset_name`` is found in ``source_repo``.
+        requests.HTTPError: If any GitHub API request fails.
+    """
+    payload = await source_ruleset_payload(source_repo, ruleset_name, client)
+    return await create_ruleset(target_repo, payload, client)
+
+
+async def create_ruleset(repo, payload, client):
+    """
+    Create a ruleset in a repository.
+
+    Args:
+        repo (str): Repository in ``owner/repo`` format.
+        payload (dict): Ruleset definition without read-only fields, see
+            [](`~ccbr_actions.github.ruleset_payload`).
+        client (AsyncGitHubClient): Shared client.
+
+    Returns:
+        dict: The created ruleset as returned by the GitHub API.
+
+    Raises:
+        requests.HTTPError: If the GitHub API request fails.
+    """
+    url = f"{GITHUB_API_URL}/repos/{repo}/rulesets"
+    response = await api_post(url, client, json=payload)
+    response.raise_for_status()
+    return response.json()
+
+
+async def copy_ruleset_to_repos(
+    source_repo, target_repos, ruleset_name, client, ruleset=None
+):
+    """
+    Copy one ruleset to many repositories concurrently.
+
+    The source ruleset is listed and fetched once, then created in every
+    target at the same time (bounded by the client's concurrency limit).
+    A failure in one target does not stop the others.
+
+    Args:
+        source_repo (str): Source repository in ``owner/repo`` format.
+        target_repos (list[str]): Target repositories in ``owner/repo`` format.
+        ruleset_name (str): Name of the ruleset to copy.
+        client (AsyncGitHubClient): Shared client.
+        ruleset (dict, optional): Full source ruleset definition, e.g. from a
+            snapshot. When given, the source repository is not queried.
+
+    Returns:
+        list[dict]: One result per target, in input order, with keys ``repo``,
+            ``status`` (``created`` or ``failed``), ``ruleset_id``, and ``error``.
+
+    Raises:
+        ValueError: If no ruleset with ``ruleset_name`` is found in ``source_repo``.
+        requests.HTTPError: If fetching the source ruleset fails.
+
+    Examples:
+        >>> async def main():
+        ...     async with AsyncGitHubClient(token="ghp_...") as client:
+        ...         return await copy_ruleset_to_repos(
+        ...             "CCBR/actions", ["CCBR/Tools", "CCBR/RENEE"], "main", client
+        ...         )
+        >>> run(main())
+    """
+    payload = (
+        ruleset_payload(ruleset)
+        if ruleset is not None
+        else await source_ruleset_payload(source_repo, ruleset_name, client)
+    )
+
+    async def copy_to(repo):
+        created = await create_ruleset(repo, payload, client)
+        return "created", created
+
+    return await _fan_out(target_repos, copy_to)
+
+
+async def sync_ruleset_to_repos(
+    source_repo, target_repos, ruleset_name, client, ruleset=None
+):
+    """
+    Sync one ruleset to many repositories concurrently.
+
+    The source ruleset is fetched once, then each target is brought in line
+    with it by [](`~ccbr_actions.github.sync_ruleset_payload`): unchanged
+    targets are not written to, differing rulesets are updated in place, and
+    missing ones are created.
+
+    Args:
+        source_repo (str): Source repository in ``owner/repo`` format.
+        target_repos (list[str]): Target repositories in ``owner/repo`` format.
+        ruleset_name (str): Name of the ruleset to sync.
+        client (AsyncGitHubClient): Shared client.
+        ruleset (dict, optional): Full source ruleset definition, e.g. from a
+            snapshot. When given, the source repository is not queried.
+
+    Returns:
+        list[dict]: One result per target, in input order, with keys ``repo``,
+            ``status`` (``created``, ``updated``, ``unchanged``, or ``failed``),
+            ``ruleset_id``, and ``error``.
+
+    Raises:
+        ValueError: If no ruleset with ``ruleset_name`` is found in ``source_repo``.
+        requests.HTTPError: If fetching the source ruleset fails.
+    """
+    payload = (
+        ruleset_payload(ruleset)
+        if ruleset is not None
+        else await source_ruleset_payload(source_repo, ruleset_name, client)
+    )
+
+    async def sync_to(repo):
+        result = await client.call(
+            sync_ruleset_payload,
+            repo,
+            payload,
+            token=client.token,
+            session=client.session,
+        )
+        return result["action"], result["ruleset"]
+
+    return await _fan_out(target_repos, sync_to)
+
+
+async def source_ruleset_payload(source_repo, ruleset_name, client):
+    """
+    Fetch a ruleset by name and build its create/update payload.
+
+    Args:
+        source_repo (str): Source repository in ``owner/repo`` format.
+        ruleset_name (str): Name of the ruleset.
+        client (AsyncGitHubClient): Shared client.
+
+    Returns:
+        dict: Payload from [](`~ccbr_actions.github.ruleset_payload`).
+    """
+    match = find_ruleset(
+        await list_rulesets(source_repo, client), ruleset_name, source_repo
+    )
+    return ruleset_payload(await get_ruleset(source_repo, match["id"], client))
+
+
+async def _fan_out(target_repos, apply):
+    """
+    Apply a coroutine to every repository concurrently and collect per-repository results.
+
+    ``apply(repo)`` returns a ``(status, ruleset)`` tuple. Request and payload
+    errors are recorded as ``failed`` results so one repository cannot stop
+    the others.
+    """
+
+    async def apply_to(repo):
+        try:
+            status, ruleset = await apply(repo)
+            result = {
+                "repo": repo,
+                "status": status,
+                "ruleset_id": (ruleset or {}).get("id"),
+                "error": "",
+            }
+        except (requests.RequestException, ValueError) as exc:
+            result = {
+                "repo": repo,
+                "status": "failed",
+                "ruleset_id": None,
+                "error": f"{type(exc).__name__}: {exc}",
+            }
+        return result
+
+    return list(await asyncio.gather(*(apply_to(repo) for repo in target_repos)))
+
+
+async def snapshot_rulesets(repos, client, previous=()):
+    """
+    Fetch the full definition of every ruleset in many repositories concurrently.
+
+    Every repository's ruleset list is fetched at once. A ruleset's detail
+    endpoint is only requested when ``previous`` has no record of it with
+    the same ``updated_at``, so refreshing a snapshot only re-fetches
+    rulesets that changed. If listing a repository fails, its previous
+    records are kept and the error is reported.
+
+    Args:
+        repos (list[str]): Repositories in ``owner/repo`` format.
+        client (AsyncGitHubClient): Shared client.
+        previous (list[dict]): Records of an earlier snapshot, see
+            [](`~ccbr_actions.github.read_ruleset_snapshot`).
+
+    Returns:
+        tuple[list[dict], dict]: Snapshot records (``repo``, ``id``, ``name``,
+            ``updated_at``, ``ruleset``) and a summary with the numbers of
+            ``repos``, ``rulesets``, ``fetched`` and ``reused`` details, and
+            per-repository ``errors``.
+    """
+    previous_records = {(record["repo"], record["id"]): record for record in previous}
+    summary = {"repos": len(repos), "rulesets": 0, "fetched": 0, "reused": 0}
+    errors = {}
+
+    async def snapshot_ruleset(repo, listed):
+        record = previous_records.get((repo, listed["id"]))
+        if record is not None and record["updated_at"] == listed.get("updated_at"):
+            summary["reused"] += 1
+        else:
+            ruleset = await get_ruleset(repo, listed["id"], client)
+            summary["fetched"] += 1
+            record = {
+                "repo": repo,
+                "id": ruleset["id"],
+                "name": ruleset.get("name"),
+                "updated_at": ruleset.get("updated_at"),
+                "ruleset": ruleset,
+            }
+        return record
+
+    async def snapshot_repo(repo):
+        try:
+            listed_rulesets = repository_rulesets(await list_rulesets(repo, client))
+            records = await asyncio.gather(
+                *(snapshot_ruleset(repo, listed) for listed in listed_rulesets)
+            )
+        except (requests.RequestException, ValueError) as exc:
+            errors[repo] = f"{type(exc).__name__}: {exc}"
+            records = [record for record in previous if record["repo"] == repo]
+        return list(records)
+
+    per_repo = await asyncio.gather(*(snapshot_repo(repo) for repo in repos))
+    records = [record for records in per_repo for record in records]
+    summary["rulesets"] = len(records)
+    summary["errors"] = errors
+    return records, summary
@@ -8,13 +8,12 @@ import shlex
 import warnings
 from ccbr_tools.shell import shell_run
 
-from .actions import set_output, trigger_workflow
+from .actions import OutputWriter, set_output, trigger_workflow
 from .citation import update_citation, write_citation
-from .util import precommit_run, path_resolve, repo_base
+from .util import RepoContext, precommit_run, path_resolve, repo_base
 from .versions import (
     check_version_increments_by_one,
     match_semver,
-    get_current_hash,
 )
 
 
@@ -211,6 +210,7 @@ def prepare_draft_release(
         >>> prepare_draft_release()
         >>> prepare_draft_release(dev_header="dev version", debug=True)
     """
+    context = RepoContext()
     use_r_package_structure = is_r_package(description_filepath=description_filepath)
     if use_r_package_structure:
         if changelog_filepath == "CHANGELOG.md":
@@ -260,7 +260,10 @@ def prepare_draft_release(
             )
         else:
             update_citation(
-                citation_file=citation_filepath, version=next_version, debug=debug
+                citation_file=citation_filepath,
+                version=next_version,
+                date=context.today,
+                debug=debug,
             )
         write_citation(
             citation_file=citation_filepath,
@@ -292,7 +295,7 @@ def prepare_draft_release(
         release_branch=release_branch,
         next_version=next_version,
         release_notes_filepath=release_notes_filepath,
-        release_target=get_current_hash(),
+        release_target=context.head_sha,
         repo=repo,
         debug=debug,
     )
@@ -517,8 +520,9 @@ def set_release_version(
     next_version = get_release_version(
         next_version_manual, next_version_convco, current_version, gh_event_name
     )
-    set_output("NEXT_VERSION", next_version)
-    set_output("NEXT_STRICT", next_version.strip("v"))
+    with OutputWriter() as writer:
+        writer.set_output("NEXT_VERSION", next_version)
+        writer.set_output("NEXT_STRICT", next_version.strip("v"))
 
 
 def get_changelog_lines(
@@ -611,7 +615,7 @@ def create_release_draft(
     release_branch="release-draft",
     next_version="${{ steps.release.outputs.NEXT_VERSION }}",
     release_notes_filepath=".github/latest-release.md",
-    release_target=get_current_hash(),
+    release_target=None,
     repo="${{ github.repository }}",
     debug=False,
 ):
@@ -622,13 +626,15 @@ def create_release_draft(
         release_branch (str): The name of the release branch. Defaults to "release-draft".
         next_version (str): The next version of the release. Defaults to "${{ steps.release.outputs.NEXT_VERSION }}".
         release_notes_filepath (str): The file path to the release notes. Defaults to ".github/latest-release.md".
-        release_target (str): The target commit hash for the release. Defaults to the current commit hash.
+        release_target (str): The target commit hash for the release. Defaults to the current commit hash, resolved when called.
         repo (str): The GitHub repository in the format "owner/repo". Defaults to "${{ github.repository }}".
         debug (bool): If True, print the command instead of executing it. Defaults to False.
 
     Returns:
         str: The URL of the created release draft, or an empty string if in debug mode.
     """
+    if release_target is None:
+        release_target = RepoContext().head_sha
     version_strict = next_version.lstrip("v")
     cmd = f"gh release create {next_version} --draft --notes-file {release_notes_filepath} --title '{os.path.basename(repo)} {version_strict}' --repo {repo} --target {release_target}"
     if debug:
@@ -0,0 +1,367 @@
+"""
+Run `ccbr_actions` functions in a long-lived process shared by composite action steps.
+
+Each `shell: python` step in a composite action starts a new interpreter and
+imports `ccbr_actions` again. Instead, the first step can start a server with
+`ccbr_actions serve --socket PATH --detach`, and later steps send calls with
+`ccbr_actions call FUNC --json ARGS`. This keeps modules imported and HTTP
+connection pools warm between steps.
+
+Requests and responses are single lines of JSON on a Unix socket. Calls run
+one at a time, with the environment variables and working directory of the
+calling step. This means functions that write to `GITHUB_OUTPUT` or
+`GITHUB_ENV` use the files of the step that made the call.
+"""
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import pathlib
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+SERVER_FUNCTIONS = {
+    "prepare_docker_build_variables": "ccbr_actions.docker",
+    "evaluate_docker_build_staleness_and_set_outputs": "ccbr_actions.docker",
+    "set_docker_context_digest_output": "ccbr_actions.docker",
+    "set_docs_version": "ccbr_actions.docs",
+    "get_changed_files": "ccbr_actions.changed_files",
+    "set_output": "ccbr_actions.actions",
+}
+
+
+def default_socket_path():
+    """
+    Get the default path of the server socket.
+
+    Returns:
+        str: `CCBR_ACTIONS_SOCKET` if set, otherwise `ccbr_actions.sock` in
+            `RUNNER_TEMP` (or the system temporary directory).
+    """
+    return os.environ.get("CCBR_ACTIONS_SOCKET") or os.path.join(
+        os.environ.get("RUNNER_TEMP") or tempfile.gettempdir(), "ccbr_actions.sock"
+    )
+
+
+def resolve_function(name):
+    """
+    Look up a function that may be called through the server.
+
+    Args:
+        name (str): A key of `SERVER_FUNCTIONS`.
+
+    Returns:
+        callable: The function.
+
+    Raises:
+        ValueError: If the function is not allowed.
+    """
+    if name not in SERVER_FUNCTIONS:
+        raise ValueError(
+            f"Unknown function '{name}'. Choose from: {', '.join(sorted(SERVER_FUNCTIONS))}"
+        )
+    return getattr(importlib.import_module(SERVER_FUNCTIONS[name]), name)
+
+
+@contextlib.contextmanager
+def call_context(environ=None, cwd=None):
+    """
+    Temporarily replace the process environment and working directory.
+
+    Args:
+        environ (dict, optional): Environment variables to use for the call.
+        cwd (str, optional): Working directory to use for the call.
+    """
+    saved_environ = dict(os.environ)
+    saved_cwd = os.getcwd()
+    try:
+        if environ is not None:
+            os.environ.clear()
+            os.environ.update(environ)
+        if cwd:
+            os.chdir(cwd)
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        os.chdir(saved_cwd)
+
+
+def execute_call(request):
+    """
+    Run one call request and describe its outcome.
+
+    Args:
+        request (dict): `function` and `kwargs`, and optionally `env` and `cwd`.
+
+    Returns:
+        dict: `ok`, `result` (converted with `str` if not JSON serializable),
+            `stdout`, `stderr`, and `error` (a traceback, or an empty string).
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    response = {"ok": False, "result": None, "error": ""}
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            func = resolve_function(request.get("function", ""))
+            with call_context(request.get("env"), request.get("cwd")):
+                result = func(**request.get("kwargs", {}))
+            response.update(ok=True, result=json.loads(json.dumps(result, default=str)))
+        except Exception:  # noqa: BLE001 - any error is reported to the caller
+            response["error"] = traceback.format_exc()
+    response.update(stdout=stdout.getvalue(), stderr=stderr.getvalue())
+    return response
+
+
+class CallHandler(socketserver.StreamRequestHandler):
+    """Read one JSON request line and write one JSON response line."""
+
+    def handle(self):
+        request = json.loads(self.rfile.readline() or "{}")
+        if request.get("shutdown"):
+            self.server.done = True
+            response = {"ok": True, "result": None, "stdout": "", "stderr": ""}
+        else:
+            response = execute_call(request)
+        self.server.calls += 1
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class ActionServer(socketserver.UnixStreamServer):
+    """
+    Serve calls on a Unix socket until shut down or idle.
+
+    Calls are handled one at a time because each one changes the process
+    environment and working directory.
+
+    Args:
+        socket_path (str): Path of the Unix socket to listen on.
+        idle_timeout (float): Seconds without a call after which the server
+            stops. GitHub Actions also stops leftover processes when a job ends.
+    """
+
+    def __init__(self, socket_path, idle_timeout=600.0):
+        self.socket_path = str(socket_path)
+        self.timeout = idle_timeout
+        self.done = False
+        self.calls = 0
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        super().__init__(self.socket_path, CallHandler)
+
+    def handle_timeout(self):
+        self.done = True
+
+    def serve_until_done(self):
+        """Handle requests until a shutdown request or the idle timeout."""
+        try:
+            while not self.done:
+                self.handle_request()
+        finally:
+            self.server_close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+
+
+def serve(socket_path=None, idle_timeout=600.0):
+    """
+    Start a server in the current process and block until it stops.
+
+    Args:
+        socket_path (str, optional): Socket path. Defaults to
+            [](`~ccbr_actions.server.default_socket_path`).
+        idle_timeout (float): Seconds without a call after which the server stops.
+    """
+    ActionServer(socket_path or default_socket_path(), idle_timeout).serve_until_done()
+
+
+def start_server(socket_path=None, idle_timeout=600.0, wait=10.0):
+    """
+    Start a server in a detached background process.
+
+    Returns once the socket accepts connections, so a step that starts the
+    server does not block the job.
+
+    Args:
+        socket_path (str, optional): Socket path. Defaults to
+            [](`~ccbr_actions.server.default_socket_path`).
+        idle_timeout (float): Seconds without a call after which the server stops.
+        wait (float): Seconds to wait for the server to start.
+
+    Returns:
+        int: The process ID of the server.
+
+    Raises:
+        TimeoutError: If the server does not start in time.
+    """
+    socket_path = socket_path or default_socket_path()
+    log_path = pathlib.Path(socket_path).with_suffix(".log")
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "ccbr_actions",
+                "serve",
+                "--socket",
+                socket_path,
+                "--idle-timeout",
+                str(idle_timeout),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + wait
+    while not server_available(socket_path) and time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited early, see {log_path}")
+        time.sleep(0.02)
+    if not server_available(socket_path):
+        raise TimeoutError(f"Server did not start within {wait} seconds")
+    return process.pid
+
+
+def server_available(socket_path=None):
+    """
+    Check whether a server is listening on the socket.
+
+    Args:
+        socket_path (str, optional): Socket path. Defaults to
+            [](`~ccbr_actions.server.default_socket_path`).
+
+    Returns:
+        bool: Whether a connection succeeded.
+    """
+    available = False
+    with (
+        contextlib.suppress(OSError),
+        socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client,
+    ):
+        client.connect(socket_path or default_socket_path())
+        available = True
+    return available
+
+
+def send_request(request, socket_path=None):
+    """
+    Send one request to a server and return its response.
+
+    Once the request is sent, the server may already have run the call, so a
+    connection that fails or closes before the response arrives is reported
+    as an error response instead of raising.
+
+    Args:
+        request (dict): The request.
+        socket_path (str, optional): Socket path. Defaults to
+            [](`~ccbr_actions.server.default_socket_path`).
+
+    Returns:
+        dict: The response.
+
+    Raises:
+        OSError: If no server accepts the connection.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path or default_socket_path())
+        response = exchange_request(client, request)
+    return response
+
+
+def exchange_request(client, request):
+    """
+    Send a request over a connected socket and read the response.
+
+    Args:
+        client (socket.socket): A socket connected to the server.
+        request (dict): The request.
+
+    Returns:
+        dict: The response, or an error response if the connection failed
+            or closed before a response was read.
+    """
+    response = None
+    error = "The ccbr_actions server closed the connection without a response"
+    try:
+        client.sendall(json.dumps(request).encode() + b"\n")
+        with client.makefile("rb") as reader:
+            line = reader.readline()
+        if line:
+            response = json.loads(line)
+    except (OSError, ValueError) as e:
+        error = f"The ccbr_actions server failed after the request was sent: {type(e).__name__}: {e}"
+    if response is None:
+        response = {
+            "ok": False,
+            "result": None,
+            "error": error,
+            "stdout": "",
+            "stderr": "",
+        }
+    return response
+
+
+def call(function, kwargs=None, socket_path=None, fallback=True):
+    """
+    Call a function through the server, or in this process if none is running.
+
+    The call uses the environment variables and working directory of this
+    process, and its output is echoed here.
+
+    Args:
+        function (str): A key of `SERVER_FUNCTIONS`.
+        kwargs (dict, optional): Keyword arguments for the function.
+        socket_path (str, optional): Socket path. Defaults to
+            [](`~ccbr_actions.server.default_socket_path`).
+        fallback (bool): Run the function in this process when no server is
+            listening. If False, raise `ConnectionError` instead. A call that
+            fails after it was sent to the server is never run again here,
+            since the server may already have run it; its error is returned
+            in the response.
+
+    Returns:
+        dict: The response, see [](`~ccbr_actions.server.execute_call`).
+
+    Raises:
+        ConnectionError: If no server is listening and `fallback` is False.
+    """
+    request = {
+        "function": function,
+        "kwargs": kwargs or {},
+        "env": dict(os.environ),
+        "cwd": os.getcwd(),
+    }
+    try:
+        response = send_request(request, socket_path)
+    except OSError as e:
+        if not fallback:
+            raise ConnectionError(f"No ccbr_actions server is listening: {e}") from e
+        response = execute_call({key: request[key] for key in ("function", "kwargs")})
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response
+
+
+def shutdown(socket_path=None):
+    """
+    Ask a server to stop. Does nothing if no server is listening.
+
+    Args:
+        socket_path (str, optional): Socket path. Defaults to
+            [](`~ccbr_actions.server.default_socket_path`).
+
+    Returns:
+        bool: Whether a server was asked to stop.
+    """
+    stopped = False
+    with contextlib.suppress(OSError):
+        send_request({"shutdown": True}, socket_path)
+        stopped = True
+    return stopped
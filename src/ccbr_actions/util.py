@@ -3,6 +3,7 @@ Utility functions for the package
 """
 
 import datetime
+import functools
 import pathlib
 import ccbr_tools.shell
 import ccbr_tools.pkg_util
@@ -49,6 +50,36 @@ def date_today():
     return datetime.datetime.today().strftime("%Y-%m-%d")
 
 
+class RepoContext:
+    """
+    Facts about the current repository that are computed once per invocation.
+
+    Each attribute is resolved on first access and cached on the instance, so
+    importing a module or creating a context never runs `git`. Create a new
+    context for each invocation so that values do not go stale in long-lived
+    processes.
+
+    Attributes:
+        head_sha (str): The commit hash of `HEAD`.
+        today (str): Today's date in ISO8601 format (YYYY-MM-DD).
+
+    Examples:
+        >>> context = RepoContext()
+        >>> context.today == date_today()
+        True
+    """
+
+    @functools.cached_property
+    def head_sha(self):
+        from . import versions
+
+        return versions.get_current_hash()
+
+    @functools.cached_property
+    def today(self):
+        return date_today()
+
+
 def precommit_run(args):
     """
     Run `pre-commit run` with the specified arguments.
@@ -74,3 +105,27 @@ def path_resolve(filepath):
 
     """
     return pathlib.Path(filepath).resolve()
+
+
+def format_table(rows, columns):
+    """
+    Format a list of records as a plain-text table with aligned columns.
+
+    Args:
+        rows (list[dict]): Records to format.
+        columns (list[str]): Keys to show, in order. Used as the header row.
+
+    Returns:
+        str: The table, one line per record after the header.
+
+    Examples:
+        >>> print(format_table([{"repo": "CCBR/actions", "status": "created"}], ["repo", "status"]))
+        repo          status
+        CCBR/actions  created
+    """
+    cells = [columns] + [[str(row.get(col, "")) for col in columns] for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+        for line in cells
+    )
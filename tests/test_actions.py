@@ -1,7 +1,19 @@
 import os
 import pytest
 from ccbr_tools.shell import exec_in_context
-from ccbr_actions.actions import use_github_action, set_output, trigger_workflow
+from ccbr_actions.data import get_example_path
+import requests
+
+from ccbr_actions.actions import (
+    ExampleCache,
+    OutputWriter,
+    parse_dispatch_matrix,
+    trigger_workflows,
+    use_github_actions,
+    use_github_action,
+    set_output,
+    trigger_workflow,
+)
 
 
 def test_use_github_action(tmp_path):
@@ -16,6 +28,108 @@ def test_use_github_action_error():
     assert "Failed to download" in str(exc_info.value)
 
 
+class ExampleSession:
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+        name = url.rsplit("/", 1)[1]
+        status_code = 404 if name.startswith("missing") else 200
+        return type("Response", (), {"status_code": status_code, "text": url})()
+
+
+def test_use_github_actions_caches_immutable_refs(tmp_path, monkeypatch):
+    tag_lookups = []
+    monkeypatch.setattr(
+        "ccbr_actions.actions.get_latest_release_tag",
+        lambda repo: tag_lookups.append(repo) or "v1.2.3",
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("ccbr_actions.actions.read_examples_index", lambda: {})
+    cache = ExampleCache(directory=tmp_path / "cache")
+    session = ExampleSession()
+    names = ["build-nextflow", "docs-mkdocs", "auto-format"]
+
+    paths = use_github_actions(names, session=session, cache=cache)
+    use_github_actions(names, session=session, cache=cache)
+
+    assert [path.name for path in paths] == [f"{name}.yml" for name in names]
+    assert (tmp_path / ".github" / "workflows" / "docs-mkdocs.yml").read_text() == (
+        "https://raw.githubusercontent.com/CCBR/actions/v1.2.3/examples/docs-mkdocs.yml"
+    )
+    assert len(session.urls) == 3
+    assert tag_lookups == ["CCBR/actions"]
+
+
+def test_use_github_actions_does_not_cache_branches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = ExampleCache(directory=tmp_path / "cache")
+    session = ExampleSession()
+    use_github_actions(["docs-mkdocs"], ref="main", session=session, cache=cache)
+    use_github_actions(["docs-mkdocs"], ref="main", session=session, cache=cache)
+    assert len(session.urls) == 2
+
+
+def test_use_github_actions_reports_missing_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = ExampleCache(directory=tmp_path / "cache")
+    with pytest.raises(FileNotFoundError, match="missing-example"):
+        use_github_actions(
+            ["docs-mkdocs", "missing-example"],
+            ref="v1.0.0",
+            session=ExampleSession(),
+            cache=cache,
+        )
+    assert (tmp_path / ".github" / "workflows" / "docs-mkdocs.yml").exists()
+
+
+def test_use_github_actions_uses_bundled_examples_offline(tmp_path, monkeypatch):
+    class OfflineSession:
+        def get(self, url):
+            raise AssertionError(f"network used for {url}")
+
+    def no_tag_lookup(repo):
+        raise AssertionError("network used to resolve the latest release")
+
+    monkeypatch.setattr("ccbr_actions.actions.get_latest_release_tag", no_tag_lookup)
+    monkeypatch.chdir(tmp_path)
+    paths = use_github_actions(
+        ["docs-mkdocs", "build-nextflow"],
+        session=OfflineSession(),
+        cache=ExampleCache(directory=tmp_path / "cache"),
+    )
+    assert paths[0].read_text() == get_example_path("docs-mkdocs").read_text()
+
+
+def test_use_github_actions_downloads_other_refs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    session = ExampleSession()
+    use_github_actions(
+        ["docs-mkdocs"],
+        ref="v0.1.0",
+        session=session,
+        cache=ExampleCache(directory=tmp_path / "cache"),
+    )
+    assert session.urls == [
+        "https://raw.githubusercontent.com/CCBR/actions/v0.1.0/examples/docs-mkdocs.yml"
+    ]
+
+
+def test_example_cache_latest_tag_expires(tmp_path, monkeypatch):
+    tags = iter(["v1.0.0", "v1.1.0"])
+    monkeypatch.setattr(
+        "ccbr_actions.actions.get_latest_release_tag", lambda repo: next(tags)
+    )
+    now = [1000.0]
+    cache = ExampleCache(directory=tmp_path, tag_ttl=60, clock=lambda: now[0])
+    assert cache.latest_release_tag("CCBR/actions") == "v1.0.0"
+    now[0] += 30
+    assert cache.latest_release_tag("CCBR/actions") == "v1.0.0"
+    now[0] += 60
+    assert cache.latest_release_tag("CCBR/actions") == "v1.1.0"
+
+
 def test_set_output(tmp_path):
     output_file = tmp_path / "github_output.txt"
     os.environ["TEST_GITHUB_OUTPUT"] = str(output_file)
@@ -34,6 +148,108 @@ def test_set_output(tmp_path):
     assert "VALUE" in output_text
 
 
+def parse_github_file(path):
+    """Parse a GITHUB_OUTPUT/GITHUB_ENV file the way the Actions runner does."""
+    values = {}
+    lines = iter(path.read_text().split("\n"))
+    for line in lines:
+        if "<<" in line:
+            name, delimiter = line.split("<<", 1)
+            value_lines = []
+            value_line = next(lines)
+            while value_line != delimiter:
+                value_lines.append(value_line)
+                value_line = next(lines)
+            values[name] = "\n".join(value_lines)
+        elif "=" in line:
+            name, value = line.split("=", 1)
+            values[name] = value
+    return values
+
+
+def test_output_writer_writes_each_file_once(tmp_path, monkeypatch):
+    paths = {name: tmp_path / name for name in ("output", "env", "summary")}
+    writes = []
+    real_write = os.write
+    monkeypatch.setattr(
+        "ccbr_actions.actions.os.write",
+        lambda fd, data: writes.append(fd) or real_write(fd, data),
+    )
+    with OutputWriter(
+        github_output=paths["output"],
+        github_env=paths["env"],
+        github_step_summary=paths["summary"],
+    ) as writer:
+        writer.set_output("VERSION", "1.0.0")
+        writer.set_output("NOTES", "line one\nline two")
+        writer.set_env("IMAGENAME", "nciccbr/ccbr_bwa:v1")
+        writer.set_env("MULTI", "a\nb")
+        writer.add_summary("## Built")
+        assert not paths["output"].exists()
+
+    assert len(writes) == 3
+    assert parse_github_file(paths["output"]) == {
+        "VERSION": "1.0.0",
+        "NOTES": "line one\nline two",
+    }
+    assert "IMAGENAME=nciccbr/ccbr_bwa:v1\n" in paths["env"].read_text()
+    assert parse_github_file(paths["env"])["MULTI"] == "a\nb"
+    assert paths["summary"].read_text() == "## Built\n"
+
+
+def test_output_writer_does_not_flush_on_error(tmp_path, monkeypatch):
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    output = tmp_path / "output"
+    with (
+        pytest.raises(KeyError, match="original"),
+        OutputWriter(github_output=output) as writer,
+    ):
+        writer.set_output("VERSION", "1.0.0")
+        writer.add_summary("flushing this would raise RuntimeError")
+        raise KeyError("original")
+    assert not output.exists()
+
+
+def test_output_writer_avoids_delimiter_collisions(tmp_path):
+    output = tmp_path / "output"
+    writer = OutputWriter(github_output=output)
+    delimiter = writer.delimiter("")
+    tricky = f"before\n{delimiter}\nafter"
+    writer.set_output("TRICKY", tricky)
+    writer.flush()
+    assert writer.delimiter(tricky) != delimiter
+    assert parse_github_file(output) == {"TRICKY": tricky}
+
+
+@pytest.mark.parametrize("trailing", ["", "\n"])
+def test_output_writer_streams_file_values(tmp_path, trailing):
+    output = tmp_path / "output"
+    writer = OutputWriter(github_output=output, chunk_size=7)
+    delimiter = writer.delimiter("")
+    value_file = tmp_path / "changed_files.txt"
+    lines = [f"file{i}.txt" for i in range(50)] + [delimiter, f"{delimiter}_1"]
+    value_file.write_text("\n".join(lines) + trailing)
+    writer.set_output("before", "x")
+    writer.set_output_from_file("changed_files", value_file)
+    writer.set_output("after", "y")
+    writer.flush()
+    assert parse_github_file(output) == {
+        "before": "x",
+        "changed_files": "\n".join(lines),
+        "after": "y",
+    }
+
+
+def test_output_writer_requires_github_file(monkeypatch):
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    writer = OutputWriter()
+    writer.add_summary("text")
+    with pytest.raises(RuntimeError, match="GITHUB_STEP_SUMMARY is not set"):
+        writer.flush()
+    with pytest.raises(ValueError, match="Invalid"):
+        writer.set_output("A=B", "x")
+
+
 def test_trigger_workflow_debug():
     url, headers, data = trigger_workflow(
         workflow_name="test_workflow.yml",
@@ -57,3 +273,90 @@ def test_trigger_workflow():
         workflow_name="hello.yml", branch="main", repo="CCBR/actions", debug=False
     )
     assert response.status_code == 204
+
+
+class DispatchSession:
+    """Mock GitHubClient that fails some dispatches."""
+
+    def __init__(self, connection_errors=0):
+        self.connection_errors = connection_errors
+        self.posts = []
+
+    def post(self, url, json=None):
+        self.posts.append((url, json))
+        if self.connection_errors:
+            self.connection_errors -= 1
+            raise requests.ConnectionError("connection reset")
+        status_code = 404 if "missing" in url else 204
+        return type("Response", (), {"status_code": status_code, "text": "Not Found"})()
+
+
+def test_parse_dispatch_matrix():
+    matrix = {"include": [{"repo": "CCBR/a", "inputs": {"x": "1"}}]}
+    assert parse_dispatch_matrix(matrix, {"workflow": "w.yml", "ref": "main"}) == [
+        {"repo": "CCBR/a", "workflow": "w.yml", "ref": "main", "inputs": {"x": "1"}}
+    ]
+    with pytest.raises(ValueError, match="need 'repo'"):
+        parse_dispatch_matrix('[{"repo": "CCBR/a"}]')
+    with pytest.raises(ValueError, match="Expected a list"):
+        parse_dispatch_matrix('{"repo": "CCBR/a"}')
+
+
+def test_trigger_workflows_reports_each_dispatch(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("ccbr_actions.actions.time.sleep", sleeps.append)
+    session = DispatchSession(connection_errors=1)
+    dispatches = [
+        {
+            "repo": "CCBR/a",
+            "workflow": "build.yml",
+            "ref": "main",
+            "inputs": {"x": "1"},
+        },
+        {"repo": "CCBR/missing", "workflow": "build.yml", "ref": "main"},
+    ]
+
+    results = trigger_workflows(dispatches, max_workers=1, session=session)
+
+    assert [(r["repo"], r["status"], r["attempts"]) for r in results] == [
+        ("CCBR/a", "dispatched", 2),
+        ("CCBR/missing", "failed", 1),
+    ]
+    assert results[1]["error"] == "HTTP 404: Not Found"
+    assert sleeps == [1.0]
+    assert session.posts[0] == (
+        "https://api.github.com/repos/CCBR/a/actions/workflows/build.yml/dispatches",
+        {"ref": "main", "inputs": {"x": "1"}},
+    )
+
+
+def test_trigger_workflows_gives_up_after_max_attempts(monkeypatch):
+    monkeypatch.setattr("ccbr_actions.actions.time.sleep", lambda seconds: None)
+    session = DispatchSession(connection_errors=5)
+    dispatch = {"repo": "CCBR/a", "workflow": "build.yml", "ref": "main"}
+
+    (result,) = trigger_workflows([dispatch], max_attempts=3, session=session)
+
+    assert result["status"] == "failed"
+    assert result["attempts"] == 3
+    assert result["error"].startswith("ConnectionError")
+
+
+def test_dispatch_workflow_does_not_retry_read_timeout(monkeypatch):
+    class TimeoutSession(DispatchSession):
+        def post(self, url, json=None):
+            self.posts.append((url, json))
+            raise requests.ReadTimeout("read timed out")
+
+    session = TimeoutSession()
+    dispatch = {"repo": "CCBR/a", "workflow": "build.yml", "ref": "main"}
+
+    (result,) = trigger_workflows([dispatch], max_attempts=3, session=session)
+
+    assert (result["status"], result["attempts"]) == ("failed", 1)
+    assert len(session.posts) == 1
+
+
+def test_trigger_workflows_debug_sends_nothing():
+    dispatch = {"repo": "CCBR/a", "workflow": "build.yml", "ref": "main"}
+    assert trigger_workflows([dispatch], debug=True)[0]["status"] == "debug"
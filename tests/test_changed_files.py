@@ -1,22 +1,36 @@
 import json
 import pathlib
+import subprocess
+
 import pytest
+from pathspec import GitIgnoreSpec
 
+from ccbr_actions import changed_files as changed_files_module
 from ccbr_actions.changed_files import (
     format_changed_files_from_api,
     get_changed_file_list,
     get_changed_files,
     get_pull_request_changed_file_list,
+    is_compare_truncated,
+    compile_path_spec,
+    IndexedGitIgnoreMatcher,
+    list_pull_request_files,
+    match_path_groups,
     match_paths,
+    parse_path_groups,
     match_paths_json,
+    validate_comparison_engine,
+    validate_output_mode,
+    write_changed_file_artifacts,
     validate_comparison_mode,
 )
 
 
 class MockResponse:
-    def __init__(self, payload, status_code=200):
+    def __init__(self, payload, status_code=200, links=None):
         self.payload = payload
         self.status_code = status_code
+        self.links = links or {}
 
     def json(self):
         return self.payload
@@ -225,3 +239,501 @@ def test_get_changed_files_sets_result_output(monkeypatch, tmp_path):
     output_text = pathlib.Path(output_file).read_text()
     assert "result<<" in output_text
     assert result_json in output_text
+
+
+def test_get_changed_files_closes_default_client(monkeypatch, tmp_path):
+    monkeypatch.setenv("GITHUB_OUTPUT", str(tmp_path / "github_output.txt"))
+    monkeypatch.delenv("CCBR_ACTIONS_CACHE_DIR", raising=False)
+
+    class ClosingSession(MockSession):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    session = ClosingSession(
+        {
+            "https://api.github.com/repos/CCBR/actions/compare/before...after": {
+                "files": [{"filename": "a.txt"}]
+            }
+        }
+    )
+    monkeypatch.setattr(
+        changed_files_module, "GitHubClient", lambda token, cache: session
+    )
+
+    get_changed_files(
+        event_name="push",
+        repository="CCBR/actions",
+        before="before",
+        after="after",
+    )
+
+    assert session.calls
+    assert session.closed
+
+
+def make_file_entries(prefix, count):
+    return [{"filename": f"{prefix}/Dockerfile.v{i}"} for i in range(count)]
+
+
+class PagedMockSession:
+    """Serve single-page payloads by URL and paged payloads by (URL, page)."""
+
+    def __init__(self, payloads, pages=None):
+        self.payloads = payloads
+        self.pages = pages or {}
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        self.calls.append((url, params))
+        response = None
+        if params and "page" in params:
+            pages = self.pages[url]
+            last_url = f"{url}?page={len(pages)}"
+            response = MockResponse(
+                pages[params["page"] - 1], links={"last": {"url": last_url}}
+            )
+        else:
+            response = MockResponse(self.payloads[url])
+        return response
+
+
+def test_is_compare_truncated():
+    assert is_compare_truncated({"files": make_file_entries("a", 300)})
+    assert not is_compare_truncated({"files": make_file_entries("a", 299)})
+
+
+def test_list_pull_request_files_reads_all_pages():
+    url = "https://api.github.com/repos/base/repo/pulls/7/files"
+    session = PagedMockSession(
+        {},
+        pages={
+            url: [
+                make_file_entries("a", 100),
+                make_file_entries("b", 100),
+                make_file_entries("c", 5),
+            ]
+        },
+    )
+
+    result = list_pull_request_files(repo="base/repo", pr_number=7, session=session)
+
+    assert len(result) == 205
+    assert result[-1] == "c/Dockerfile.v4"
+    assert sorted(call[1]["page"] for call in session.calls) == [1, 2, 3]
+
+
+def test_get_pull_request_changed_file_list_event_mode_falls_back_to_pr_files():
+    files_url = "https://api.github.com/repos/base/repo/pulls/7/files"
+    session = PagedMockSession(
+        {
+            "https://api.github.com/repos/base/repo/compare/basesha...fork:branch": {
+                "files": make_file_entries("a", 300)
+            }
+        },
+        pages={
+            files_url: [make_file_entries("a", 100)] * 3 + [make_file_entries("z", 1)]
+        },
+    )
+
+    result = get_pull_request_changed_file_list(
+        comparison_mode="event",
+        pr_base_repo_full_name="base/repo",
+        pr_base_sha="basesha",
+        pr_head_label="fork:branch",
+        pr_head_repo_full_name="fork/repo",
+        pr_head_sha="headsha",
+        pr_number=7,
+        session=session,
+    )
+
+    assert len(result.splitlines()) == 301
+    assert "z/Dockerfile.v0" in result.splitlines()
+
+
+def test_get_pull_request_changed_file_list_latest_commit_falls_back_to_commit_files():
+    commit_url = "https://api.github.com/repos/fork/repo/commits/headsha"
+    session = PagedMockSession(
+        {
+            commit_url: {"parents": [{"sha": "parentsha"}]},
+            "https://api.github.com/repos/fork/repo/compare/parentsha...headsha": {
+                "files": make_file_entries("a", 300)
+            },
+        },
+        pages={
+            commit_url: [
+                {"files": make_file_entries("a", 300)},
+                {"files": make_file_entries("b", 2)},
+            ]
+        },
+    )
+
+    result = get_pull_request_changed_file_list(
+        comparison_mode="latest-commit",
+        pr_base_repo_full_name="base/repo",
+        pr_base_sha="basesha",
+        pr_head_label="fork:branch",
+        pr_head_repo_full_name="fork/repo",
+        pr_head_sha="headsha",
+        session=session,
+    )
+
+    assert len(result.splitlines()) == 302
+    assert result.splitlines()[-1] == "b/Dockerfile.v1"
+
+
+def test_get_changed_file_list_warns_when_push_compare_truncated(monkeypatch, capsys):
+    monkeypatch.setattr(changed_files_module, "is_git_work_tree", lambda: False)
+    session = MockSession(
+        {
+            "https://api.github.com/repos/CCBR/actions/compare/before...after": {
+                "files": make_file_entries("a", 300)
+            }
+        }
+    )
+
+    result = get_changed_file_list(
+        event_name="push",
+        repository="CCBR/actions",
+        before="before",
+        after="after",
+        session=session,
+    )
+
+    assert len(result.splitlines()) == 300
+    assert "::warning::" in capsys.readouterr().out
+
+
+class FailingSession:
+    def get(self, url, headers=None, **kwargs):
+        raise AssertionError(f"unexpected API request: {url}")
+
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+    """Create a git repository with two commits and return their SHAs."""
+
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], check=True, capture_output=True, text=True
+        ).stdout.strip()
+
+    monkeypatch.chdir(tmp_path)
+    git("init", "-q")
+    git("config", "user.email", "test@example.com")
+    git("config", "user.name", "test")
+    (tmp_path / "README.md").write_text("hello\n")
+    git("add", ".")
+    git("commit", "-qm", "first")
+    base = git("rev-parse", "HEAD")
+    (tmp_path / "docker").mkdir()
+    (tmp_path / "docker" / "Dockerfile.v1").write_text("FROM ubuntu\n")
+    (tmp_path / "README.md").write_text("hello again\n")
+    git("add", ".")
+    git("commit", "-qm", "second")
+    head = git("rev-parse", "HEAD")
+    return base, head
+
+
+def test_validate_comparison_engine_rejects_invalid_value():
+    with pytest.raises(ValueError, match="Invalid comparison engine"):
+        validate_comparison_engine("svn")
+
+
+def test_get_changed_file_list_git_engine_uses_local_diff(git_repo):
+    base, head = git_repo
+
+    result = get_changed_file_list(
+        event_name="push",
+        repository="CCBR/actions",
+        before=base,
+        after=head,
+        comparison_engine="git",
+        session=FailingSession(),
+    )
+
+    assert result == "README.md\ndocker/Dockerfile.v1\n"
+
+
+def test_get_changed_file_list_from_git_skips_rename_detection(monkeypatch):
+    calls = []
+
+    def check_output(args, **kwargs):
+        calls.append(args)
+        return "a.txt\0b.txt\0"
+
+    monkeypatch.setattr(changed_files_module.subprocess, "check_output", check_output)
+
+    result = changed_files_module.get_changed_file_list_from_git(
+        "base", "head", fetch=False
+    )
+
+    assert result == ["a.txt", "b.txt"]
+    assert calls == [
+        [
+            "git",
+            "diff",
+            "--name-only",
+            "--no-renames",
+            "--no-ext-diff",
+            "-z",
+            "base...head",
+        ]
+    ]
+
+
+def test_get_changed_file_list_auto_engine_uses_git_for_latest_commit(git_repo):
+    _base, head = git_repo
+
+    result = get_changed_file_list(
+        event_name="pull_request",
+        comparison_mode="latest-commit",
+        pr_base_repo_full_name="base/repo",
+        pr_base_sha="basesha",
+        pr_head_label="fork:branch",
+        pr_head_repo_full_name="fork/repo",
+        pr_head_sha=head,
+        comparison_engine="auto",
+        session=FailingSession(),
+    )
+
+    assert result == "README.md\ndocker/Dockerfile.v1\n"
+
+
+def test_get_changed_file_list_auto_engine_falls_back_to_api(git_repo):
+    session = MockSession(
+        {
+            "https://api.github.com/repos/CCBR/actions/compare/before...after": {
+                "files": [{"filename": "README.md"}]
+            }
+        }
+    )
+
+    result = get_changed_file_list(
+        event_name="push",
+        repository="CCBR/actions",
+        before="before",
+        after="after",
+        comparison_engine="auto",
+        session=session,
+    )
+
+    assert result == "README.md\n"
+    assert len(session.calls) == 1
+
+
+def test_get_changed_file_list_auto_engine_falls_back_without_merge_base(git_repo):
+    _base, head = git_repo
+    subprocess.run(["git", "checkout", "-q", "--orphan", "unrelated"], check=True)
+    subprocess.run(["git", "commit", "-qm", "unrelated"], check=True)
+    orphan = subprocess.run(
+        ["git", "rev-parse", "HEAD"], check=True, capture_output=True, text=True
+    ).stdout.strip()
+    session = MockSession(
+        {
+            f"https://api.github.com/repos/CCBR/actions/compare/{orphan}...{head}": {
+                "files": [{"filename": "README.md"}]
+            }
+        }
+    )
+
+    result = get_changed_file_list(
+        event_name="push",
+        repository="CCBR/actions",
+        before=orphan,
+        after=head,
+        comparison_engine="auto",
+        session=session,
+    )
+
+    assert result == "README.md\n"
+    assert len(session.calls) == 1
+
+
+def test_compile_path_spec_reuses_compiled_spec():
+    assert compile_path_spec("*.md\nsrc/") is compile_path_spec("*.md\nsrc/")
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [
+        ["*.md", "!CHANGELOG.md"],
+        ["docs/", "!docs/keep.md", "/R/", "src/*.py"],
+        ["vendor/**", "!vendor/keep/**", "vendor/keep/drop.txt"],
+        ["**/Dockerfile.*", "modules/**/main.nf", "*.nf", "!tests/"],
+        ["/docs", "a/b/", "data", "!data/raw/*.csv", "**/raw/"],
+        ["*", "!*.py", "src/*.py"],
+    ],
+)
+def test_indexed_matcher_agrees_with_gitignore_spec(patterns):
+    files = [
+        "README.md",
+        "CHANGELOG.md",
+        "docs/CHANGELOG.md",
+        "docs/keep.md",
+        "docs/img/logo.png",
+        "R/utils.R",
+        "pkg/R/utils.R",
+        "src/app.py",
+        "src/sub/app.py",
+        "vendor/lib/a.js",
+        "vendor/keep/b.js",
+        "vendor/keep/drop.txt",
+        "Dockerfile.v1",
+        "images/Dockerfile.dev",
+        "modules/align/main.nf",
+        "modules/a/b/main.nf",
+        "tests/main.nf",
+        "main.nf",
+        "docs",
+        "a/b/c.txt",
+        "x/a/b/c.txt",
+        "data/raw/s.csv",
+        "data/raw/s.tsv",
+        "data/clean/s.csv",
+        "other/raw/s.csv",
+    ]
+    spec = GitIgnoreSpec.from_lines(patterns)
+    matcher = IndexedGitIgnoreMatcher(patterns)
+    assert matcher.match_files(files) == [f for f in files if spec.match_file(f)]
+
+
+def test_parse_path_groups_accepts_strings_and_lists():
+    groups = parse_path_groups("docker: '**/Dockerfile.*'\ndocs: [docs/**, '*.md']")
+
+    assert groups == {"docker": "**/Dockerfile.*", "docs": "docs/**\n*.md"}
+
+
+def test_parse_path_groups_rejects_invalid_names():
+    with pytest.raises(ValueError, match="Invalid names"):
+        parse_path_groups({"bad name": "*.md"})
+
+
+def test_match_path_groups_matches_each_group():
+    changed_file_list = "README.md\ndocker/Dockerfile.v1\nR/app.R\ndocs/private.md\n"
+    groups = {
+        "docker": "**/Dockerfile.*",
+        "docs": "*.md\n!docs/private.md",
+        "nextflow": "modules/**",
+    }
+
+    result = match_path_groups(changed_file_list, groups)
+
+    assert result == {
+        "docker": ["docker/Dockerfile.v1"],
+        "docs": ["README.md"],
+        "nextflow": [],
+    }
+    for name, patterns in groups.items():
+        assert result[name] == json.loads(
+            match_paths(changed_file_list, patterns)["matched_files_json"]
+        )
+
+
+def test_get_changed_files_includes_matched_groups(monkeypatch, tmp_path):
+    monkeypatch.setenv("GITHUB_OUTPUT", str(tmp_path / "github_output.txt"))
+    session = MockSession(
+        {
+            "https://api.github.com/repos/CCBR/actions/compare/before...after": {
+                "files": [{"filename": "a.txt"}, {"filename": "b.md"}]
+            }
+        }
+    )
+
+    result_json = get_changed_files(
+        event_name="push",
+        repository="CCBR/actions",
+        before="before",
+        after="after",
+        path_groups={"text": "*.txt", "markdown": "*.md"},
+        session=session,
+    )
+
+    payload = json.loads(result_json)
+    assert json.loads(payload["matched_groups_json"]) == {
+        "text": ["a.txt"],
+        "markdown": ["b.md"],
+    }
+
+
+def test_validate_output_mode_rejects_invalid_value():
+    with pytest.raises(ValueError, match="Invalid output mode"):
+        validate_output_mode("stdout")
+
+
+@pytest.mark.parametrize(
+    "changed_file_list",
+    [
+        "README.md\n\nsrc/app.py\ndocs/private.md\n",
+        ["README.md", "", "src/app.py", "docs/private.md"],
+    ],
+)
+def test_write_changed_file_artifacts_streams_lists(tmp_path, changed_file_list):
+
+    summary = write_changed_file_artifacts(
+        changed_file_list,
+        output_dir=tmp_path / "artifacts",
+        paths="*.md\n!docs/private.md",
+        path_groups={"python": "*.py", "docs": "docs/"},
+    )
+
+    assert summary["changed_files_count"] == 3
+    assert summary["matched_files_count"] == 1
+    assert json.loads(summary["matched_groups_counts_json"]) == {
+        "python": 1,
+        "docs": 1,
+    }
+    assert (
+        pathlib.Path(summary["changed_files_path"]).read_text()
+        == "README.md\0src/app.py\0docs/private.md\0"
+    )
+    assert pathlib.Path(summary["matched_files_path"]).read_text() == "README.md\0"
+    records = [
+        json.loads(line)
+        for line in pathlib.Path(summary["changed_files_jsonl_path"])
+        .read_text()
+        .splitlines()
+    ]
+    assert records == [
+        {"filename": "README.md", "matched": True, "groups": []},
+        {"filename": "src/app.py", "matched": False, "groups": ["python"]},
+        {"filename": "docs/private.md", "matched": False, "groups": ["docs"]},
+    ]
+
+
+def test_get_changed_files_files_mode_outputs_only_paths_and_counts(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setenv("GITHUB_OUTPUT", str(tmp_path / "github_output.txt"))
+    session = MockSession(
+        {
+            "https://api.github.com/repos/CCBR/actions/compare/before...after": {
+                "files": [{"filename": "a.txt"}, {"filename": "b.md"}]
+            }
+        }
+    )
+
+    def fail_to_join(files):
+        raise AssertionError("files mode should not join the file list")
+
+    monkeypatch.setattr(
+        changed_files_module, "format_multiline_file_list", fail_to_join
+    )
+
+    result_json = get_changed_files(
+        paths="*.txt",
+        event_name="push",
+        repository="CCBR/actions",
+        before="before",
+        after="after",
+        output_mode="files",
+        output_dir=tmp_path / "artifacts",
+        session=session,
+    )
+
+    payload = json.loads(result_json)
+    assert "changed_files_json" not in payload
+    assert payload["changed_files_count"] == 2
+    assert payload["matched_files_count"] == 1
+    assert pathlib.Path(payload["matched_files_path"]).read_text() == "a.txt\0"
@@ -1,6 +1,11 @@
+import json
 import os
 import pathlib
+import subprocess
+import sys
 from unittest.mock import patch
+
+import pytest
 from click.testing import CliRunner
 from ccbr_tools.shell import shell_run
 from ccbr_actions.__main__ import cli
@@ -14,6 +19,45 @@ def test_version():
     assert shell_run("ccbr_actions --version")
 
 
+# ---------------------------------------------------------------------------
+# startup import budget
+# ---------------------------------------------------------------------------
+
+IMPORT_BUDGET_MS = float(os.environ.get("CCBR_ACTIONS_IMPORT_BUDGET_MS", 100))
+HEAVY_MODULES = {"requests", "yaml", "asyncio", "cffconvert", "pathspec", "urllib3"}
+
+
+def import_profile(*args):
+    """Run the CLI under ``-X importtime`` and return the imported modules and
+    the cumulative milliseconds spent in top-level imports made by the package.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "ccbr_actions", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set()
+    package_ms = 0.0
+    in_package = False
+    for line in process.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[0].strip().isdigit():
+            name = fields[2].rstrip().removeprefix(" ")
+            modules.add(name.strip())
+            in_package = in_package or name.startswith("ccbr_actions")
+            if in_package and not name.startswith(" "):
+                package_ms += int(fields[1]) / 1000
+    return modules, package_ms
+
+
+@pytest.mark.parametrize("args", [("--help",), ("--version",)])
+def test_cli_startup_imports(args):
+    modules, package_ms = import_profile(*args)
+    assert not {module.split(".")[0] for module in modules} & HEAVY_MODULES
+    assert package_ms < IMPORT_BUDGET_MS
+
+
 def test_use_example(tmp_path):
     current_wd = pathlib.Path.cwd()
     outfile = tmp_path / ".github" / "workflows" / "build-nextflow.yml"
@@ -37,7 +81,7 @@ MOCK_RULESETS = [
 
 def test_list_rulesets_prints_rulesets():
     runner = CliRunner()
-    with patch("ccbr_actions.__main__.list_rulesets", return_value=MOCK_RULESETS):
+    with patch("ccbr_actions.github.list_rulesets", return_value=MOCK_RULESETS):
         result = runner.invoke(cli, ["list-rulesets", "CCBR/actions"])
 
     assert result.exit_code == 0
@@ -49,7 +93,7 @@ def test_list_rulesets_prints_rulesets():
 
 def test_list_rulesets_prints_message_when_empty():
     runner = CliRunner()
-    with patch("ccbr_actions.__main__.list_rulesets", return_value=[]):
+    with patch("ccbr_actions.github.list_rulesets", return_value=[]):
         result = runner.invoke(cli, ["list-rulesets", "CCBR/empty-repo"])
 
     assert result.exit_code == 0
@@ -58,7 +102,7 @@ def test_list_rulesets_prints_message_when_empty():
 
 def test_list_rulesets_passes_token():
     runner = CliRunner()
-    with patch("ccbr_actions.__main__.list_rulesets", return_value=[]) as mock_fn:
+    with patch("ccbr_actions.github.list_rulesets", return_value=[]) as mock_fn:
         runner.invoke(cli, ["list-rulesets", "CCBR/actions", "--token", "ghp_test"])
 
     mock_fn.assert_called_once_with(repo="CCBR/actions", token="ghp_test")
@@ -66,7 +110,7 @@ def test_list_rulesets_passes_token():
 
 def test_list_rulesets_reads_token_from_env():
     runner = CliRunner()
-    with patch("ccbr_actions.__main__.list_rulesets", return_value=[]) as mock_fn:
+    with patch("ccbr_actions.github.list_rulesets", return_value=[]) as mock_fn:
         result = runner.invoke(
             cli, ["list-rulesets", "CCBR/actions"], env={"GH_TOKEN": "ghp_env"}
         )
@@ -84,7 +128,7 @@ CREATED_RULESET = {"id": 99, "name": "Require PR reviews"}
 
 def test_copy_ruleset_prints_confirmation():
     runner = CliRunner()
-    with patch("ccbr_actions.__main__.copy_ruleset", return_value=CREATED_RULESET):
+    with patch("ccbr_actions.github.copy_ruleset", return_value=CREATED_RULESET):
         result = runner.invoke(
             cli,
             ["copy-ruleset", "CCBR/actions", "CCBR/other-repo", "Require PR reviews"],
@@ -99,7 +143,7 @@ def test_copy_ruleset_prints_confirmation():
 def test_copy_ruleset_passes_arguments():
     runner = CliRunner()
     with patch(
-        "ccbr_actions.__main__.copy_ruleset", return_value=CREATED_RULESET
+        "ccbr_actions.github.copy_ruleset", return_value=CREATED_RULESET
     ) as mock_fn:
         runner.invoke(
             cli,
@@ -124,7 +168,7 @@ def test_copy_ruleset_passes_arguments():
 def test_copy_ruleset_reads_token_from_env():
     runner = CliRunner()
     with patch(
-        "ccbr_actions.__main__.copy_ruleset", return_value=CREATED_RULESET
+        "ccbr_actions.github.copy_ruleset", return_value=CREATED_RULESET
     ) as mock_fn:
         runner.invoke(
             cli,
@@ -143,7 +187,7 @@ def test_copy_ruleset_reads_token_from_env():
 def test_copy_ruleset_surfaces_value_error():
     runner = CliRunner()
     with patch(
-        "ccbr_actions.__main__.copy_ruleset",
+        "ccbr_actions.github.copy_ruleset",
         side_effect=ValueError("'Nonexistent' not found"),
     ):
         result = runner.invoke(
@@ -152,3 +196,314 @@ def test_copy_ruleset_surfaces_value_error():
         )
 
     assert result.exit_code != 0
+
+
+FANOUT_RESULTS = [
+    {"repo": "CCBR/Tools", "status": "created", "ruleset_id": 7, "error": ""},
+    {"repo": "CCBR/RENEE", "status": "created", "ruleset_id": 8, "error": ""},
+]
+
+
+def test_copy_ruleset_fans_out_to_targets_file(tmp_path):
+    targets_file = tmp_path / "repos.json"
+    targets_file.write_text(
+        json.dumps({"owners": {"CCBR": ["actions", "Tools", "RENEE"]}})
+    )
+    runner = CliRunner()
+    with patch(
+        "ccbr_actions.__main__.copy_ruleset_to_many", return_value=FANOUT_RESULTS
+    ) as mock_fn:
+        result = runner.invoke(
+            cli,
+            [
+                "copy-ruleset",
+                "CCBR/actions",
+                "Require PR reviews",
+                "--targets-file",
+                str(targets_file),
+            ],
+        )
+
+    assert result.exit_code == 0
+    assert "CCBR/Tools" in result.output
+    assert "created" in result.output
+    mock_fn.assert_called_once_with(
+        source_repo="CCBR/actions",
+        target_repos=["CCBR/Tools", "CCBR/RENEE"],
+        ruleset_name="Require PR reviews",
+        token=None,
+        max_workers=8,
+        sync=False,
+    )
+
+
+def test_copy_ruleset_fan_out_reports_failures_as_json():
+    results = FANOUT_RESULTS[:1] + [
+        {"repo": "CCBR/RENEE", "status": "failed", "ruleset_id": None, "error": "403"}
+    ]
+    runner = CliRunner()
+    with patch("ccbr_actions.__main__.copy_ruleset_to_many", return_value=results):
+        result = runner.invoke(
+            cli,
+            [
+                "copy-ruleset",
+                "CCBR/actions",
+                "Require PR reviews",
+                "--target",
+                "CCBR/Tools",
+                "--target",
+                "CCBR/RENEE",
+                "--format",
+                "json",
+            ],
+        )
+
+    assert result.exit_code != 0
+    assert json.loads(result.output[: result.output.rindex("]") + 1]) == results
+    assert "1 of 2 repositories failed: CCBR/RENEE" in result.output
+
+
+def test_copy_ruleset_requires_a_target():
+    runner = CliRunner()
+    result = runner.invoke(cli, ["copy-ruleset", "CCBR/actions", "Require PR reviews"])
+
+    assert result.exit_code != 0
+    assert "No target repositories" in result.output
+
+
+def test_copy_ruleset_sync_single_target():
+    runner = CliRunner()
+    with patch(
+        "ccbr_actions.github.sync_ruleset",
+        return_value={"action": "unchanged", "ruleset": {"id": 5}},
+    ) as mock_fn:
+        result = runner.invoke(
+            cli,
+            [
+                "copy-ruleset",
+                "CCBR/actions",
+                "CCBR/other-repo",
+                "Require PR reviews",
+                "--sync",
+            ],
+        )
+
+    assert result.exit_code == 0
+    assert "unchanged in CCBR/other-repo" in result.output
+    mock_fn.assert_called_once_with(
+        source_repo="CCBR/actions",
+        target_repo="CCBR/other-repo",
+        ruleset_name="Require PR reviews",
+        token=None,
+    )
+
+
+SNAPSHOT_RULESET = {
+    "id": 1,
+    "name": "Require PR reviews",
+    "updated_at": "2024-01-02T00:00:00Z",
+    "rules": [],
+}
+
+
+def test_rulesets_snapshot_writes_index(tmp_path):
+    output = tmp_path / "rulesets.jsonl"
+    record = {
+        "repo": "CCBR/actions",
+        "id": 1,
+        "name": "Require PR reviews",
+        "updated_at": "2024-01-02T00:00:00Z",
+        "ruleset": SNAPSHOT_RULESET,
+    }
+    summary = {"repos": 1, "rulesets": 1, "fetched": 1, "reused": 0, "errors": {}}
+    runner = CliRunner()
+    with patch(
+        "ccbr_actions.__main__.snapshot_many", return_value=([record], summary)
+    ) as mock_fn:
+        result = runner.invoke(
+            cli, ["rulesets", "snapshot", "CCBR/actions", "-o", str(output)]
+        )
+
+    assert result.exit_code == 0
+    assert "Wrote 1 rulesets from 1 repositories" in result.output
+    assert [json.loads(line) for line in output.read_text().splitlines()] == [record]
+    mock_fn.assert_called_once_with(
+        ["CCBR/actions"], previous=[], token=None, max_workers=8
+    )
+
+
+def test_copy_ruleset_reads_source_from_snapshot(tmp_path):
+    snapshot = tmp_path / "rulesets.jsonl"
+    snapshot.write_text(
+        json.dumps(
+            {
+                "repo": "CCBR/actions",
+                "id": 1,
+                "name": "Require PR reviews",
+                "updated_at": "2024-01-02T00:00:00Z",
+                "ruleset": SNAPSHOT_RULESET,
+            }
+        )
+        + "\n"
+    )
+    runner = CliRunner()
+    with patch(
+        "ccbr_actions.github.copy_ruleset", return_value=CREATED_RULESET
+    ) as mock_fn:
+        result = runner.invoke(
+            cli,
+            [
+                "copy-ruleset",
+                "CCBR/actions",
+                "CCBR/other-repo",
+                "Require PR reviews",
+                "--from-snapshot",
+                str(snapshot),
+            ],
+        )
+
+    assert result.exit_code == 0
+    mock_fn.assert_called_once_with(
+        source_repo="CCBR/actions",
+        target_repo="CCBR/other-repo",
+        ruleset_name="Require PR reviews",
+        token=None,
+        ruleset=SNAPSHOT_RULESET,
+    )
+
+
+# ---------------------------------------------------------------------------
+# trigger-workflows CLI
+# ---------------------------------------------------------------------------
+
+
+def test_trigger_workflows_applies_defaults_and_reports_failures():
+    results = [
+        {
+            "repo": "CCBR/a",
+            "workflow": "build.yml",
+            "ref": "main",
+            "status": "dispatched",
+            "status_code": 204,
+            "attempts": 1,
+            "error": "",
+        },
+        {
+            "repo": "CCBR/b",
+            "workflow": "build.yml",
+            "ref": "main",
+            "status": "failed",
+            "status_code": 404,
+            "attempts": 1,
+            "error": "HTTP 404",
+        },
+    ]
+    runner = CliRunner()
+    with patch(
+        "ccbr_actions.actions.trigger_workflows", return_value=results
+    ) as mock_fn:
+        result = runner.invoke(
+            cli,
+            [
+                "trigger-workflows",
+                '{"include": [{"repo": "CCBR/a"}, {"repo": "CCBR/b"}]}',
+                "--workflow",
+                "build.yml",
+                "--ref",
+                "main",
+            ],
+        )
+    assert result.exit_code == 1
+    assert "1 of 2 dispatches failed: CCBR/b/build.yml@main" in result.output
+    assert mock_fn.call_args.args[0] == [
+        {"workflow": "build.yml", "ref": "main", "repo": "CCBR/a"},
+        {"workflow": "build.yml", "ref": "main", "repo": "CCBR/b"},
+    ]
+
+
+def test_trigger_workflows_rejects_incomplete_matrix():
+    result = CliRunner().invoke(cli, ["trigger-workflows", '[{"repo": "CCBR/a"}]'])
+    assert result.exit_code == 2
+    assert "need 'repo', 'workflow', and 'ref'" in result.output
+
+
+# ---------------------------------------------------------------------------
+# docker-staleness CLI
+# ---------------------------------------------------------------------------
+
+
+def test_docker_staleness_sets_matrix_output(github_output_file):
+    results = [
+        {
+            "dockerfile": "bwa/Dockerfile.v1",
+            "image_name": "nciccbr/bwa:v1",
+            "should_build": "true",
+            "reason": "tag_not_found",
+        },
+        {
+            "dockerfile": "star/Dockerfile.v2",
+            "image_name": "nciccbr/star:v2",
+            "should_build": "false",
+            "reason": "tag_is_newer_or_equal_to_dockerfile",
+        },
+    ]
+    with patch(
+        "ccbr_actions.docker.evaluate_docker_build_staleness_many",
+        return_value=results,
+    ) as mock_fn:
+        result = CliRunner().invoke(
+            cli,
+            [
+                "docker-staleness",
+                "bwa/Dockerfile.v1",
+                "--dockerfiles-json",
+                '["star/Dockerfile.v2", "bwa/Dockerfile.v1"]',
+                "--set-output",
+                "matrix",
+            ],
+        )
+    assert result.exit_code == 0, result.output
+    assert mock_fn.call_args.args[0] == ["bwa/Dockerfile.v1", "star/Dockerfile.v2"]
+    matrix = {
+        "include": [
+            {
+                "dockerfile": "bwa/Dockerfile.v1",
+                "image_name": "nciccbr/bwa:v1",
+                "reason": "tag_not_found",
+            }
+        ]
+    }
+    assert json.loads(result.output) == matrix
+    output_text = github_output_file.read_text()
+    assert json.dumps(matrix) in output_text
+    assert "matrix_count<<" in output_text
+
+
+def test_docker_plan_builds_dependents(tmp_path, monkeypatch, github_output_file):
+    monkeypatch.chdir(tmp_path)
+    for path, text in {
+        "base/Dockerfile.v1": "FROM ubuntu:22.04\n",
+        "tool/Dockerfile.v1": "FROM nciccbr/base:v1-dev\n",
+        "base/Dockerfile.v1.dockerignore": "*.md\n",
+    }.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(text)
+    result = CliRunner().invoke(
+        cli,
+        [
+            "docker-plan",
+            "base/Dockerfile.v1",
+            "--suffix",
+            "dev",
+            "--set-output",
+            "plan",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    plan = json.loads(result.output)
+    assert [
+        [entry["image_name"] for entry in wave["include"]] for wave in plan["waves"]
+    ] == [["nciccbr/base:v1-dev"], ["nciccbr/tool:v1-dev"]]
+    output_text = github_output_file.read_text()
+    assert "plan_waves<<" in output_text
+    assert json.dumps(plan) in output_text
@@ -1,4 +1,12 @@
-from ccbr_actions.data import get_file_path
+import pathlib
+
+from ccbr_actions.data import (
+    build_examples_index,
+    example_description,
+    get_example_path,
+    get_file_path,
+    read_examples_index,
+)
 import pytest
 
 
@@ -14,3 +22,33 @@ def test_get_file_path_error():
         assert "FileNotFoundError: not_a_file.txt not found in package data" == str(
             exc_info
         )
+
+
+def test_examples_index_is_up_to_date():
+    examples_dir = pathlib.Path(__file__).resolve().parents[1] / "examples"
+    assert read_examples_index() == build_examples_index(examples_dir), (
+        "Run `python scripts/bundle_examples.py` to update the bundled examples index"
+    )
+
+
+def test_get_example_path():
+    path = get_example_path("docs-mkdocs")
+    assert path.read_text().startswith("name: docs")
+    with pytest.raises(FileNotFoundError, match="not a bundled example"):
+        get_example_path("not-an-example")
+
+
+def test_example_description_ignores_inline_comments_and_job_names():
+    text = (
+        "name: build\n"
+        "# this workflow requires a token\n"
+        "on: push\n"
+        "jobs:\n"
+        "  test:\n"
+        "    name: run tests\n"
+        "    steps:\n"
+        "      - run: make # fetch the remote branch\n"
+    )
+    assert example_description(text) == "build"
+    assert example_description("\n# Build the docs\n#\n" + text) == "Build the docs"
+    assert example_description("on: push\njobs:\n  test:\n    name: test\n") == ""
@@ -5,7 +5,13 @@ import subprocess
 
 import pytest
 
-from ccbr_actions.docker import prepare_docker_build_variables, tag_from_dockerfile
+from ccbr_actions.docker import (
+    docker_build_graph,
+    dockerfile_base_images,
+    plan_docker_builds,
+    prepare_docker_build_variables,
+    tag_from_dockerfile,
+)
 
 
 def parse_env_file(env_path):
@@ -79,3 +85,155 @@ def test_prepare_docker_build_variables_matches_bash(suffix, tmp_path):
 
     assert py_values == bash_values
     assert py_file_values == bash_values
+
+
+def write_dockerfiles(root, dockerfiles):
+    for path, text in dockerfiles.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(text)
+
+
+def test_dockerfile_base_images(tmp_path):
+    write_dockerfiles(
+        tmp_path,
+        {
+            "Dockerfile.v1": (
+                "ARG BASE=nciccbr/ccbr_base\n"
+                "ARG TAG\n"
+                "FROM ${BASE}:${TAG:-v1} AS build\n"
+                "RUN make\n"
+                "FROM build AS test\n"
+                "FROM docker.io/library/ubuntu:22.04\n"
+                "ARG BASE=ignored\n"
+                "COPY --from=build /opt /opt\n"
+                "COPY --from=0 /bin /bin\n"
+                "COPY --from=nciccbr/tools:v2 /usr/bin/tool /usr/bin/\n"
+            )
+        },
+    )
+    assert dockerfile_base_images(str(tmp_path / "Dockerfile.v1")) == [
+        "nciccbr/ccbr_base:v1",
+        "library/ubuntu:22.04",
+        "nciccbr/tools:v2",
+    ]
+    assert (
+        dockerfile_base_images(
+            str(tmp_path / "Dockerfile.v1"), build_args={"TAG": "v3"}
+        )[0]
+        == "nciccbr/ccbr_base:v3"
+    )
+
+
+@pytest.fixture
+def dockers_repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_dockerfiles(
+        tmp_path,
+        {
+            "ccbr_base/Dockerfile.v1": "FROM ubuntu:22.04\n",
+            "bwa/Dockerfile.v1": "FROM nciccbr/ccbr_base:v1-dev\n",
+            "samtools/Dockerfile.v2": "FROM nciccbr/ccbr_base:v1-dev\n",
+            "pipeline/Dockerfile.v1": (
+                "FROM nciccbr/bwa:v1-dev AS bwa\n"
+                "FROM nciccbr/samtools:v2-dev\n"
+                "COPY --from=bwa /usr/bin/bwa /usr/bin/\n"
+            ),
+            "other/Dockerfile.v1": "FROM python:3.11\n",
+        },
+    )
+    return sorted(
+        str(path.relative_to(tmp_path)) for path in tmp_path.rglob("Dockerfile.*")
+    )
+
+
+def test_docker_build_graph(dockers_repo):
+    assert docker_build_graph(dockers_repo, "nciccbr", "dev") == {
+        "bwa/Dockerfile.v1": ["ccbr_base/Dockerfile.v1"],
+        "ccbr_base/Dockerfile.v1": [],
+        "other/Dockerfile.v1": [],
+        "pipeline/Dockerfile.v1": ["bwa/Dockerfile.v1", "samtools/Dockerfile.v2"],
+        "samtools/Dockerfile.v2": ["ccbr_base/Dockerfile.v1"],
+    }
+
+
+def test_docker_build_graph_matches_plain_tag_only_for_main(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_dockerfiles(
+        tmp_path,
+        {
+            "base/Dockerfile.v1": "FROM ubuntu:22.04\n",
+            "tool/Dockerfile.v1": "FROM nciccbr/base:v1\n",
+        },
+    )
+    dockerfiles = ["base/Dockerfile.v1", "tool/Dockerfile.v1"]
+    assert docker_build_graph(dockerfiles, "nciccbr", "dev")["tool/Dockerfile.v1"] == []
+    assert (
+        docker_build_graph(dockerfiles, "nciccbr", "feat")["tool/Dockerfile.v1"] == []
+    )
+    assert docker_build_graph(dockerfiles, "nciccbr", "main")["tool/Dockerfile.v1"] == [
+        "base/Dockerfile.v1"
+    ]
+
+
+def test_plan_docker_builds_propagates_staleness(dockers_repo):
+    plan = plan_docker_builds(
+        dockers_repo,
+        stale={"ccbr_base/Dockerfile.v1": "tag_not_found"},
+        suffix="dev",
+    )
+    assert [
+        [entry["dockerfile"] for entry in wave["include"]] for wave in plan["waves"]
+    ] == [
+        ["ccbr_base/Dockerfile.v1"],
+        ["bwa/Dockerfile.v1", "samtools/Dockerfile.v2"],
+        ["pipeline/Dockerfile.v1"],
+    ]
+    assert plan["waves"][1]["include"][0] == {
+        "dockerfile": "bwa/Dockerfile.v1",
+        "image_name": "nciccbr/bwa:v1-dev",
+        "reason": "base_image_stale: ccbr_base/Dockerfile.v1",
+        "depends_on": ["ccbr_base/Dockerfile.v1"],
+    }
+    assert [entry["wave"] for entry in plan["matrix"]["include"]] == [0, 1, 1, 2]
+
+
+def test_plan_docker_builds_waits_only_for_stale_dependencies(dockers_repo):
+    plan = plan_docker_builds(
+        dockers_repo, stale={"samtools/Dockerfile.v2": "requested"}, suffix="dev"
+    )
+    assert [wave["include"] for wave in plan["waves"]] == [
+        [
+            {
+                "dockerfile": "samtools/Dockerfile.v2",
+                "image_name": "nciccbr/samtools:v2-dev",
+                "reason": "requested",
+                "depends_on": [],
+            }
+        ],
+        [
+            {
+                "dockerfile": "pipeline/Dockerfile.v1",
+                "image_name": "nciccbr/pipeline:v1-dev",
+                "reason": "base_image_stale: samtools/Dockerfile.v2",
+                "depends_on": ["samtools/Dockerfile.v2"],
+            }
+        ],
+    ]
+    assert len(plan_docker_builds(dockers_repo, suffix="dev")["waves"]) == 3
+    assert plan_docker_builds(dockers_repo, stale={}, suffix="dev") == {
+        "waves": [],
+        "matrix": {"include": []},
+    }
+
+
+def test_plan_docker_builds_rejects_cycles(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_dockerfiles(
+        tmp_path,
+        {
+            "a/Dockerfile.v1": "FROM nciccbr/b:v1-feat\n",
+            "b/Dockerfile.v1": "FROM nciccbr/a:v1-feat\n",
+        },
+    )
+    with pytest.raises(ValueError, match="cycle"):
+        plan_docker_builds(["a/Dockerfile.v1", "b/Dockerfile.v1"])
@@ -1,6 +1,11 @@
+import concurrent.futures
+import os
+import pathlib
 import subprocess
 
+import pytest
 import requests
+import yaml
 
 
 from ccbr_actions import docker as docker_module
@@ -404,3 +409,478 @@ def test_evaluate_docker_build_staleness_and_set_outputs_build_true(
     assert "should_build<<" in output_text
     assert "reason<<" in output_text
     assert "tag_not_found" in output_text
+
+
+def git_commit(repo, paths, date):
+    for path in paths:
+        (repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (repo / path).write_text(f"FROM ubuntu:22.04\n# {date}\n")
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_DATE": date,
+        "GIT_COMMITTER_DATE": date,
+        "GIT_AUTHOR_NAME": "test",
+        "GIT_AUTHOR_EMAIL": "test@example.com",
+        "GIT_COMMITTER_NAME": "test",
+        "GIT_COMMITTER_EMAIL": "test@example.com",
+    }
+    subprocess.run(["git", "add", *paths], cwd=repo, check=True, env=env)
+    subprocess.run(["git", "commit", "-q", "-m", date], cwd=repo, check=True, env=env)
+
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_evaluate_docker_build_staleness_many(git_repo):
+    tags = {"bwa": "2026-01-02T00:00:00Z", "star": "2026-01-02T00:00:00Z"}
+    git_commit(git_repo, ["star/Dockerfile.v2"], "2026-01-01T00:00:00+00:00")
+    git_commit(git_repo, ["bwa/Dockerfile.v1"], "2026-01-05T00:00:00+00:00")
+    (git_repo / "Dockerfile").write_text("FROM ubuntu:22.04\n")
+
+    class Session:
+        def __init__(self):
+            self.urls = []
+
+        def get(self, url, timeout=None):
+            self.urls.append(url)
+            repo = url.split("/repositories/")[1].split("/")[0]
+            results = [{"name": "v1-dev", "last_updated": tags[repo]}]
+            results.append({"name": "v2-dev", "last_updated": tags[repo]})
+            return FakeResponse(payload={"results": results, "next": None})
+
+    session = Session()
+    results = docker_module.evaluate_docker_build_staleness_many(
+        ["bwa/Dockerfile.v1", "star/Dockerfile.v2", "Dockerfile"],
+        dockerhub_namespace="nciccbr",
+        suffix="dev",
+        session=session,
+    )
+
+    assert [(r["image_name"], r["should_build"]) for r in results] == [
+        ("nciccbr/bwa:v1-dev", "true"),
+        ("nciccbr/star:v2-dev", "false"),
+        ("", "true"),
+    ]
+    assert results[2]["reason"].startswith("invalid_dockerfile_name")
+    assert sorted(session.urls) == [
+        "https://hub.docker.com/v2/namespaces/nciccbr/repositories/bwa/tags?page_size=100",
+        "https://hub.docker.com/v2/namespaces/nciccbr/repositories/star/tags?page_size=100",
+    ]
+    assert docker_module.docker_build_matrix(results)["include"] == [
+        {
+            "dockerfile": "bwa/Dockerfile.v1",
+            "image_name": "nciccbr/bwa:v1-dev",
+            "reason": "dockerfile_changed_after_tag",
+        },
+        {
+            "dockerfile": "Dockerfile",
+            "image_name": "",
+            "reason": results[2]["reason"],
+        },
+    ]
+
+
+def test_git_path_timestamp_index(git_repo, monkeypatch):
+    git_commit(
+        git_repo, ["a/Dockerfile.v1", "b/Dockerfile.v1"], "2026-01-01T00:00:00+00:00"
+    )
+    git_commit(git_repo, ["b/Dockerfile.v1"], "2026-02-01T00:00:00+00:00")
+    git_commit(git_repo, ["c/Dockerfile.v1"], "2026-03-01T00:00:00+00:00")
+    (git_repo / "untracked").write_text("")
+
+    index = docker_module.GitPathTimestampIndex()
+    assert index.last_commit_iso("c/Dockerfile.v1") == "2026-03-01T00:00:00+00:00"
+    assert index.commits_read == 1
+    assert not index.complete
+    assert index.resolve(["b/Dockerfile.v1", "./a/Dockerfile.v1"]) == {
+        "b/Dockerfile.v1": "2026-02-01T00:00:00+00:00",
+        "./a/Dockerfile.v1": "2026-01-01T00:00:00+00:00",
+    }
+    monkeypatch.chdir(git_repo / "a")
+    assert docker_module.GitPathTimestampIndex().resolve(
+        ["Dockerfile.v1", "../untracked"]
+    ) == {"Dockerfile.v1": "2026-01-01T00:00:00+00:00", "../untracked": ""}
+    for path in ("a/Dockerfile.v1", "b/Dockerfile.v1", "c/Dockerfile.v1"):
+        assert (
+            index.last_commit_iso(path)
+            == subprocess.check_output(
+                ["git", "log", "-1", "--format=%cI", "--", path],
+                cwd=git_repo,
+                text=True,
+            ).strip()
+        )
+
+
+def test_git_path_timestamp_index_refreshes_saved_index(git_repo, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    git_commit(git_repo, ["a/Dockerfile.v1"], "2026-01-01T00:00:00+00:00")
+    git_commit(git_repo, ["b/Dockerfile.v1"], "2026-02-01T00:00:00+00:00")
+    index = docker_module.GitPathTimestampIndex(cache_dir=cache_dir)
+    index.resolve(["a/Dockerfile.v1", "missing"])
+    assert index.complete
+    index.save()
+
+    git_commit(git_repo, ["a/Dockerfile.v1"], "2026-03-01T00:00:00+00:00")
+    refreshed = docker_module.GitPathTimestampIndex(cache_dir=cache_dir)
+    assert refreshed.commits_read == 1
+    assert refreshed.resolve(["a/Dockerfile.v1", "b/Dockerfile.v1", "missing"]) == {
+        "a/Dockerfile.v1": "2026-03-01T00:00:00+00:00",
+        "b/Dockerfile.v1": "2026-02-01T00:00:00+00:00",
+        "missing": "",
+    }
+    assert refreshed.commits_read == 1
+
+
+def test_git_path_timestamp_index_outside_repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    index = docker_module.GitPathTimestampIndex(cache_dir=tmp_path / "cache")
+    assert index.resolve(["Dockerfile.v1"]) == {"Dockerfile.v1": ""}
+    index.save()
+    assert not (tmp_path / "cache").exists()
+
+
+class PagedTagSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        response = FakeResponse(status_code=404)
+        if url in self.pages:
+            results, next_url = self.pages[url]
+            response = FakeResponse(payload={"results": results, "next": next_url})
+        return response
+
+
+TAGS_URL = "https://hub.docker.com/v2/namespaces/nciccbr/repositories/bwa/tags"
+
+
+def test_dockerhub_tag_index_lists_each_repository_once():
+    session = PagedTagSession(
+        {
+            f"{TAGS_URL}?page_size=2": (
+                [
+                    {"name": "v1", "last_updated": "2026-01-01T00:00:00Z"},
+                    {"name": "v1-dev", "last_updated": None},
+                ],
+                f"{TAGS_URL}?page=2&page_size=2",
+            ),
+            f"{TAGS_URL}?page=2&page_size=2": (
+                [{"name": "v2", "last_updated": "2026-02-01T00:00:00Z"}],
+                None,
+            ),
+        }
+    )
+    index = docker_module.DockerHubTagIndex(session=session, page_size=2)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+        found = list(
+            pool.map(
+                lambda tag: index.last_updated("nciccbr", "bwa", tag),
+                ["v1", "v1-dev", "v2", "v3"],
+            )
+        )
+
+    assert found == ["2026-01-01T00:00:00Z", "", "2026-02-01T00:00:00Z", None]
+    assert index.last_updated("nciccbr", "missing", "v1") is None
+    assert index.requests_sent == 3
+    assert len(session.urls) == 3
+
+
+def test_dockerhub_tag_index_reuses_saved_listings(tmp_path):
+    pages = {
+        f"{TAGS_URL}?page_size=100": (
+            [{"name": "v1", "last_updated": "2026-01-01T00:00:00Z"}],
+            None,
+        )
+    }
+    now = [1000.0]
+
+    def make_index():
+        return docker_module.DockerHubTagIndex(
+            session=PagedTagSession(pages),
+            cache_dir=tmp_path,
+            ttl=60,
+            clock=lambda: now[0],
+        )
+
+    first = make_index()
+    assert first.last_updated("nciccbr", "bwa", "v1") == "2026-01-01T00:00:00Z"
+    second = make_index()
+    assert second.last_updated("nciccbr", "bwa", "v1") == "2026-01-01T00:00:00Z"
+    assert (first.requests_sent, second.requests_sent) == (1, 0)
+
+    now[0] += 61
+    expired = make_index()
+    expired.last_updated("nciccbr", "bwa", "v1")
+    assert expired.requests_sent == 1
+
+
+def test_evaluate_docker_build_staleness_with_tag_index(monkeypatch):
+    monkeypatch.setattr(
+        docker_module,
+        "dockerfile_last_commit_iso",
+        lambda path: "2026-01-05T00:00:00+00:00",
+    )
+
+    class FailingIndex:
+        def last_updated(self, dockerhub_namespace, repo_name, image_tag):
+            raise requests.HTTPError(response=FakeResponse(status_code=429))
+
+    result = docker_module.evaluate_docker_build_staleness(
+        "bwa/Dockerfile.v1",
+        "nciccbr/bwa:v1",
+        "nciccbr",
+        "bwa",
+        tag_index=FailingIndex(),
+    )
+    assert result["should_build"] == "true"
+    assert result["reason"] == "dockerhub_http_429"
+
+
+def write_files(root, files):
+    for path, text in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(text)
+
+
+def test_dockerfile_instructions(tmp_path):
+    write_files(
+        tmp_path,
+        {
+            "Dockerfile.v1": (
+                "# syntax=docker/dockerfile:1\n"
+                "FROM ubuntu:22.04 AS base\n"
+                "\n"
+                "RUN apt-get update && \\\n"
+                "    # a comment inside the command\n"
+                "    apt-get install -y curl\n"
+                "COPY <<EOF /etc/motd\n"
+                "FROM is not an instruction here\n"
+                "EOF\n"
+                "copy   --chown=1000  src/ /opt/src/\n"
+            )
+        },
+    )
+    assert docker_module.dockerfile_instructions(tmp_path / "Dockerfile.v1") == [
+        ("FROM", "ubuntu:22.04 AS base"),
+        ("RUN", "apt-get update && apt-get install -y curl"),
+        ("COPY", "<<EOF /etc/motd\nFROM is not an instruction here\nEOF"),
+        ("COPY", "--chown=1000 src/ /opt/src/"),
+    ]
+
+
+def test_docker_context_files(tmp_path):
+    write_files(
+        tmp_path,
+        {
+            "tool/Dockerfile.v1": (
+                "FROM ubuntu:22.04\n"
+                "COPY --from=builder /usr/bin/tool /usr/bin/\n"
+                "COPY scripts/ /opt/scripts/\n"
+                'COPY ["*.txt", "/opt/"]\n'
+                "ADD https://example.com/data.tar.gz /opt/\n"
+            ),
+            "tool/scripts/run.sh": "echo run\n",
+            "tool/scripts/.hidden": "x\n",
+            "tool/scripts/notes.tmp": "x\n",
+            "tool/scripts/keep.tmp": "x\n",
+            "tool/a.txt": "a\n",
+            "tool/.b.txt": "b\n",
+            "tool/unused.py": "\n",
+            "tool/.dockerignore": "**/*.tmp\n!scripts/keep.tmp\n",
+        },
+    )
+    assert docker_module.docker_context_files(str(tmp_path / "tool/Dockerfile.v1")) == [
+        ".b.txt",
+        "a.txt",
+        "scripts/.hidden",
+        "scripts/keep.tmp",
+        "scripts/run.sh",
+    ]
+    (tmp_path / "tool/Dockerfile.v1.dockerignore").write_text("scripts\n")
+    assert docker_module.docker_context_files(str(tmp_path / "tool/Dockerfile.v1")) == [
+        ".b.txt",
+        "a.txt",
+    ]
+    (tmp_path / "tool/Dockerfile.v1").write_text("FROM ubuntu\nCOPY ${SRC} /opt/\n")
+    assert "unused.py" in docker_module.docker_context_files(
+        str(tmp_path / "tool/Dockerfile.v1")
+    )
+
+
+def test_docker_context_digest(tmp_path):
+    write_files(
+        tmp_path,
+        {
+            "Dockerfile.v1": "FROM ubuntu:22.04\nCOPY app/ /opt/app/\n",
+            "app/main.py": "print('hi')\n",
+            "README.md": "not copied\n",
+        },
+    )
+    dockerfile = str(tmp_path / "Dockerfile.v1")
+    digest = docker_module.docker_context_digest(dockerfile, chunk_size=4)
+    assert digest.startswith("sha256:")
+
+    (tmp_path / "README.md").write_text("changed\n")
+    (tmp_path / "Dockerfile.v1").write_text(
+        "# comment\nFROM   ubuntu:22.04\n\nCOPY app/ /opt/app/\n"
+    )
+    assert docker_module.docker_context_digest(dockerfile) == digest
+
+    (tmp_path / "app/main.py").write_text("print('bye')\n")
+    assert docker_module.docker_context_digest(dockerfile) != digest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("CCBR_ACTIONS_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+class RegistrySession:
+    def __init__(self, labels, multi_platform=True, manifest_digest=None):
+        self.labels = labels
+        self.multi_platform = multi_platform
+        # Each set of labels belongs to a different image, unless told otherwise
+        self.manifest_digest = manifest_digest or f"sha256:{abs(hash(repr(labels)))}"
+        self.urls = []
+        self.auth = None
+
+    def head(self, url, headers=None, timeout=None):
+        self.urls.append(("HEAD", url))
+        assert headers["Authorization"] == "Bearer abc"
+        response = FakeResponse(status_code=404)
+        if url.endswith("/manifests/v1"):
+            response = FakeResponse()
+            response.headers = {"Docker-Content-Digest": self.manifest_digest}
+        return response
+
+    def get(self, url, params=None, headers=None, timeout=None, auth=None):
+        self.urls.append(url)
+        registry = "https://registry-1.docker.io/v2/nciccbr/bwa"
+        response = FakeResponse(status_code=404)
+        if url == "https://auth.docker.io/token":
+            self.auth = auth
+            response = FakeResponse(payload={"token": "abc"})
+        elif (
+            url == f"{registry}/manifests/{self.manifest_digest}"
+            and self.multi_platform
+        ):
+            manifests = [
+                {"digest": "sha256:att", "platform": {"os": "unknown"}},
+                {"digest": "sha256:arm", "platform": {"architecture": "arm64"}},
+                {"digest": "sha256:amd", "platform": {"architecture": "amd64"}},
+            ]
+            response = FakeResponse(payload={"manifests": manifests})
+        elif url in (
+            f"{registry}/manifests/sha256:amd",
+            f"{registry}/manifests/{self.manifest_digest}",
+        ):
+            assert headers["Authorization"] == "Bearer abc"
+            response = FakeResponse(payload={"config": {"digest": "sha256:cfg"}})
+        elif url == f"{registry}/blobs/sha256:cfg":
+            response = FakeResponse(payload={"config": {"Labels": self.labels}})
+        return response
+
+
+def test_registry_image_labels(monkeypatch):
+    monkeypatch.delenv("DOCKERHUB_USERNAME", raising=False)
+    monkeypatch.delenv("DOCKERHUB_TOKEN", raising=False)
+    session = RegistrySession({"a": "b"})
+    labels = docker_module.registry_image_labels(
+        "nciccbr", "bwa", "v1", session=session
+    )
+    assert labels == {"a": "b"}
+    assert session.auth is None
+    assert session.urls[-2].endswith("/manifests/sha256:amd")
+    single = RegistrySession(None, multi_platform=False, manifest_digest="sha256:x")
+    single_labels = docker_module.registry_image_labels(
+        "nciccbr", "bwa", "v1", session=single
+    )
+    assert single_labels == {}
+    assert (
+        docker_module.registry_image_labels("nciccbr", "bwa", "v2", session=session)
+        is None
+    )
+
+
+def test_registry_image_labels_uses_credentials_and_cache(monkeypatch):
+    monkeypatch.setenv("DOCKERHUB_USERNAME", "ccbr")
+    monkeypatch.setenv("DOCKERHUB_TOKEN", "secret")
+    first = RegistrySession({"a": "b"})
+    assert docker_module.registry_image_labels("nciccbr", "bwa", "v1", session=first)
+    assert first.auth == ("ccbr", "secret")
+
+    # The same manifest digest is answered from disk after a HEAD request
+    second = RegistrySession({"a": "changed"}, manifest_digest=first.manifest_digest)
+    labels = docker_module.registry_image_labels("nciccbr", "bwa", "v1", session=second)
+    assert labels == {"a": "b"}
+    assert [url for url in second.urls if "/manifests/" in str(url)] == [
+        ("HEAD", "https://registry-1.docker.io/v2/nciccbr/bwa/manifests/v1")
+    ]
+
+
+def test_evaluate_docker_build_staleness_content_mode(tmp_path):
+    write_files(tmp_path, {"bwa/Dockerfile.v1": "FROM ubuntu:22.04\n"})
+    dockerfile = str(tmp_path / "bwa/Dockerfile.v1")
+    digest = docker_module.docker_context_digest(dockerfile)
+
+    def evaluate(labels, image_name="nciccbr/bwa:v1"):
+        return docker_module.evaluate_docker_build_staleness(
+            dockerfile,
+            image_name,
+            "nciccbr",
+            "bwa",
+            session=RegistrySession(labels),
+            staleness_mode="content",
+        )
+
+    label = docker_module.CONTEXT_DIGEST_LABEL
+    assert evaluate({label: digest})["should_build"] == "false"
+    assert evaluate({label: digest})["context_digest"] == digest
+    assert evaluate({label: "sha256:old"})["reason"] == "context_digest_changed"
+    assert evaluate({})["reason"] == "tag_missing_context_digest"
+    assert evaluate({}, "nciccbr/bwa:v2")["reason"] == "tag_not_found"
+    with pytest.raises(ValueError, match="Unknown staleness mode"):
+        docker_module.evaluate_docker_build_staleness(
+            dockerfile, "nciccbr/bwa:v1", "nciccbr", "bwa", staleness_mode="size"
+        )
+
+
+def test_forced_build_labels_image_with_context_digest(tmp_path, github_output_file):
+    write_files(tmp_path, {"bwa/Dockerfile.v1": "FROM ubuntu:22.04\n"})
+    dockerfile = str(tmp_path / "bwa/Dockerfile.v1")
+
+    # A forced build skips the staleness check but still computes the digest
+    digest = docker_module.set_docker_context_digest_output(dockerfile)
+    assert f"\n{digest}\n" in github_output_file.read_text()
+
+    # The next run in content mode sees the label of the forced build as up to date
+    result = docker_module.evaluate_docker_build_staleness(
+        dockerfile,
+        "nciccbr/bwa:v1",
+        "nciccbr",
+        "bwa",
+        session=RegistrySession({docker_module.CONTEXT_DIGEST_LABEL: digest}),
+        staleness_mode="content",
+    )
+    assert result["should_build"] == "false"
+
+    action_path = pathlib.Path(__file__).parents[1] / "build-docker" / "action.yml"
+    steps = {
+        step.get("id"): step
+        for step in yaml.safe_load(action_path.read_text())["runs"]["steps"]
+    }
+    assert "if" not in steps["context_digest"]
+    assert "set_docker_context_digest_output" in steps["context_digest"]["run"]
+    assert steps["build_and_push"]["with"]["labels"] == (
+        f"{docker_module.CONTEXT_DIGEST_LABEL}="
+        "${{ steps.context_digest.outputs.context_digest }}"
+    )
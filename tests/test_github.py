@@ -1,18 +1,35 @@
+import http.server
+import json
+import threading
+
 import pytest
 from ccbr_actions.github import (
+    GitHubClient,
+    GitHubResponseCache,
+    RateLimitScheduler,
+    is_immutable_url,
+    is_secondary_rate_limit,
     github_api_get,
+    github_api_paginate,
     github_api_headers,
     github_api_post,
     github_api_request,
     list_rulesets,
     copy_ruleset,
+    normalize_ruleset,
+    find_snapshot_ruleset,
+    read_repos_file,
+    read_ruleset_snapshot,
+    write_ruleset_snapshot,
+    sync_ruleset,
 )
 
 
 class MockResponse:
-    def __init__(self, payload, status_code=200):
+    def __init__(self, payload, status_code=200, links=None):
         self.payload = payload
         self.status_code = status_code
+        self.links = links or {}
 
     def json(self):
         return self.payload
@@ -90,6 +107,71 @@ def test_github_api_post_supports_method_only_interface():
     assert session.calls[0][0] == "POST"
 
 
+class PagedMockSession:
+    """Mock session serving a listing split across Link-header pages."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        self.calls.append((url, params))
+        page = int(url.rsplit("page=", 1)[1]) if "page=" in url else 1
+        links = {}
+        if page < len(self.pages):
+            links["next"] = {"url": f"{url.split('?')[0]}?per_page=2&page={page + 1}"}
+        return MockResponse(self.pages[page - 1], links=links)
+
+
+def test_github_api_paginate_follows_next_links():
+    session = PagedMockSession([[{"id": 1}, {"id": 2}], [{"id": 3}]])
+
+    items = list(
+        github_api_paginate(
+            "https://api.github.com/repos/CCBR/actions/rulesets",
+            session=session,
+            per_page=2,
+        )
+    )
+
+    assert [item["id"] for item in items] == [1, 2, 3]
+    assert session.calls == [
+        ("https://api.github.com/repos/CCBR/actions/rulesets", {"per_page": 2}),
+        ("https://api.github.com/repos/CCBR/actions/rulesets?per_page=2&page=2", None),
+    ]
+
+
+def test_github_api_paginate_is_lazy():
+    session = PagedMockSession([[{"id": 1}, {"id": 2}], [{"id": 3}]])
+
+    items = github_api_paginate(
+        "https://api.github.com/repos/CCBR/actions/rulesets", session=session
+    )
+
+    assert next(items) == {"id": 1}
+    assert len(session.calls) == 1
+
+
+def test_github_api_paginate_items_key():
+    session = PagedMockSession([{"total_count": 1, "workflow_runs": [{"id": 7}]}])
+
+    items = github_api_paginate(
+        "https://api.github.com/repos/CCBR/actions/actions/runs",
+        session=session,
+        items_key="workflow_runs",
+    )
+
+    assert list(items) == [{"id": 7}]
+
+
+def test_list_rulesets_reads_all_pages():
+    session = PagedMockSession([RULESET_SUMMARY[:1], RULESET_SUMMARY[1:]])
+
+    result = list_rulesets(repo="CCBR/actions", session=session)
+
+    assert result == RULESET_SUMMARY
+
+
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
@@ -269,3 +351,466 @@ def test_copy_ruleset_error_includes_available_names():
             ruleset_name="Nonexistent",
             session=session,
         )
+
+
+# ---------------------------------------------------------------------------
+# GitHubClient
+# ---------------------------------------------------------------------------
+
+
+class KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps(
+            {"path": self.path, "authorization": self.headers.get("Authorization")}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_github_client_reuses_connections(local_server):
+    with GitHubClient(token="abc", base_url=local_server) as client:
+        for repo in ("CCBR/actions", "CCBR/Tools", "CCBR/CHAMPAGNE"):
+            github_api_get(f"{local_server}/repos/{repo}/rulesets", session=client)
+        stats = client.connection_stats()
+
+    assert stats == {"requests": 3, "connections_opened": 1, "connections_reused": 2}
+
+
+def test_github_client_sends_auth_only_to_api_host(local_server):
+    with GitHubClient(token="abc", base_url=local_server) as client:
+        api_payload = github_api_get(
+            f"{local_server}/repos/CCBR/actions", session=client
+        )
+        other_host = local_server.replace("127.0.0.1", "localhost")
+        other_payload = client.get(f"{other_host}/v2/namespaces").json()
+
+    assert api_payload["authorization"] == "Bearer abc"
+    assert other_payload["authorization"] is None
+
+
+def test_github_client_request_token_overrides_shared_token(local_server):
+    with GitHubClient(token="abc", base_url=local_server) as client:
+        payload = github_api_get(
+            f"{local_server}/repos/CCBR/actions", token="xyz", session=client
+        )
+
+    assert payload["authorization"] == "Bearer xyz"
+
+
+# ---------------------------------------------------------------------------
+# GitHubResponseCache
+# ---------------------------------------------------------------------------
+
+
+class ConditionalHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    etag = '"v1"'
+    paths = []
+
+    def do_GET(self):
+        type(self).paths.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            body = json.dumps({"path": self.path, "etag": self.etag}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", self.etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def conditional_server():
+    ConditionalHandler.paths = []
+    ConditionalHandler.etag = '"v1"'
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ConditionalHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_is_immutable_url():
+    sha = "0123456789abcdef0123456789abcdef01234567"
+    assert is_immutable_url(f"https://api.github.com/repos/CCBR/actions/commits/{sha}")
+    assert is_immutable_url(
+        f"https://api.github.com/repos/CCBR/actions/compare/{sha}...{sha}?page=2"
+    )
+    assert not is_immutable_url(
+        "https://api.github.com/repos/CCBR/actions/commits/main"
+    )
+    assert not is_immutable_url(
+        f"https://api.github.com/repos/CCBR/actions/compare/{sha}^...{sha}"
+    )
+
+
+def test_github_client_cache_revalidates_with_etag(conditional_server, tmp_path):
+    cache = GitHubResponseCache(tmp_path)
+    url = f"{conditional_server}/repos/CCBR/actions/rulesets"
+    with GitHubClient(base_url=conditional_server, cache=cache) as client:
+        first = github_api_get(url, session=client)
+        second = github_api_get(url, session=client)
+        ConditionalHandler.etag = '"v2"'
+        third = github_api_get(url, session=client)
+
+    assert first == second == {"path": "/repos/CCBR/actions/rulesets", "etag": '"v1"'}
+    assert third["etag"] == '"v2"'
+    assert ConditionalHandler.paths == [
+        ("/repos/CCBR/actions/rulesets", None),
+        ("/repos/CCBR/actions/rulesets", '"v1"'),
+        ("/repos/CCBR/actions/rulesets", '"v1"'),
+    ]
+    assert cache.stats() == {"hits": 0, "revalidated": 1, "misses": 2}
+
+
+def test_github_client_cache_never_revalidates_immutable_urls(
+    conditional_server, tmp_path
+):
+    sha = "0123456789abcdef0123456789abcdef01234567"
+    url = f"{conditional_server}/repos/CCBR/actions/commits/{sha}"
+    with GitHubClient(
+        base_url=conditional_server, cache=GitHubResponseCache(tmp_path)
+    ) as client:
+        github_api_get(url, session=client)
+    with GitHubClient(
+        base_url=conditional_server, cache=GitHubResponseCache(tmp_path)
+    ) as client:
+        payload = github_api_get(url, session=client)
+
+    assert payload["path"] == f"/repos/CCBR/actions/commits/{sha}"
+    assert len(ConditionalHandler.paths) == 1
+
+
+def test_github_client_cache_is_scoped_by_token(conditional_server, tmp_path):
+    cache = GitHubResponseCache(tmp_path)
+    url = f"{conditional_server}/repos/CCBR/actions"
+    with GitHubClient(base_url=conditional_server, cache=cache) as client:
+        github_api_get(url, token="abc", session=client)
+        github_api_get(url, token="xyz", session=client)
+
+    assert [etag for _path, etag in ConditionalHandler.paths] == [None, None]
+
+
+def test_github_response_cache_evicts_least_recently_used(conditional_server, tmp_path):
+    cache = GitHubResponseCache(tmp_path, max_size=300)
+    with GitHubClient(base_url=conditional_server, cache=cache) as client:
+        for name in ("one", "two", "three"):
+            github_api_get(f"{conditional_server}/repos/CCBR/{name}", session=client)
+
+    cached_urls = {
+        json.loads(path.read_text())["url"].rsplit("/", 1)[1]
+        for path in tmp_path.glob("*.json")
+    }
+    assert "three" in cached_urls
+    assert "one" not in cached_urls
+
+
+# ---------------------------------------------------------------------------
+# RateLimitScheduler
+# ---------------------------------------------------------------------------
+
+
+class HeaderResponse:
+    def __init__(self, status_code=200, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+def make_scheduler(**kwargs):
+    scheduler = RateLimitScheduler(**kwargs)
+    scheduler.now = 0.0
+    scheduler.sleeps = []
+
+    def fake_sleep(seconds):
+        scheduler.sleeps.append(seconds)
+        scheduler.now += seconds
+
+    scheduler.sleep = fake_sleep
+    scheduler.clock = lambda: scheduler.now
+    scheduler.wall_clock = lambda: 1_000_000 + scheduler.now
+    scheduler.jitter = lambda: 0.5
+    return scheduler
+
+
+def test_is_secondary_rate_limit():
+    assert is_secondary_rate_limit(
+        HeaderResponse(403, text="You have exceeded a secondary rate limit")
+    )
+    assert is_secondary_rate_limit(HeaderResponse(403, {"Retry-After": "30"}))
+    assert not is_secondary_rate_limit(
+        HeaderResponse(403, text="Resource not accessible")
+    )
+
+
+def test_rate_limit_scheduler_spreads_requests_over_budget():
+    scheduler = make_scheduler(rate=2, burst=2)
+
+    for _ in range(4):
+        scheduler.send("https://api.github.com/x", lambda: HeaderResponse())
+
+    assert scheduler.sleeps == [0.5, 0.5]
+    assert scheduler.summary()["throttle_seconds"] == 1.0
+
+
+def test_rate_limit_scheduler_retries_with_jittered_backoff():
+    scheduler = make_scheduler(backoff_base=2)
+    responses = iter([HeaderResponse(502), HeaderResponse(503), HeaderResponse(200)])
+
+    response = scheduler.send("https://hub.docker.com/v2/x", lambda: next(responses))
+
+    assert response.status_code == 200
+    assert scheduler.sleeps == [1.0, 2.0]
+    summary = scheduler.summary()
+    assert summary["hosts"]["hub.docker.com"]["retries"] == 2
+    assert summary["backoff_seconds"] == 3.0
+
+
+def test_rate_limit_scheduler_does_not_retry_post_on_server_error():
+    scheduler = make_scheduler()
+    responses = iter([HeaderResponse(502), HeaderResponse(201)])
+
+    response = scheduler.send(
+        "https://api.github.com/x", lambda: next(responses), method="POST"
+    )
+
+    assert response.status_code == 502
+    assert scheduler.sleeps == []
+    rate_limited = iter(
+        [HeaderResponse(429, {"Retry-After": "3"}), HeaderResponse(201)]
+    )
+    response = scheduler.send(
+        "https://api.github.com/x", lambda: next(rate_limited), method="POST"
+    )
+    assert response.status_code == 201
+    assert scheduler.sleeps == [3.0]
+
+
+def test_rate_limit_scheduler_honours_retry_after_and_gives_up():
+    scheduler = make_scheduler(max_retries=1)
+    response = scheduler.send(
+        "https://api.github.com/x",
+        lambda: HeaderResponse(429, {"Retry-After": "7"}),
+    )
+
+    assert response.status_code == 429
+    assert scheduler.sleeps == [7.0]
+
+
+def test_rate_limit_scheduler_pauses_until_reset_when_exhausted():
+    scheduler = make_scheduler()
+    exhausted = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1000030"}
+
+    scheduler.send("https://api.github.com/x", lambda: HeaderResponse(200, exhausted))
+    scheduler.send("https://api.github.com/x", lambda: HeaderResponse())
+
+    assert scheduler.sleeps == [30.0]
+    assert "api.github.com" in scheduler.format_summary()
+
+
+def test_github_client_schedules_requests(local_server):
+    scheduler = RateLimitScheduler()
+    with GitHubClient(base_url=local_server, scheduler=scheduler) as client:
+        github_api_get(f"{local_server}/repos/CCBR/actions", session=client)
+
+    assert scheduler.summary()["requests"] == 1
+
+
+def test_read_repos_file_accepts_owner_mapping_and_list(tmp_path):
+    owners_file = tmp_path / "repos.json"
+    owners_file.write_text(
+        json.dumps({"owners": {"CCBR": ["actions", "Tools"], "NCI-RBL": ["x"]}})
+    )
+    list_file = tmp_path / "list.json"
+    list_file.write_text(json.dumps(["CCBR/actions"]))
+
+    assert read_repos_file(owners_file) == ["CCBR/actions", "CCBR/Tools", "NCI-RBL/x"]
+    assert read_repos_file(list_file) == ["CCBR/actions"]
+
+
+def test_read_repos_file_rejects_other_layouts(tmp_path):
+    path = tmp_path / "repos.json"
+    path.write_text(json.dumps({"repos": []}))
+
+    with pytest.raises(ValueError, match="must contain"):
+        read_repos_file(path)
+
+
+# ---------------------------------------------------------------------------
+# sync_ruleset
+# ---------------------------------------------------------------------------
+
+
+class SyncMockSession:
+    """Mock session with a source ruleset and an optional target ruleset."""
+
+    def __init__(self, target_ruleset=None):
+        self.target_ruleset = target_ruleset
+        self.calls = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls.append(("GET", url))
+        target = "https://api.github.com/repos/CCBR/target/rulesets"
+        response = None
+        if url == target:
+            inherited = {
+                "id": 3,
+                "name": "Require PR reviews",
+                "source_type": "Organization",
+            }
+            listed = [self.target_ruleset] if self.target_ruleset else []
+            response = MockResponse([inherited, *listed])
+        elif url == f"{target}/7":
+            response = MockResponse(self.target_ruleset)
+        elif url.endswith("/rulesets"):
+            response = MockResponse(RULESET_SUMMARY)
+        else:
+            response = MockResponse(RULESET_DETAIL)
+        return response
+
+    def post(self, url, headers=None, **kwargs):
+        self.calls.append(("POST", url, kwargs.get("json")))
+        return MockResponse(CREATED_RULESET, status_code=201)
+
+    def put(self, url, headers=None, **kwargs):
+        self.calls.append(("PUT", url, kwargs.get("json")))
+        return MockResponse({"id": 7, **kwargs.get("json")})
+
+
+def target_ruleset(**changes):
+    ruleset = {
+        **RULESET_DETAIL,
+        "id": 7,
+        "node_id": "xyz",
+        "source": "CCBR/target",
+        "source_type": "Repository",
+        "current_user_can_bypass": "never",
+        "conditions": {"ref_name": {"exclude": [], "include": ["~DEFAULT_BRANCH"]}},
+    }
+    ruleset.update(changes)
+    return ruleset
+
+
+def test_normalize_ruleset_ignores_read_only_fields_and_order():
+    reordered = target_ruleset(rules=[{"type": "b"}, {"type": "a"}])
+
+    assert normalize_ruleset(reordered) == normalize_ruleset(
+        {**RULESET_DETAIL, "rules": [{"type": "a"}, {"type": "b"}]}
+    )
+
+
+def test_sync_ruleset_makes_no_writes_when_unchanged():
+    session = SyncMockSession(target_ruleset=target_ruleset())
+
+    result = sync_ruleset(
+        "CCBR/actions", "CCBR/target", "Require PR reviews", session=session
+    )
+
+    assert result["action"] == "unchanged"
+    assert result["ruleset"]["id"] == 7
+    assert all(call[0] == "GET" for call in session.calls)
+
+
+def test_sync_ruleset_updates_differing_ruleset():
+    session = SyncMockSession(target_ruleset=target_ruleset(enforcement="disabled"))
+
+    result = sync_ruleset(
+        "CCBR/actions", "CCBR/target", "Require PR reviews", session=session
+    )
+
+    assert result["action"] == "updated"
+    method, url, payload = session.calls[-1]
+    assert method == "PUT"
+    assert url == "https://api.github.com/repos/CCBR/target/rulesets/7"
+    assert payload["enforcement"] == "active"
+    assert "id" not in payload
+
+
+def test_sync_ruleset_creates_missing_ruleset():
+    session = SyncMockSession()
+
+    result = sync_ruleset(
+        "CCBR/actions", "CCBR/target", "Require PR reviews", session=session
+    )
+
+    assert result["action"] == "created"
+    assert session.calls[-1][:2] == (
+        "POST",
+        "https://api.github.com/repos/CCBR/target/rulesets",
+    )
+
+
+def test_ruleset_snapshot_round_trip(tmp_path):
+    path = tmp_path / "snapshot" / "rulesets.jsonl"
+    records = [
+        {
+            "repo": "CCBR/b",
+            "id": 2,
+            "name": "x",
+            "updated_at": "",
+            "ruleset": {"id": 2, "name": "x"},
+        },
+        {
+            "repo": "CCBR/a",
+            "id": 1,
+            "name": "main",
+            "updated_at": "",
+            "ruleset": RULESET_DETAIL,
+        },
+    ]
+
+    write_ruleset_snapshot(path, records)
+    loaded = read_ruleset_snapshot(path)
+
+    assert [record["repo"] for record in loaded] == ["CCBR/a", "CCBR/b"]
+    assert (
+        find_snapshot_ruleset(loaded, "CCBR/a", "Require PR reviews") == RULESET_DETAIL
+    )
+    assert read_ruleset_snapshot(tmp_path / "missing.jsonl") == []
+    with pytest.raises(ValueError, match="not found"):
+        find_snapshot_ruleset(loaded, "CCBR/b", "Require PR reviews")
+
+
+def test_copy_ruleset_uses_given_ruleset_without_fetching_source():
+    session = RulesetMockSession()
+
+    copy_ruleset(
+        source_repo="CCBR/actions",
+        target_repo="CCBR/other-repo",
+        ruleset_name="Require PR reviews",
+        session=session,
+        ruleset=RULESET_DETAIL,
+    )
+
+    assert [call[0] for call in session.calls] == ["POST"]
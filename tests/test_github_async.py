@@ -0,0 +1,288 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from ccbr_actions.github_async import (
+    AsyncGitHubClient,
+    api_get,
+    copy_ruleset,
+    copy_ruleset_to_repos,
+    list_rulesets,
+    paginate,
+    run,
+    snapshot_rulesets,
+    sync_ruleset_to_repos,
+)
+
+
+class MockResponse:
+    def __init__(self, payload, status_code=200, links=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.links = links or {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+
+class SlowSession:
+    """Mock session that takes ``delay`` seconds per request and tracks concurrency."""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        with self._lock:
+            self.calls.append(("GET", url, params))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        response = None
+        if url.endswith("/rulesets"):
+            response = MockResponse([{"id": 1, "name": "main"}])
+        elif url.endswith("/rulesets/1"):
+            response = MockResponse(
+                {"id": 1, "node_id": "abc", "name": "main", "rules": []}
+            )
+        else:
+            response = MockResponse({"url": url})
+        return response
+
+    def post(self, url, headers=None, **kwargs):
+        self.calls.append(("POST", url, kwargs.get("json")))
+        return MockResponse({"id": 99, **kwargs.get("json")}, status_code=201)
+
+
+class PagedSession:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        page = int(url.rsplit("page=", 1)[1]) if "page=" in url else 1
+        links = {}
+        if page < len(self.pages):
+            links["next"] = {"url": f"{url.split('?')[0]}?page={page + 1}"}
+        return MockResponse(self.pages[page - 1], links=links)
+
+
+def test_run_executes_coroutine():
+    async def main():
+        return 42
+
+    assert run(main()) == 42
+
+
+def test_run_works_inside_running_event_loop():
+    async def inner():
+        return "inner"
+
+    async def outer():
+        return run(inner())
+
+    assert asyncio.run(outer()) == "inner"
+
+
+def test_requests_run_concurrently_within_limit():
+    session = SlowSession(delay=0.2)
+    repos = [f"CCBR/repo{i}" for i in range(6)]
+
+    async def main():
+        async with AsyncGitHubClient(max_concurrency=3, session=session) as client:
+            return await asyncio.gather(
+                *(
+                    api_get(f"https://api.github.com/repos/{repo}", client)
+                    for repo in repos
+                )
+            )
+
+    start = time.perf_counter()
+    results = run(main())
+    elapsed = time.perf_counter() - start
+
+    assert [result["url"].rsplit("/", 1)[1] for result in results] == [
+        f"repo{i}" for i in range(6)
+    ]
+    assert session.max_in_flight == 3
+    assert elapsed < 1.0
+
+
+def test_paginate_follows_next_links():
+    session = PagedSession([[{"id": 1}, {"id": 2}], [{"id": 3}]])
+
+    async def main():
+        async with AsyncGitHubClient(session=session) as client:
+            return [
+                item
+                async for item in paginate(
+                    "https://api.github.com/repos/CCBR/actions/rulesets", client
+                )
+            ]
+
+    assert run(main()) == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+def test_list_rulesets_and_copy_ruleset():
+    session = SlowSession(delay=0)
+
+    async def main():
+        async with AsyncGitHubClient(session=session) as client:
+            rulesets = await list_rulesets("CCBR/actions", client)
+            created = await copy_ruleset("CCBR/actions", "CCBR/other", "main", client)
+        return rulesets, created
+
+    rulesets, created = run(main())
+
+    assert rulesets == [{"id": 1, "name": "main"}]
+    assert created == {"id": 99, "name": "main", "rules": []}
+    assert session.calls[-1] == (
+        "POST",
+        "https://api.github.com/repos/CCBR/other/rulesets",
+        {"name": "main", "rules": []},
+    )
+
+
+def test_copy_ruleset_raises_when_ruleset_not_found():
+    async def main():
+        async with AsyncGitHubClient(session=SlowSession(delay=0)) as client:
+            await copy_ruleset("CCBR/actions", "CCBR/other", "missing", client)
+
+    with pytest.raises(ValueError, match="not found"):
+        run(main())
+
+
+def test_copy_ruleset_to_repos_reports_each_target():
+    class PartlyFailingSession(SlowSession):
+        def post(self, url, headers=None, **kwargs):
+            response = super().post(url, headers=headers, **kwargs)
+            if "CCBR/private" in url:
+                response = MockResponse({}, status_code=403)
+            return response
+
+    session = PartlyFailingSession(delay=0)
+
+    async def main():
+        async with AsyncGitHubClient(session=session) as client:
+            return await copy_ruleset_to_repos(
+                "CCBR/actions", ["CCBR/Tools", "CCBR/private"], "main", client
+            )
+
+    results = run(main())
+
+    assert results == [
+        {"repo": "CCBR/Tools", "status": "created", "ruleset_id": 99, "error": ""},
+        {
+            "repo": "CCBR/private",
+            "status": "failed",
+            "ruleset_id": None,
+            "error": "HTTPError: HTTP 403",
+        },
+    ]
+    source_fetches = [call for call in session.calls if call[0] == "GET"]
+    assert len(source_fetches) == 2
+
+
+def test_sync_ruleset_to_repos_skips_unchanged_targets():
+    class SyncSession(SlowSession):
+        def get(self, url, headers=None, params=None, **kwargs):
+            response = None
+            if url.endswith("CCBR/synced/rulesets"):
+                response = MockResponse([{"id": 5, "name": "main"}])
+            elif url.endswith("CCBR/synced/rulesets/5"):
+                response = MockResponse({"id": 5, "name": "main", "rules": []})
+            elif url.endswith("CCBR/new/rulesets"):
+                response = MockResponse([])
+            else:
+                response = super().get(url, headers=headers, params=params, **kwargs)
+            return response
+
+    session = SyncSession(delay=0)
+
+    async def main():
+        async with AsyncGitHubClient(session=session) as client:
+            return await sync_ruleset_to_repos(
+                "CCBR/actions", ["CCBR/synced", "CCBR/new"], "main", client
+            )
+
+    results = run(main())
+
+    assert [(r["repo"], r["status"], r["ruleset_id"]) for r in results] == [
+        ("CCBR/synced", "unchanged", 5),
+        ("CCBR/new", "created", 99),
+    ]
+    assert [call[1] for call in session.calls if call[0] == "POST"] == [
+        "https://api.github.com/repos/CCBR/new/rulesets"
+    ]
+
+
+def test_snapshot_rulesets_refetches_only_changed_rulesets():
+    class SnapshotSession(SlowSession):
+        def get(self, url, headers=None, params=None, **kwargs):
+            self.calls.append(("GET", url, params))
+            response = None
+            if url.endswith("CCBR/broken/rulesets"):
+                response = MockResponse({}, status_code=500)
+            elif url.endswith("/rulesets"):
+                response = MockResponse(
+                    [
+                        {"id": 1, "name": "main", "updated_at": "2024-01-01"},
+                        {"id": 2, "name": "tags", "updated_at": "2024-02-02"},
+                        {"id": 3, "name": "org", "source_type": "Organization"},
+                    ]
+                )
+            else:
+                ruleset_id = int(url.rsplit("/", 1)[1])
+                response = MockResponse(
+                    {"id": ruleset_id, "name": "tags", "updated_at": "2024-02-02"}
+                )
+            return response
+
+    previous = [
+        {
+            "repo": "CCBR/actions",
+            "id": 1,
+            "name": "main",
+            "updated_at": "2024-01-01",
+            "ruleset": {"id": 1, "name": "main"},
+        },
+        {
+            "repo": "CCBR/actions",
+            "id": 2,
+            "name": "tags",
+            "updated_at": "2023-12-31",
+            "ruleset": {"id": 2, "name": "old"},
+        },
+        {"repo": "CCBR/broken", "id": 9, "name": "x", "updated_at": "", "ruleset": {}},
+    ]
+    session = SnapshotSession(delay=0)
+
+    async def main():
+        async with AsyncGitHubClient(session=session) as client:
+            return await snapshot_rulesets(
+                ["CCBR/actions", "CCBR/broken"], client, previous=previous
+            )
+
+    records, summary = run(main())
+
+    assert [(r["repo"], r["id"], r["ruleset"].get("name")) for r in records] == [
+        ("CCBR/actions", 1, "main"),
+        ("CCBR/actions", 2, "tags"),
+        ("CCBR/broken", 9, None),
+    ]
+    assert summary["fetched"] == 1
+    assert summary["reused"] == 1
+    assert list(summary["errors"]) == ["CCBR/broken"]
+    detail_urls = [call[1] for call in session.calls if call[1][-1].isdigit()]
+    assert detail_urls == ["https://api.github.com/repos/CCBR/actions/rulesets/2"]
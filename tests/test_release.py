@@ -1,5 +1,7 @@
 import os
 import pytest
+import subprocess
+import sys
 import warnings
 
 from ccbr_actions.release import (
@@ -105,6 +107,25 @@ def test_create_release_draft(data_dir_rel):
     )
 
 
+def test_create_release_draft_resolves_target_when_called(monkeypatch):
+    monkeypatch.setattr("ccbr_actions.versions.get_current_hash", lambda: "abc123")
+    output = exec_in_context(
+        create_release_draft, next_version="v1", repo="CCBR/actions", debug=True
+    )
+    assert output.rstrip().endswith("--target abc123")
+
+
+def test_import_release_runs_no_subprocess():
+    code = (
+        "import subprocess\n"
+        "def fail(*args, **kwargs):\n"
+        "    raise AssertionError(f'subprocess at import: {args}')\n"
+        "subprocess.Popen.__init__ = fail\n"
+        "import ccbr_actions.release, ccbr_actions.citation\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
 def test_push_release_draft_branch(data_dir_rel):
     assert exec_in_context(
         push_release_draft_branch,
@@ -365,7 +386,7 @@ def test_prepare_draft_release_warns_on_autoformat_trigger_failure(
     monkeypatch.setattr(
         "ccbr_actions.release.push_release_draft_branch", lambda **_: None
     )
-    monkeypatch.setattr("ccbr_actions.release.get_current_hash", lambda: "abc123")
+    monkeypatch.setattr("ccbr_actions.versions.get_current_hash", lambda: "abc123")
     monkeypatch.setattr(
         "ccbr_actions.release.create_release_draft",
         lambda **_: "https://example.com/release",
@@ -0,0 +1,145 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from ccbr_actions.__main__ import cli
+from ccbr_actions.server import (
+    ActionServer,
+    call,
+    execute_call,
+    server_available,
+    shutdown,
+    start_server,
+)
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 characters, which pytest's tmp_path can exceed
+    with tempfile.TemporaryDirectory(dir="/tmp") as tmp_dir:
+        yield os.path.join(tmp_dir, "ccbr_actions.sock")
+
+
+@pytest.fixture
+def running_server(socket_path):
+    server = ActionServer(socket_path, idle_timeout=30)
+    thread = threading.Thread(target=server.serve_until_done)
+    thread.start()
+    try:
+        yield server
+    finally:
+        shutdown(socket_path)
+        thread.join(timeout=5)
+
+
+def test_execute_call_rejects_unknown_function():
+    response = execute_call({"function": "os.system", "kwargs": {"command": "true"}})
+    assert not response["ok"]
+    assert "Unknown function 'os.system'" in response["error"]
+
+
+def test_call_uses_each_callers_environment(running_server, tmp_path, monkeypatch):
+    for step in ("one", "two"):
+        monkeypatch.setenv("GITHUB_OUTPUT", str(tmp_path / step))
+        response = call(
+            "set_output",
+            {"name": "STEP", "value": step},
+            socket_path=running_server.socket_path,
+        )
+        assert response["ok"]
+    assert running_server.calls == 2
+    assert "\none\n" in (tmp_path / "one").read_text()
+    assert "\ntwo\n" in (tmp_path / "two").read_text()
+    assert os.environ["GITHUB_OUTPUT"] == str(tmp_path / "two")
+
+
+def test_call_reports_errors_from_server(running_server, capsys, monkeypatch):
+    monkeypatch.delenv("GITHUB_OUTPUT", raising=False)
+    response = call(
+        "set_output",
+        {"name": "STEP", "value": "x"},
+        socket_path=running_server.socket_path,
+    )
+    assert not response["ok"]
+    assert "RuntimeError" in response["error"]
+
+
+def test_call_falls_back_to_this_process(socket_path, github_output_file):
+    response = call("set_output", {"name": "A", "value": "1"}, socket_path=socket_path)
+    assert response["ok"]
+    assert "A<<" in github_output_file.read_text()
+    with pytest.raises(ConnectionError):
+        call("set_output", {"name": "A", "value": "1"}, socket_path, fallback=False)
+
+
+def test_call_does_not_rerun_after_server_drops_request(
+    socket_path, github_output_file
+):
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen()
+
+    def drop_request():
+        connection, _ = listener.accept()
+        with connection, connection.makefile("rb") as reader:
+            reader.readline()
+
+    thread = threading.Thread(target=drop_request)
+    thread.start()
+    try:
+        response = call("set_output", {"name": "A", "value": "1"}, socket_path)
+    finally:
+        thread.join(timeout=5)
+        listener.close()
+    assert not response["ok"]
+    assert "without a response" in response["error"]
+    assert not github_output_file.exists()
+
+
+def test_server_stops_when_idle(socket_path):
+    server = ActionServer(socket_path, idle_timeout=0.05)
+    start = time.perf_counter()
+    server.serve_until_done()
+    assert time.perf_counter() - start < 5
+    assert not os.path.exists(socket_path)
+
+
+def test_cli_serve_detach_and_call(socket_path, github_output_file):
+    pid = start_server(socket_path, idle_timeout=30)
+    try:
+        result = CliRunner().invoke(
+            cli,
+            [
+                "call",
+                "set_output",
+                "--json",
+                '{"name": "VERSION"}',
+                "--arg",
+                "value=1.0.0",
+                "--socket",
+                socket_path,
+                "--no-fallback",
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        assert "VERSION<<" in github_output_file.read_text()
+    finally:
+        assert CliRunner().invoke(cli, ["serve", "--stop", "--socket", socket_path])
+    deadline = time.monotonic() + 5
+    while server_available(socket_path) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not server_available(socket_path)
+    assert pid > 0
+
+
+def test_cli_call_without_server(socket_path):
+    result = CliRunner().invoke(
+        cli, ["call", "set_output", "--socket", socket_path, "--no-fallback"]
+    )
+    assert result.exit_code == 1
+    assert "No ccbr_actions server is listening" in result.output
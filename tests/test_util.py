@@ -1,7 +1,7 @@
 import os
 import shutil
 
-from ccbr_actions.util import precommit_run, path_resolve
+from ccbr_actions.util import RepoContext, date_today, precommit_run, path_resolve
 
 
 def test_precommit():
@@ -22,3 +22,19 @@ def test_path_resolve_write(tmp_path, data_dir):
     with open(src_path, "r") as infile:
         text = infile.read()
     assert text == "hello world"
+
+
+def test_repo_context_is_lazy_and_memoized(monkeypatch):
+    calls = []
+
+    def get_current_hash():
+        calls.append(1)
+        return "abc123"
+
+    monkeypatch.setattr("ccbr_actions.versions.get_current_hash", get_current_hash)
+    context = RepoContext()
+    assert calls == []
+    assert context.head_sha == "abc123"
+    assert context.head_sha == "abc123"
+    assert calls == [1]
+    assert context.today == date_today()